@@ -0,0 +1,25 @@
+"""Reference implementation of the baseline, ILS and AILS grid planners.
+
+The modules follow Chapter 3 of the thesis: :mod:`ails.grid` holds the shared
+components of sec:meth_components, :mod:`ails.corridor` the ILS and AILS
+corridors, :mod:`ails.search` the five classical algorithms and
+:mod:`ails.planner` the three planning pipelines.
+"""
+
+from .grid import as_grid, bresenham, integral_image, neighbour_table, window_density
+from .planner import AILSParams, GridPlanner, ILSParams, PlanBatch, PlanResult
+from .search import ALGORITHMS
+
+__all__ = [
+    "ALGORITHMS",
+    "AILSParams",
+    "GridPlanner",
+    "ILSParams",
+    "PlanBatch",
+    "PlanResult",
+    "as_grid",
+    "bresenham",
+    "integral_image",
+    "neighbour_table",
+    "window_density",
+]
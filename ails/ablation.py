@@ -0,0 +1,238 @@
+"""Ablation sweeps over the AILS corridor parameters (sec:res_ablation).
+
+A sweep runs every combination of (r_min, r_max), window half-size omega,
+exponent alpha and strategy on the same queries. Most of an AILS query does
+not depend on those parameters, so it is shared:
+
+* per map, the :class:`~ails.planner.GridPlanner` preprocessing (integral
+  image, adjacency, component labels);
+* per query, the Bresenham line and the standard-pipeline reference run;
+* per query, the multi-scale density profile: sigma, its gradient and
+  their maxima for every omega of the grid, from one pass over the
+  integral image (:func:`~ails.corridor.density_profile`).
+
+From these every setting derives its radii r(p) with
+:func:`~ails.corridor.adaptive_radii`, which costs O(|L|). Settings whose
+radii coincide produce the same corridor, and therefore the same search.
+This happens often: the Base strategy ignores omega and alpha, and open
+stretches of the line clamp every setting to r_min. Only the distinct
+corridors are built and searched, and each setting reports the result of
+its corridor. A full grid therefore costs about as much as its number of
+distinct corridors. Jobs are whole maps, spread over a process pool and
+stored in a resumable :class:`~ails.experiments.ResultStore`. How
+throughput scales with the number of workers has not been measured: the
+sweeps so far ran on a single CPU.
+
+The reported ``time_ms`` of a setting approximates an independent AILS run:
+the line, the shared profile, and the median over ``repeats`` of corridor
+construction, search and smoothing.
+
+Usage::
+
+    python -m ails.ablation ds2 results/ablation.jsonl --workers 8
+"""
+
+import argparse
+import itertools
+import multiprocessing
+import statistics
+import time
+
+import numpy as np
+
+from .corridor import STRATEGIES, adaptive_radii, density_profile, union_of_squares
+from .datasets import DEFAULT_SEED, SPECS, build_map, endpoints
+from .experiments import ResultStore
+from .grid import bresenham
+from .planner import GridPlanner
+from .search import ALGORITHMS
+from .stats import format_table, group_ids, summarise
+
+AUTO = "auto"
+# Defaults of tab:ablation_radius, tab:ablation_window (sides 2*omega + 1 of
+# 3, 7 and 11), tab:ablation_alpha and tab:ablation_strategy. r_max=None is
+# the default ceil(0.1 min(H, W)).
+RADII = ((1, 5), (1, 10), (2, 10), (2, 15), (2, None))
+OMEGAS = (1, 3, 5)
+ALPHAS = (0.5, 1.0, 1.5, 2.0)
+SWEEP_STRATEGIES = (AUTO,) + STRATEGIES
+FACTORS = ("radii", "omega", "alpha", "strategy")
+
+COLUMNS = (
+    "key", "dataset", "topology", "size", "density", "pair", "algorithm", "setting",
+    "r_min", "r_max", "omega", "alpha", "strategy", "selected", "corridor",
+    "found", "cost", "optimal_cost", "expanded", "corridor_size", "rounds", "time_ms", "standard_ms",
+)
+ORDER = ("key", "pair", "algorithm", "setting")
+
+
+def settings(radii=RADII, omegas=OMEGAS, alphas=ALPHAS, strategies=SWEEP_STRATEGIES):
+    """Full factorial grid of (r_min, r_max, omega, alpha, strategy) tuples."""
+    return [(r_min, r_max, omega, alpha, strategy)
+            for (r_min, r_max), omega, alpha, strategy in itertools.product(radii, omegas, alphas, strategies)]
+
+
+def sweep_query(planner, algorithm, start, goal, grid, repeats=3):
+    """Results of every setting in ``grid`` for one query.
+
+    Returns one dict per setting, in order, with the strategy actually used,
+    the index of its corridor among the query's distinct corridors and that
+    corridor's metrics (see :data:`COLUMNS`).
+    """
+    search = planner._search(algorithm)
+    p = planner.ails
+    t0 = time.perf_counter()
+    xs, ys = bresenham(start, goal)
+    profile = density_profile(planner.ii, xs, ys, sorted({omega for _, _, omega, _, _ in grid}))
+    shared_ms = (time.perf_counter() - t0) * 1e3
+    corridors = {}
+    chosen = []
+    for r_min, r_max, omega, alpha, strategy in grid:
+        sigma, grad = profile[omega]
+        r_max = planner.r_max if r_max is None else r_max
+        selected = profile.strategy(omega, p.grad_threshold) if strategy == AUTO else strategy
+        radii = adaptive_radii(sigma, grad, selected, min(r_min, r_max), r_max, alpha, p.beta)
+        # The line is shared, so equal radii mean equal corridors.
+        index = corridors.setdefault(radii.tobytes(), (len(corridors), radii, selected))[0]
+        chosen.append((r_max, selected, index))
+
+    results = [None] * len(corridors)
+    for index, radii, selected in corridors.values():
+        runs = []
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            cells = union_of_squares(planner.occ, xs, ys, radii)
+            r = planner._ails_rounds(search, start, goal, cells, selected)
+            runs.append(planner._finish(r, algorithm, "ails", t0))
+        results[index] = runs[0], statistics.median(run.time_ms for run in runs)
+
+    out = []
+    for r_max, selected, index in chosen:
+        r, ms = results[index]
+        out.append({
+            "r_max": r_max, "selected": selected, "corridor": index,
+            "found": r.found, "cost": r.cost, "expanded": r.expanded,
+            "corridor_size": r.corridor_size, "rounds": r.rounds, "time_ms": shared_ms + ms,
+        })
+    return out
+
+
+def run_job(spec, grid, algorithms=("astar",), repeats=3):
+    """Sweep ``grid`` over every start-goal pair of one map and return its records.
+
+    Each query also records the optimal cost (standard A*) and the median
+    time of the algorithm's standard pipeline, the references of the
+    optimality and time-improvement columns of sec:res_ablation.
+    """
+    planner = GridPlanner(build_map(spec))
+    records = []
+    for pair, (s, g) in enumerate(endpoints(spec, planner.occ, planner.labels)):
+        optimal = planner.plan(s, g, "astar", "standard").cost
+        for algorithm in algorithms:
+            standard_ms = statistics.median(planner.plan(s, g, algorithm, "standard").time_ms
+                                            for _ in range(repeats))
+            results = sweep_query(planner, algorithm, s, g, grid, repeats)
+            for setting, ((r_min, _, omega, alpha, strategy), res) in enumerate(zip(grid, results)):
+                records.append(dict({
+                    "key": spec.key, "dataset": spec.dataset, "topology": spec.topology,
+                    "size": spec.size, "density": spec.density, "pair": pair,
+                    "algorithm": algorithm, "setting": setting,
+                    "r_min": r_min, "omega": omega, "alpha": alpha, "strategy": strategy,
+                    "optimal_cost": optimal, "standard_ms": standard_ms,
+                }, **res))
+    return spec.key, records
+
+
+def _run_job(args):
+    spec, grid, algorithms, repeats = args
+    key, records = run_job(spec, grid, algorithms, repeats)
+    return (key, algorithms), records
+
+
+def run_sweep(specs, store, grid=None, algorithms=("astar",), workers=None, repeats=3):
+    """Sweep every map of ``specs`` not yet in ``store``; returns the number of jobs run.
+
+    ``workers=1`` runs in-process, otherwise maps are spread over a process
+    pool as in :func:`~ails.experiments.run_experiment`. Jobs are keyed by
+    map and algorithm, so adding an algorithm only sweeps that one.
+    """
+    if not isinstance(store, ResultStore):
+        store = ResultStore(store)
+    grid = settings() if grid is None else list(grid)
+    done = {(key, a) for key, algs in store.completed() for a in algs}
+    todo = []
+    for spec in specs:
+        missing = tuple(a for a in algorithms if (spec.key, a) not in done)
+        if missing:
+            todo.append((spec, grid, missing, repeats))
+    if workers == 1:
+        for job in todo:
+            store.append(*_run_job(job))
+        return len(todo)
+    with multiprocessing.Pool(workers) as pool:
+        for key, records in pool.imap_unordered(_run_job, todo):
+            store.append(key, records)
+    return len(todo)
+
+
+def load(store):
+    """Records of an ablation store as a dict of column arrays."""
+    if not isinstance(store, ResultStore):
+        store = ResultStore(store)
+    return store.load(COLUMNS, ORDER)
+
+
+def factor_table(cols, factor):
+    """Mean metrics per level of one factor, the layout of the sec:res_ablation tables.
+
+    ``factor`` is one of :data:`FACTORS`; "radii" groups by (r_min, r_max).
+    Optimality is the share of queries whose cost is within 1e-6 of the
+    optimal grid cost (smoothed paths may be shorter), time improvement is
+    relative to the standard pipeline.
+    """
+    by = ("r_min", "r_max") if factor == "radii" else (factor,)
+    cols = dict(cols)
+    cols["optimal"] = 100.0 * (cols["cost"] <= cols["optimal_cost"] + 1e-6)
+    cols["improvement"] = 100.0 * (1 - cols["time_ms"] / cols["standard_ms"])
+    table = summarise(cols, "time_ms", by)
+    out = {k: table[k] for k in by}
+    out["n"] = table["n"]
+    for metric in ("time_ms", "improvement", "optimal", "expanded", "corridor_size", "rounds"):
+        out[metric] = summarise(cols, metric, by)["mean"]
+    return out
+
+
+def _radii(text):
+    r_min, _, r_max = text.partition(":")
+    return int(r_min), int(r_max) if r_max else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ablation sweep over the AILS corridor parameters.")
+    parser.add_argument("dataset", choices=sorted(SPECS))
+    parser.add_argument("store", help="append-only results file (JSON lines)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--algorithms", nargs="+", default=["astar"], choices=sorted(ALGORITHMS))
+    parser.add_argument("--radii", nargs="+", type=_radii, default=list(RADII),
+                        help="r_min:r_max pairs; an empty r_max means ceil(0.1 min(H, W))")
+    parser.add_argument("--omegas", nargs="+", type=int, default=list(OMEGAS))
+    parser.add_argument("--alphas", nargs="+", type=float, default=list(ALPHAS))
+    parser.add_argument("--strategies", nargs="+", default=list(SWEEP_STRATEGIES), choices=SWEEP_STRATEGIES)
+    args = parser.parse_args(argv)
+    grid = settings(args.radii, args.omegas, args.alphas, args.strategies)
+    n = run_sweep(SPECS[args.dataset](args.seed), args.store, grid, args.algorithms, args.workers, args.repeats)
+    print(f"{n} jobs run, {len(grid)} settings each, results in {args.store}", flush=True)
+    cols = load(args.store)
+    queries, _ = group_ids(cols, ("key", "pair", "algorithm"))
+    n_queries = int(queries.max()) + 1 if len(queries) else 0
+    distinct = len(np.unique(queries * (int(cols["corridor"].max(initial=0)) + 1) + cols["corridor"]))
+    print(f"{distinct} distinct corridors for {len(queries)} query settings "
+          f"({distinct / max(n_queries, 1):.1f} per query)", flush=True)
+    for factor in FACTORS:
+        print(format_table(factor_table(cols, factor)) + "\n", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""Anytime, deadline-bounded AILS.
+
+alg:ails_main returns one path, and only after expanding the corridor as
+far as the search needs, up to C_a = V. Surveillance and emergency queries
+need an answer within a fixed budget instead. :class:`AnytimePlanner`
+takes a deadline. It first runs weighted A* (f = g + w h, w = ``w0``) in
+the AILS corridor, which finds a path quickly. Then, ARA*-style, it keeps
+improving while time remains. Each round lowers w by ``w_step`` towards 1
+and grows the corridor locally (eq:ails_expansion) by a radius that
+doubles from ``delta_r``. A round whose corridor has no path only grows
+the corridor. Rounds restart their search rather than reusing ARA*'s
+INCONS list, since the corridor changes between rounds. The query stops
+at the deadline, or once the path is provably optimal.
+
+Every round also yields a lower bound on the optimal grid cost, ARA*'s
+min(g + h) over OPEN and INCONS. Neighbours the corridor excluded count as
+OPEN, because the search never expanded them. This makes the bound valid
+for the whole grid, not just the corridor. The octile distance is the
+bound before any round. :attr:`AnytimeResult.bound` is the best cost
+divided by the best lower bound. The reported path is at most that factor
+longer than an optimal grid path, and a bound of 1 proves optimality, often
+before the corridor has reached C_a = V. Paths are not smoothed: smoothing
+would spend time past the deadline and change the cost the bound refers
+to.
+
+Usage::
+
+    python -m ails.anytime --topology room --size 500 --deadline 50
+"""
+
+import argparse
+import functools
+import heapq
+import math
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .corridor import expand_corridor
+from .grid import bresenham, octile
+from .instrument import LINE
+from .maps import generate
+from .planner import GridPlanner, PlanResult
+from .search import SearchResult, reconstruct
+
+INF = math.inf
+# Expansions between deadline checks; finer than search.POLL so that a
+# query overruns its budget by well under a millisecond.
+DEADLINE_POLL = 32
+# Costs are float sums, so a closed node can be reached again along an
+# equally long path whose g differs in the last bit. Only improvements
+# larger than this count as inconsistencies.
+EPS = 1e-9
+
+
+@dataclass(frozen=True)
+class AnytimeParams:
+    """Anytime schedule: initial heuristic weight and its decrement per round."""
+
+    w0: float = 3.0
+    w_step: float = 0.5
+
+
+@dataclass
+class BoundedResult(SearchResult):
+    """Search result with a lower bound on the optimal cost over the whole grid."""
+
+    lower: float = 0.0
+
+
+@dataclass
+class Improvement:
+    """State of an anytime query after a round that improved its cost or bound."""
+
+    time_ms: float
+    cost: float
+    bound: float
+    weight: float
+    corridor_size: int
+    expanded: int
+
+
+@dataclass
+class AnytimeResult(PlanResult):
+    """:class:`~ails.planner.PlanResult` with the final bound and the improvement trace."""
+
+    bound: float = INF
+    improvements: list = field(default_factory=list)
+
+
+def weighted_astar(adj, start, goal, width, member=None, cancelled=None, weight=1.0):
+    """Weighted A* (f = g + weight h) that also reports a lower bound on the optimal cost.
+
+    Like ARA*, nodes are not re-expanded: a closed node reached again more
+    cheaply (by more than :data:`EPS`) goes to INCONS instead. Nodes outside
+    ``member`` are never added, so they act as OPEN nodes that are never
+    expanded. The bound is the minimum of g + h over OPEN, INCONS and the
+    goal. A cancelled search reports no path and a bound of 0.
+    """
+    gx, gy = divmod(goal, width)
+
+    def h(u):
+        x, y = divmod(u, width)
+        return octile(abs(x - gx), abs(y - gy))
+
+    g = {start: 0.0}
+    parent = {start: None}
+    closed = set()
+    heap = [(weight * h(start), 0, start)]
+    tie = 1
+    expanded = peak = 0
+    # min g + h over INCONS and the excluded neighbours.
+    left = INF
+    while heap:
+        if len(heap) > peak:
+            peak = len(heap)
+        _, _, v = heapq.heappop(heap)
+        if v in closed:
+            continue
+        if v == goal:
+            lower = min(left, g[v], min((g[u] + h(u) for _, _, u in heap if u not in closed), default=INF))
+            return BoundedResult(reconstruct(parent, goal), expanded, peak, lower)
+        closed.add(v)
+        expanded += 1
+        if cancelled is not None and not expanded % DEADLINE_POLL and cancelled():
+            return BoundedResult(None, expanded, peak, 0.0)
+        gv = g[v]
+        for u, c in adj[v]:
+            gu = gv + c
+            if member is not None and not member[u]:
+                fu = gu + h(u)
+                if fu < left:
+                    left = fu
+                continue
+            if u in closed:
+                if gu < g[u] - EPS:
+                    g[u] = gu
+                    parent[u] = v
+                    fu = gu + h(u)
+                    if fu < left:
+                        left = fu
+            elif gu < g.get(u, INF):
+                g[u] = gu
+                parent[u] = v
+                heapq.heappush(heap, (gu + weight * h(u), tie, u))
+                tie += 1
+    return BoundedResult(None, expanded, peak, left)
+
+
+class AnytimePlanner(GridPlanner):
+    """:class:`GridPlanner` with deadline-bounded anytime AILS queries (:meth:`plan_anytime`).
+
+    Queries through :meth:`plan` are unchanged.
+    """
+
+    def __init__(self, grid, ils=None, ails=None, ii=None, probe=None, costs=None, anytime=None):
+        super().__init__(grid, "astar", "ails", ils, ails, ii, probe, costs)
+        self.anytime = anytime or AnytimeParams()
+        if self.anytime.w0 < 1 or self.anytime.w_step <= 0:
+            raise ValueError("anytime weights need w0 >= 1 and w_step > 0")
+
+    def plan_anytime(self, start, goal, deadline_ms, on_improve=None):
+        """Best path found within ``deadline_ms`` as an :class:`AnytimeResult`.
+
+        ``on_improve`` is called with each :class:`Improvement` as it
+        happens. If no round finds a path in time, the result has none. The
+        deadline is checked during searches and between rounds; growing a
+        corridor cannot be interrupted and may overrun it by a few
+        milliseconds on large maps.
+        """
+        start, goal, _, _ = self._check(start, goal, "astar", "ails")
+        t0 = time.perf_counter()
+        deadline = t0 + deadline_ms / 1e3
+        self.probe.start()
+        result = AnytimeResult(None, INF, 0, 0)
+        if self.reachable(start, goal):
+            result = self._improve(start, goal, lambda: time.perf_counter() > deadline, t0, on_improve)
+        # Not a SMOOTHED algorithm name, so the grid path is kept.
+        return self._finish(result, "anytime", "ails", t0)
+
+    def _improve(self, start, goal, expired, t0, on_improve):
+        p = self.anytime
+        s, g = self._flat(start), self._flat(goal)
+        xs, ys = bresenham(start, goal)
+        self.probe.lap(LINE)
+        cells, strategy = self._ails_corridor(xs, ys)
+        lower = float(octile(abs(start[0] - goal[0]), abs(start[1] - goal[1])))
+        weight = p.w0
+        grow = self.ails.delta_r
+        best = AnytimeResult(None, INF, 0, 0, strategy=strategy)
+        expanded = rounds = 0
+        while True:
+            res = self._search_in(functools.partial(weighted_astar, weight=weight), s, g, cells, expired)
+            expanded += res.expanded
+            improved = res.lower > lower
+            lower = max(lower, res.lower)
+            if res.path is not None:
+                r = self._result(res, expanded, len(cells), rounds, strategy)
+                if r.cost < best.cost:
+                    best.path, best.cost, best.corridor_size, best.rounds = r.path, r.cost, len(cells), rounds
+                    improved = True
+            bound = 1.0 if best.cost <= lower else float(best.cost / lower) if lower > 0 else INF
+            if improved and best.found:
+                best.bound = bound
+                step = Improvement((time.perf_counter() - t0) * 1e3, best.cost, bound, weight, len(cells), expanded)
+                best.improvements.append(step)
+                if on_improve is not None:
+                    on_improve(step)
+            if bound <= 1.0 or expired():
+                break
+            grown = expand_corridor(self.occ, cells, grow)
+            if weight == 1.0 and len(grown) == len(cells):
+                break
+            if res.path is not None:
+                weight = max(1.0, weight - p.w_step)
+            cells = grown
+            grow = min(2 * grow, max(self.H, self.W))
+            rounds += 1
+        best.expanded = expanded
+        return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Anytime AILS under a per-query deadline.")
+    parser.add_argument("--size", type=int, default=500)
+    parser.add_argument("--density", type=float, default=0.2)
+    parser.add_argument("--topology", default="room")
+    parser.add_argument("--deadline", type=float, default=50.0, help="per-query budget in milliseconds")
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    rng = np.random.default_rng(args.seed)
+    occ = generate(args.topology, rng, (args.size, args.size), args.density)
+    planner = AnytimePlanner(occ)
+    labels = planner.labels
+    free = np.argwhere(labels == np.bincount(labels[labels >= 0]).argmax())
+    pairs = [tuple(map(tuple, free[rng.choice(len(free), 2, replace=False)])) for _ in range(args.queries)]
+    for s, g in pairs:
+        s, g = tuple(map(int, s)), tuple(map(int, g))
+        r = planner.plan_anytime(s, g, args.deadline)
+        first = r.improvements[0] if r.improvements else None
+        print(f"{s} -> {g}: " + (f"first {first.time_ms:.1f} ms (bound {first.bound:.3f}), "
+                                 f"final bound {r.bound:.3f} after {len(r.improvements)} improvements, "
+                                 f"{r.time_ms:.1f} ms" if first else f"no path within {args.deadline} ms"),
+              flush=True)
+
+
+if __name__ == "__main__":
+    main()
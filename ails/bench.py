@@ -0,0 +1,196 @@
+"""Scaling benchmark suite with baseline comparison.
+
+A suite is a matrix of topology x size x density maps (generated exactly
+like the datasets, from :func:`~ails.datasets.config_seed`) on which every
+algorithm runs in every pipeline for a few start-goal pairs. Per cell it
+records the median query time, mean expansions, peak traced memory of a
+query, corridor efficiency |C_a|/|V| (sec:meth_metrics), success rate
+and node reduction against the same algorithm's standard pipeline.
+
+Memory is measured in a separate untimed run under ``tracemalloc`` so that
+tracing does not distort the timings.
+
+A result file can be stored as a baseline; :func:`compare` flags every cell
+whose metric got worse than the baseline by more than its threshold, and
+the CLI exits non-zero when it finds any.
+
+Usage::
+
+    python -m ails.bench run quick bench/new.json
+    python -m ails.bench compare bench/baseline.json bench/new.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from .datasets import DEFAULT_SEED, DS2_DENSITIES, DS2_SIZES, DS3_DENSITIES, DS3_SIZE, DS3_TOPOLOGIES
+from .datasets import MapSpec, build_map, config_seed, endpoints
+from .planner import MODES, GridPlanner
+from .search import CLASSICAL
+from .stats import format_table
+
+SUITES = {
+    "quick": dict(topologies=("random",), sizes=(50, 100, 200), densities=(0.1, 0.3),
+                  algorithms=("astar", "bfs"), pairs=5),
+    "ds2": dict(topologies=("random",), sizes=DS2_SIZES, densities=DS2_DENSITIES,
+                algorithms=CLASSICAL, pairs=10),
+    "ds3": dict(topologies=DS3_TOPOLOGIES, sizes=(DS3_SIZE,), densities=DS3_DENSITIES,
+                algorithms=CLASSICAL, pairs=10),
+    "large": dict(topologies=("random", "room"), sizes=(500, 1000), densities=(0.1, 0.2),
+                  algorithms=("astar",), pairs=3),
+    # 2000x2000 maps: one pair, one repeat and no tracemalloc pass unless
+    # asked for on the command line.
+    "xl": dict(topologies=("random", "room"), sizes=(2000,), densities=(0.1, 0.2),
+               algorithms=("astar",), pairs=1, repeats=1, memory=False),
+}
+
+CELL = ("topology", "size", "density", "algorithm", "mode")
+# Relative worsening tolerated before a cell counts as a regression. Larger
+# is worse for every metric except success, which may not drop at all.
+THRESHOLDS = {"time_ms": 0.15, "expanded": 0.02, "peak_kib": 0.20, "corridor_efficiency": 0.05}
+
+
+def run_case(spec, algorithms, modes=MODES, repeats=3, memory=True):
+    """Benchmark rows for one map: one per algorithm x mode."""
+    occ = build_map(spec)
+    planner = GridPlanner(occ)
+    pairs = endpoints(spec, occ, planner.labels)
+    rows = []
+    for algorithm in algorithms:
+        for mode in modes:
+            times, expanded, eff, found, peak = [], [], [], [], 0
+            for s, g in pairs:
+                runs = [planner.plan(s, g, algorithm, mode) for _ in range(repeats)]
+                r = runs[0]
+                times.append(statistics.median(run.time_ms for run in runs))
+                expanded.append(r.expanded)
+                eff.append(r.corridor_size / max(planner.n_free, 1))
+                found.append(r.found)
+                if memory:
+                    tracemalloc.start()
+                    planner.plan(s, g, algorithm, mode)
+                    peak = max(peak, tracemalloc.get_traced_memory()[1])
+                    tracemalloc.stop()
+            rows.append({
+                "topology": spec.topology, "size": spec.size, "density": spec.density,
+                "algorithm": algorithm, "mode": mode, "pairs": len(pairs),
+                "time_ms": statistics.median(times) if times else 0.0,
+                "expanded": float(np.mean(expanded)) if expanded else 0.0,
+                "peak_kib": peak / 1024,
+                "corridor_efficiency": float(np.mean(eff)) if eff else 0.0,
+                "success": float(np.mean(found)) if found else 0.0,
+            })
+    # Node reduction (eq:node_reduction) against each algorithm's own baseline.
+    base = {r["algorithm"]: r["expanded"] for r in rows if r["mode"] == "standard"}
+    for r in rows:
+        b = base.get(r["algorithm"])
+        r["node_reduction"] = 100.0 * (b - r["expanded"]) / b if b else None
+    return rows
+
+
+def run_suite(name, seed=DEFAULT_SEED, modes=MODES, repeats=None, memory=None, log=None):
+    """Run the suite ``name`` (see :data:`SUITES`) and return its result document.
+
+    ``repeats`` and ``memory`` default to the suite's own settings, else 3
+    and True.
+    """
+    cfg = SUITES[name]
+    repeats = cfg.get("repeats", 3) if repeats is None else repeats
+    memory = cfg.get("memory", True) if memory is None else memory
+    rows = []
+    t0 = time.perf_counter()
+    for topology in cfg["topologies"]:
+        for size in cfg["sizes"]:
+            for density in cfg["densities"]:
+                spec = MapSpec("bench", 0, size, density, topology,
+                               config_seed(seed, "bench", topology, size, density), cfg["pairs"])
+                rows.extend(run_case(spec, cfg["algorithms"], modes, repeats, memory))
+                if log:
+                    log(f"{topology} {size} {density:.2f} done")
+    return {
+        "suite": name, "seed": seed, "repeats": repeats,
+        "python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine(),
+        "elapsed_s": time.perf_counter() - t0,
+        "rows": rows,
+    }
+
+
+def compare(baseline, current, thresholds=THRESHOLDS):
+    """Cells of ``current`` that regressed against ``baseline``.
+
+    Returns a list of dicts (cell keys, metric, baseline value, current
+    value, ratio). Cells missing from either document are ignored.
+    """
+    base = {tuple(r[k] for k in CELL): r for r in baseline["rows"]}
+    out = []
+    for r in current["rows"]:
+        b = base.get(tuple(r[k] for k in CELL))
+        if b is None:
+            continue
+        for metric, tol in thresholds.items():
+            if b[metric] > 0 and r[metric] > b[metric] * (1 + tol):
+                out.append(dict({k: r[k] for k in CELL}, metric=metric, baseline=b[metric],
+                                current=r[metric], ratio=r[metric] / b[metric]))
+        if r["success"] < b["success"]:
+            out.append(dict({k: r[k] for k in CELL}, metric="success", baseline=b["success"],
+                            current=r["success"], ratio=r["success"] / b["success"]))
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scaling benchmarks and baseline comparison.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="run a suite and write its results")
+    run.add_argument("suite", choices=sorted(SUITES))
+    run.add_argument("out")
+    run.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    run.add_argument("--repeats", type=int, help="timed runs per query (default: the suite's, else 3)")
+    run.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    run.add_argument("--memory", dest="memory", action="store_true", default=None,
+                     help="force the tracemalloc pass")
+    run.add_argument("--no-memory", dest="memory", action="store_false", help="skip the tracemalloc pass")
+    run.add_argument("--baseline", help="compare against this result file after running")
+    cmp_ = sub.add_parser("compare", help="compare two result files")
+    cmp_.add_argument("baseline")
+    cmp_.add_argument("current")
+    for p in (run, cmp_):
+        for metric, tol in THRESHOLDS.items():
+            p.add_argument("--" + metric.replace("_", "-"), type=float, default=tol, dest=metric,
+                           help=f"tolerated relative increase (default {tol})")
+    args = parser.parse_args(argv)
+    thresholds = {m: getattr(args, m) for m in THRESHOLDS}
+
+    if args.command == "run":
+        doc = run_suite(args.suite, args.seed, args.modes, args.repeats, args.memory,
+                        log=lambda msg: print(msg, flush=True))
+        with open(args.out, "w") as f:
+            json.dump(doc, f, indent=1)
+        print(f"{len(doc['rows'])} cells in {doc['elapsed_s']:.1f} s, written to {args.out}", flush=True)
+        if not args.baseline:
+            return 0
+        current = doc
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    else:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+    regressions = compare(baseline, current, thresholds)
+    if regressions:
+        print(format_table({k: [r[k] for r in regressions] for k in regressions[0]}), flush=True)
+        print(f"{len(regressions)} regressions", flush=True)
+        return 1
+    print("no regressions", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
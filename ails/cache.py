@@ -0,0 +1,229 @@
+"""Memoised paths and corridors for repeated queries on one map.
+
+The evaluation samples 100 start-goal pairs per map, and deployed robots
+ask for the same routes again and again. A :class:`PlanCache` sits in front
+of one :class:`~ails.planner.GridPlanner` or
+:class:`~ails.dynamic.DynamicPlanner`. It keeps two LRU tables keyed by the
+query's start, goal and parameters:
+
+* final results, per (start, goal, algorithm, mode, parameters);
+* initial ILS/AILS corridors (line, cells and strategy), per (start, goal,
+  mode, parameters), so that a pair asked with another algorithm skips the
+  line, density profile and corridor construction.
+
+A query whose endpoints both lie on a cached path of the same algorithm and
+mode is answered with that path's stretch between them. Its cost is then
+at most what the cached query paid for that stretch, but not necessarily
+what a fresh query would return.
+
+Entries hold for the map version they were computed on. Before each lookup
+the cache reads the cells changed since its last look from the planner's
+update log and evicts every entry whose influence box contains one of
+them. The box is the line's bounding box, grown by the widest corridor
+radius or density window the query used. Entries outside the changed
+region survive. Standard-pipeline results depend on the whole grid and so
+on every change. Only found paths are cached, since reachability can
+change anywhere on the map.
+
+How the cache served each query, and the time that saved, are recorded by
+the planner's :class:`~ails.instrument.Probe` (see
+:meth:`~ails.instrument.Probe.cache_summary`).
+"""
+
+import dataclasses
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+from .corridor import ils_corridor
+from .grid import bresenham
+from .instrument import CORRIDOR_HIT, LINE, MISS, PATH_HIT, SUBPATH_HIT
+from .planner import GridPlanner, PlanResult
+from .smoothing import path_length
+
+
+@dataclass
+class _Entry:
+    """Cached value, the (x0, y0, x1, y1) box of cells it depends on, and its cost to compute."""
+
+    value: object
+    box: tuple
+    time_ms: float
+
+
+class PlanCache:
+    """LRU cache of up to ``capacity`` results and corridors for ``planner``'s queries.
+
+    ``subpaths=False`` disables answering queries from stretches of cached
+    paths. :attr:`evictions` counts entries dropped for capacity,
+    :attr:`invalidations` those dropped because their cells changed.
+    """
+
+    def __init__(self, planner, capacity=1024, subpaths=True):
+        for name in ("_plan_standard", "_plan_ils", "_plan_ails"):
+            if getattr(type(planner), name) is not getattr(GridPlanner, name):
+                raise TypeError(f"{type(planner).__name__} replaces the GridPlanner pipelines the cache runs")
+        self.planner = planner
+        self.capacity = capacity
+        self.subpaths = subpaths
+        self.version = getattr(planner, "version", 0)
+        self._paths = OrderedDict()
+        self._corridors = OrderedDict()
+        # Cell -> keys of the cached paths through it, for subpath lookups.
+        self._through = {}
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._paths)
+
+    def clear(self):
+        self._paths.clear()
+        self._corridors.clear()
+        self._through.clear()
+
+    def _params(self):
+        p = self.planner
+        return p.ils, p.ails, p.queue
+
+    def plan(self, start, goal, algorithm=None, mode=None):
+        """Planner query through the cache; returns a :class:`~ails.planner.PlanResult`."""
+        p = self.planner
+        start, goal, algorithm, mode = p._check(start, goal, algorithm, mode)
+        t0 = time.perf_counter()
+        p.probe.start()
+        self._sync()
+        key = (start, goal, algorithm, mode, self._params())
+        entry = self._paths.get(key)
+        if entry is not None:
+            self._paths.move_to_end(key)
+            return self._hit(entry, entry.value.path, PATH_HIT, algorithm, mode, t0)
+        if self.subpaths:
+            found = self._subpath(start, goal, key[2:])
+            if found is not None:
+                return self._hit(*found, SUBPATH_HIT, algorithm, mode, t0)
+        if not p.reachable(start, goal):
+            p.probe.cache(MISS)
+            return p._finish(PlanResult(None, math.inf, 0, 0), algorithm, mode, t0)
+        return self._compute(key, start, goal, algorithm, mode, t0)
+
+    def _hit(self, entry, path, outcome, algorithm, mode, t0):
+        p = self.planner
+        cached = entry.value
+        if path is cached.path:
+            cost = cached.cost
+        elif p.costs is not None:
+            cost = p.costs.path_cost([p._flat(c) for c in path])
+        else:
+            cost = path_length(path)
+        result = dataclasses.replace(cached, path=list(path), cost=cost, expanded=0)
+        ms = (time.perf_counter() - t0) * 1e3
+        p.probe.cache(outcome, max(entry.time_ms - ms, 0.0))
+        # Mode "standard" skips smoothing: cached paths already went through it.
+        return p._finish(result, algorithm, "standard", t0)
+
+    def _subpath(self, start, goal, rest):
+        """(entry, stretch) of a cached path of the same kind through both endpoints, or None."""
+        a, b = self._through.get(start), self._through.get(goal)
+        if not a or not b:
+            return None
+        for key in a & b:
+            if key[2:] != rest:
+                continue
+            entry = self._paths[key]
+            path = entry.value.path
+            i, j = path.index(start), path.index(goal)
+            self._paths.move_to_end(key)
+            return entry, path[i:j + 1] if i <= j else path[j:i + 1][::-1]
+        return None
+
+    def _compute(self, key, start, goal, algorithm, mode, t0):
+        p = self.planner
+        search = p._search(algorithm)
+        if mode == "standard":
+            result = p._plan_standard(search, start, goal)
+            box = (0, 0, p.H - 1, p.W - 1)
+            p.probe.cache(MISS)
+        else:
+            xs, ys, cells, strategy, outcome, saved = self._corridor(start, goal, mode)
+            if mode == "ails":
+                result = p._ails_rounds(search, start, goal, cells, strategy)
+                a = p.ails
+                margin = max(p.r_max + result.rounds * a.delta_r, a.omega + 1)
+            else:
+                result = p._ils_rounds(search, start, goal, xs, ys, cells)
+                margin = min(p.w0 + result.rounds * p.ils.delta_w, max(p.H, p.W))
+            box = self._box(xs, ys, margin)
+            p.probe.cache(outcome, saved)
+        result = p._finish(result, algorithm, mode, t0)
+        if result.found:
+            self._store(key, _Entry(dataclasses.replace(result, path=list(result.path)), box, result.time_ms))
+        return result
+
+    def _corridor(self, start, goal, mode):
+        """Line, initial corridor and strategy of a query, from the cache if possible."""
+        p = self.planner
+        key = (start, goal, mode, self._params())
+        entry = self._corridors.get(key)
+        if entry is not None:
+            self._corridors.move_to_end(key)
+            return entry.value + (CORRIDOR_HIT, entry.time_ms)
+        t0 = time.perf_counter()
+        xs, ys = bresenham(start, goal)
+        p.probe.lap(LINE)
+        if mode == "ails":
+            cells, strategy = p._ails_corridor(xs, ys)
+            margin = max(p.r_max, p.ails.omega + 1)
+        else:
+            cells, strategy = ils_corridor(p.occ, xs, ys, p.w0), ""
+            margin = p.w0
+        value = xs, ys, cells, strategy
+        self._corridors[key] = _Entry(value, self._box(xs, ys, margin), (time.perf_counter() - t0) * 1e3)
+        if len(self._corridors) > self.capacity:
+            self._corridors.popitem(last=False)
+            self.evictions += 1
+        return value + (MISS, 0.0)
+
+    def _box(self, xs, ys, margin):
+        p = self.planner
+        return (max(int(xs.min()) - margin, 0), max(int(ys.min()) - margin, 0),
+                min(int(xs.max()) + margin, p.H - 1), min(int(ys.max()) + margin, p.W - 1))
+
+    def _store(self, key, entry):
+        self._paths[key] = entry
+        for cell in entry.value.path:
+            self._through.setdefault(cell, set()).add(key)
+        if len(self._paths) > self.capacity:
+            self._drop(next(iter(self._paths)))
+            self.evictions += 1
+
+    def _drop(self, key):
+        entry = self._paths.pop(key)
+        for cell in entry.value.path:
+            keys = self._through[cell]
+            keys.discard(key)
+            if not keys:
+                del self._through[cell]
+
+    def _sync(self):
+        """Evict entries whose box contains a cell changed since the last lookup."""
+        p = self.planner
+        version = getattr(p, "version", 0)
+        if version == self.version:
+            return
+        cx, cy = np.divmod(np.concatenate(p._log[self.version:]), p.W)
+        self.version = version
+
+        def stale(table):
+            return [key for key, e in table.items()
+                    if np.any((cx >= e.box[0]) & (cx <= e.box[2]) & (cy >= e.box[1]) & (cy <= e.box[3]))]
+
+        for key in stale(self._paths):
+            self._drop(key)
+            self.invalidations += 1
+        for key in stale(self._corridors):
+            del self._corridors[key]
+            self.invalidations += 1
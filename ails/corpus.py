@@ -0,0 +1,195 @@
+"""Single-file, memory-mapped map corpus (e.g. the 6,000 DS1 grids).
+
+Layout::
+
+    MAGIC | block 0 | block 1 | ... | JSON index | index offset (u64) | MAGIC
+
+Each map stores its occupancy plane bit-packed with ``numpy.packbits`` (one
+bit per cell, rows padded to whole bytes) and, optionally, its integral image
+as a raw little-endian array. The JSON index records every block's offset,
+the grid shape and the map metadata (dataset, topology, density, seed and
+start-goal pairs). :class:`Corpus` maps the file and decodes a map only when
+it is asked for, so opening the corpus costs one index parse regardless of
+how many maps it holds.
+
+Usage::
+
+    python -m ails.corpus ds1 data/ds1.ails --integral
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from .datasets import DEFAULT_SEED, SPECS, MapSpec, endpoints, iter_maps
+from .grid import integral_image
+
+MAGIC = b"AILSMAP1"
+_ALIGN = 64
+_TRAILER = struct.Struct("<Q8s")
+
+
+def _pad(f):
+    f.write(b"\0" * (-f.tell() % _ALIGN))
+
+
+def write_corpus(path, maps, integral=False):
+    """Write ``maps``, an iterable of (occ, meta) pairs, to ``path``.
+
+    ``meta`` must be JSON-serialisable. With ``integral=True`` each map's
+    integral image is stored as well, trading space for zero-copy loading.
+    """
+    index = []
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        for occ, meta in maps:
+            occ = np.asarray(occ, dtype=np.uint8)
+            _pad(f)
+            entry = {"shape": list(occ.shape), "bits": f.tell(), "meta": meta}
+            f.write(np.packbits(occ, axis=1).tobytes())
+            if integral:
+                ii = integral_image(occ)
+                _pad(f)
+                entry["ii"] = f.tell()
+                entry["ii_dtype"] = ii.dtype.newbyteorder("<").str
+                f.write(ii.astype(entry["ii_dtype"], copy=False).tobytes())
+            index.append(entry)
+        at = f.tell()
+        f.write(json.dumps(index, separators=(",", ":")).encode())
+        f.write(_TRAILER.pack(at, MAGIC))
+    os.replace(tmp, path)
+
+
+def write_specs(path, specs, integral=False):
+    """Generate the maps of ``specs`` with their start-goal pairs into a corpus."""
+    specs = list(specs)
+
+    def maps():
+        for spec, occ in zip(specs, iter_maps(specs)):
+            pairs = endpoints(spec, occ)
+            meta = {
+                "dataset": spec.dataset, "index": spec.index, "size": spec.size,
+                "density": spec.density, "topology": spec.topology, "seed": spec.seed,
+                "pairs": [[list(s), list(g)] for s, g in pairs],
+                "actual_density": float(occ.mean()),
+            }
+            yield occ, meta
+
+    write_corpus(path, maps(), integral)
+
+
+class Corpus:
+    """Read-only, lazily decoded view of a corpus file.
+
+    Occupancy grids are decoded into fresh arrays, but stored integral
+    images are zero-copy views into the mapping: they must be released
+    before :meth:`close` (or :meth:`integral` called with ``copy=True``).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a map corpus")
+        at, magic = _TRAILER.unpack_from(self._mm, len(self._mm) - _TRAILER.size)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is truncated or corrupt")
+        self.index = json.loads(self._mm[at:len(self._mm) - _TRAILER.size])
+
+    def __len__(self):
+        return len(self.index)
+
+    def meta(self, i):
+        return self.index[i]["meta"]
+
+    def spec(self, i):
+        """The :class:`~ails.datasets.MapSpec` map ``i`` was generated from."""
+        m = self.meta(i)
+        return MapSpec(m["dataset"], m["index"], m["size"], m["density"], m["topology"], m["seed"],
+                       len(m["pairs"]))
+
+    def pairs(self, i):
+        return [(tuple(s), tuple(g)) for s, g in self.meta(i)["pairs"]]
+
+    def occupancy(self, i):
+        """Unpack the occupancy grid of map ``i``."""
+        e = self.index[i]
+        H, W = e["shape"]
+        row = -(-W // 8)
+        bits = np.frombuffer(self._mm, dtype=np.uint8, count=H * row, offset=e["bits"])
+        return np.unpackbits(bits.reshape(H, row), axis=1, count=W)
+
+    def integral(self, i, occ=None, copy=False):
+        """Integral image of map ``i``: a view into the file if stored (a copy with ``copy``), else computed."""
+        e = self.index[i]
+        if "ii" not in e:
+            return integral_image(self.occupancy(i) if occ is None else occ)
+        H, W = e["shape"]
+        ii = np.frombuffer(self._mm, dtype=np.dtype(e["ii_dtype"]), count=(H + 1) * (W + 1),
+                           offset=e["ii"]).reshape(H + 1, W + 1)
+        return ii.copy() if copy else ii
+
+    def __getitem__(self, i):
+        """(occ, ii) of map ``i``, the same pair a shared dataset yields."""
+        occ = self.occupancy(i)
+        return occ, self.integral(i, occ)
+
+    def close(self):
+        """Unmap the file; stored integral images from ``self[i]`` must be released first.
+
+        While such a view is alive the mapping cannot close and ``mmap``
+        raises ``BufferError``, as with
+        :meth:`~ails.shared.SharedDataset.close`.
+        """
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_attached = None
+
+
+def attach(path):
+    """Pool initializer: open the corpus at ``path`` in this worker."""
+    global _attached
+    _attached = Corpus(path)
+
+
+def attached():
+    if _attached is None:
+        raise RuntimeError("no corpus attached in this process")
+    return _attached
+
+
+def detach():
+    """Close the corpus opened via :func:`attach`, if any."""
+    global _attached
+    if _attached is not None:
+        _attached.close()
+        _attached = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a dataset into a map corpus file.")
+    parser.add_argument("dataset", choices=sorted(SPECS))
+    parser.add_argument("path")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--integral", action="store_true", help="also store integral images")
+    args = parser.parse_args(argv)
+    specs = SPECS[args.dataset](args.seed)
+    write_specs(args.path, specs, args.integral)
+    print(f"{len(specs)} maps written to {args.path}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""ILS and AILS corridor construction, strategy selection and fallback expansion."""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+BASE, STANDARD, PREDICTIVE = "base", "standard", "predictive"
+STRATEGIES = (BASE, STANDARD, PREDICTIVE)
+
+# Centre window and the four neighbours of the central differences of
+# eq:gradient: (x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1).
+_DX = np.array([0, 1, -1, 0, 0])[None, :, None]
+_DY = np.array([0, 0, 0, 1, -1])[None, :, None]
+
+
+def square_box(shape, xs, ys, radius):
+    """Bounding box (x0, y0, x1, y1), inclusive, of all balls of ``radius`` on the line."""
+    H, W = shape
+    return (max(int(xs.min()) - radius, 0), max(int(ys.min()) - radius, 0),
+            min(int(xs.max()) + radius, H - 1), min(int(ys.max()) + radius, W - 1))
+
+
+def coverage_counts(box, xs, ys, radii):
+    """How many balls B(p, r(p)) cover each cell of ``box``.
+
+    Each ball is written into a 2-D difference array restricted to the box,
+    so the cost is O(|L| + box area) instead of O(sum (2r + 1)^2) for the
+    nested loops of alg:build_corridor.
+    """
+    bx0, by0, bx1, by1 = box
+    h, w = bx1 - bx0 + 1, by1 - by0 + 1
+    xs = np.asarray(xs, dtype=np.int64)
+    ys = np.asarray(ys, dtype=np.int64)
+    radii = np.broadcast_to(np.asarray(radii, dtype=np.int64), xs.shape)
+    x0 = np.clip(xs - radii - bx0, 0, h)
+    x1 = np.clip(xs + radii + 1 - bx0, 0, h)
+    y0 = np.clip(ys - radii - by0, 0, w)
+    y1 = np.clip(ys + radii + 1 - by0, 0, w)
+    diff = np.zeros((h + 1, w + 1), dtype=np.int32)
+    np.add.at(diff, (x0, y0), 1)
+    np.add.at(diff, (x0, y1), -1)
+    np.add.at(diff, (x1, y0), -1)
+    np.add.at(diff, (x1, y1), 1)
+    return np.cumsum(np.cumsum(diff, axis=0), axis=1)[:h, :w]
+
+
+def free_cells(occ, box, covered):
+    """Flat indices of the free cells marked in ``covered`` (a mask over ``box``)."""
+    bx0, by0, bx1, by1 = box
+    covered = covered & (occ[bx0:bx1 + 1, by0:by1 + 1] == 0)
+    rx, ry = np.nonzero(covered)
+    return (rx + bx0) * occ.shape[1] + (ry + by0)
+
+
+def union_of_squares(occ, xs, ys, radii):
+    """Flat indices of free cells in the union of Chebyshev balls B(p, r(p))."""
+    box = square_box(occ.shape, xs, ys, int(np.max(radii)))
+    return free_cells(occ, box, coverage_counts(box, xs, ys, radii) > 0)
+
+
+def ils_corridor(occ, xs, ys, width):
+    """Uniform-width ILS corridor C(s, g, w) of Definition def:ils_corridor."""
+    return union_of_squares(occ, xs, ys, width)
+
+
+@dataclass
+class DensityProfile:
+    """sigma(p), |grad sigma(p)| and their maxima along a line, one row per omega."""
+
+    omegas: tuple
+    sigma: np.ndarray
+    grad: np.ndarray
+    sigma_max: np.ndarray
+    grad_max: np.ndarray
+
+    def __getitem__(self, omega):
+        """(sigma, grad) for window half-size ``omega``."""
+        k = self.omegas.index(omega)
+        return self.sigma[k], self.grad[k]
+
+    def strategy(self, omega, threshold=0.1):
+        """:func:`select_strategy` for ``omega`` from the precomputed maxima."""
+        k = self.omegas.index(omega)
+        return _strategy(self.sigma_max[k], self.grad_max[k], threshold)
+
+
+def density_profile(ii, xs, ys, omegas):
+    """Multi-scale :class:`DensityProfile` of the line (xs, ys) in one pass.
+
+    The centre window and the four shifted windows of the finite-difference
+    gradient are evaluated for every omega at once: a single gather of the
+    four integral-image corners over an (omega, window, point) array, with
+    the border clamping of :func:`~ails.grid.window_density`.
+    """
+    H, W = ii.shape[0] - 1, ii.shape[1] - 1
+    omegas = tuple(int(w) for w in np.atleast_1d(omegas))
+    om = np.asarray(omegas, dtype=np.int64)[:, None, None]
+    cx = np.asarray(xs, dtype=np.int64)[None, None, :] + _DX
+    cy = np.asarray(ys, dtype=np.int64)[None, None, :] + _DY
+    x0 = np.clip(cx - om, 0, H)
+    x1 = np.clip(cx + om + 1, 0, H)
+    y0 = np.clip(cy - om, 0, W)
+    y1 = np.clip(cy + om + 1, 0, W)
+    if isinstance(ii, np.ndarray):
+        # Flat gathers: one take per corner rather than 2-D fancy indexing.
+        flat = ii.reshape(-1)
+        r0, r1 = x0 * (W + 1), x1 * (W + 1)
+        count = flat.take(r1 + y1) - flat.take(r0 + y1) - flat.take(r1 + y0) + flat.take(r0 + y0)
+    else:
+        # Any table indexable as ii[x, y], e.g. the Fenwick tree of DynamicPlanner.
+        count = ii[x1, y1] - ii[x0, y1] - ii[x1, y0] + ii[x0, y0]
+    density = count / np.maximum((x1 - x0) * (y1 - y0), 1)
+    sigma = density[:, 0]
+    grad = np.hypot(density[:, 1] - density[:, 2], density[:, 3] - density[:, 4]) / 2
+    empty = sigma.shape[1] == 0
+    return DensityProfile(omegas, sigma, grad,
+                          np.zeros(len(omegas)) if empty else sigma.max(axis=1),
+                          np.zeros(len(omegas)) if empty else grad.max(axis=1))
+
+
+def line_profile(ii, xs, ys, omega):
+    """Density sigma(p) and gradient magnitude |grad sigma(p)| along the line."""
+    return density_profile(ii, xs, ys, (omega,))[omega]
+
+
+def _strategy(sigma_max, grad_max, threshold):
+    if not sigma_max > 0:
+        return BASE
+    if grad_max < threshold:
+        return STANDARD
+    return PREDICTIVE
+
+
+def select_strategy(sigma, grad, threshold=0.1):
+    """Pick the Base, Standard or Predictive strategy (subsec:strategy_selection)."""
+    return _strategy(sigma.max(), grad.max(), threshold)
+
+
+def adaptive_radii(sigma, grad, strategy, r_min, r_max, alpha=1.0, beta=0.3):
+    """Per-point radius r(p) from eq:radius_standard or eq:radius_gradient."""
+    if strategy == BASE:
+        return np.full(sigma.shape, r_min, dtype=np.int64)
+    if strategy == PREDICTIVE:
+        sigma = np.clip(sigma + beta * grad, 0.0, 1.0)
+    return r_min + np.floor((r_max - r_min) * sigma ** alpha).astype(np.int64)
+
+
+def expand_corridor(occ, cells, delta_r):
+    """Local AILS fallback (eq:ails_expansion): add free cells within delta_r.
+
+    Works on the bounding box of the corridor grown by ``delta_r``; a box
+    filter over the corridor mask marks every cell with a corridor cell in
+    its Chebyshev neighbourhood.
+    """
+    H, W = occ.shape
+    xs, ys = np.divmod(cells, W)
+    bx0 = max(int(xs.min()) - delta_r, 0)
+    bx1 = min(int(xs.max()) + delta_r, H - 1)
+    by0 = max(int(ys.min()) - delta_r, 0)
+    by1 = min(int(ys.max()) + delta_r, W - 1)
+    h, w = bx1 - bx0 + 1, by1 - by0 + 1
+    mask = np.zeros((h + 2 * delta_r, w + 2 * delta_r), dtype=np.int32)
+    mask[xs - bx0 + delta_r, ys - by0 + delta_r] = 1
+    k = 2 * delta_r + 1
+    sat = np.zeros((mask.shape[0] + 1, mask.shape[1] + 1), dtype=np.int32)
+    np.cumsum(np.cumsum(mask, axis=0), axis=1, out=sat[1:, 1:])
+    near = (sat[k:, k:] - sat[:-k, k:] - sat[k:, :-k] + sat[:-k, :-k]) > 0
+    near &= occ[bx0:bx1 + 1, by0:by1 + 1] == 0
+    rx, ry = np.nonzero(near)
+    return (rx + bx0) * W + (ry + by0)
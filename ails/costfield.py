@@ -0,0 +1,108 @@
+"""Precomputed edge costs for risk-annotated grids.
+
+A risk raster rho assigns every cell an exposure value in [0, 1]. Moving
+between neighbours v and v' then costs
+
+    w(v, v') = d(v, v') * (1 + lambda * (rho(v) + rho(v')) / 2),
+
+the step length of eq:cost_8conn plus ``lambda`` times the exposure
+accumulated along the step. Because every step costs at least its length,
+the octile heuristic stays admissible and A* stays optimal.
+
+:class:`CostField` evaluates w for every cell and each of the eight
+directions of :data:`~ails.grid.DIRS` once per map. It stores the result as
+an (H*W, 8) float32 tensor, or as uint16 with a fixed scale to halve the
+memory. Both are rounded up so no step gets cheaper than its length. A
+:class:`~ails.planner.GridPlanner` built with ``costs=`` copies the tensor
+into its adjacency lists, so searches read risk-weighted costs exactly as
+they read unit costs and run at the same speed.
+"""
+
+import numpy as np
+
+from .grid import DIR_COSTS, DIRS, as_grid
+from .raster import greyscale, open_raster
+
+
+def load_risk(path):
+    """Risk raster in [0, 1] from an 8-bit image (see :func:`ails.raster.open_raster`)."""
+    return greyscale(np.asarray(open_raster(path))).astype(np.float32) / 255
+
+
+class CostField:
+    """Per-direction edge-cost tensor of one grid and risk raster.
+
+    ``risk`` has the grid's shape; integer rasters are scaled by their
+    dtype's maximum, float rasters must already lie in [0, 1]. ``weight`` is
+    lambda. With ``quantize`` the costs are stored as uint16 multiples of
+    ``1 / scale``, which needs every cost below 65536 (``weight`` up to
+    about 46,000).
+    """
+
+    def __init__(self, grid, risk, weight=1.0, quantize=False):
+        occ = as_grid(grid)
+        H, W = occ.shape
+        risk = np.asarray(risk)
+        if risk.shape != occ.shape:
+            raise ValueError(f"risk raster has shape {risk.shape}, expected {occ.shape}")
+        if np.issubdtype(risk.dtype, np.integer):
+            risk = risk / np.iinfo(risk.dtype).max
+        risk = risk.astype(np.float64)
+        if risk.size and (risk.min() < 0 or risk.max() > 1):
+            raise ValueError("risk values must lie in [0, 1]")
+        if weight < 0:
+            raise ValueError("risk weight must be non-negative")
+        self.shape = occ.shape
+        self.weight = float(weight)
+        self.risk = risk.astype(np.float32)
+        # Edge-padded so that border directions get a finite (unused) value.
+        padded = np.pad(risk, 1, mode="edge")
+        cost = np.empty((H, W, 8))
+        for k, (dx, dy) in enumerate(DIRS):
+            near = padded[1 + dx:H + 1 + dx, 1 + dy:W + 1 + dy]
+            cost[..., k] = DIR_COSTS[k] * (1 + weight * (risk + near) / 2)
+        cost = cost.reshape(H * W, 8)
+        if quantize:
+            top = np.ceil(cost.max())
+            if top > np.iinfo(np.uint16).max:
+                # Not even a scale of 1 fits: quantised costs would wrap around.
+                raise ValueError(f"edge costs up to {top:.0f} do not fit uint16; "
+                                 "lower the weight or use quantize=False")
+            self.scale = float(np.iinfo(np.uint16).max // top)
+            self.costs = np.ceil(cost * self.scale).astype(np.uint16)
+        else:
+            self.scale = 1.0
+            costs = cost.astype(np.float32)
+            self.costs = np.where(costs < cost, np.nextafter(costs, np.float32(np.inf)), costs)
+
+    @property
+    def nbytes(self):
+        return self.costs.nbytes
+
+    def values(self, cells=None):
+        """Edge costs as float64, for all cells or the flat indices ``cells``."""
+        costs = self.costs if cells is None else self.costs[cells]
+        return costs / self.scale if self.scale != 1.0 else costs.astype(np.float64)
+
+    def path_cost(self, path):
+        """Total w along a flat-index path of neighbouring cells."""
+        if len(path) < 2:
+            return 0.0
+        W = self.shape[1]
+        path = np.asarray(path, dtype=np.int64)
+        dx, dy = np.divmod(path[1:], W)
+        px, py = np.divmod(path[:-1], W)
+        lookup = np.full((3, 3), -1, dtype=np.int64)
+        for k, (ex, ey) in enumerate(DIRS):
+            lookup[ex + 1, ey + 1] = k
+        k = lookup[dx - px + 1, dy - py + 1]
+        if np.any(k < 0):
+            raise ValueError("path cells are not neighbours")
+        return float(np.sum(self.values(path[:-1])[np.arange(len(k)), k]))
+
+    def exposure(self, path):
+        """Cumulative exposure: the sum of rho over the cells of ``path`` ((x, y) tuples)."""
+        if not path:
+            return 0.0
+        xs, ys = np.asarray(path, dtype=np.int64).T
+        return float(np.sum(self.risk[xs, ys], dtype=np.float64))
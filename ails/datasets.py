@@ -0,0 +1,171 @@
+"""DS1-DS3 map specifications, seed policy and start-goal assignment.
+
+A :class:`MapSpec` names one generated grid. Its ``seed`` is derived from the
+global experiment seed and the map's configuration (subsec:protocol), so any
+map can be regenerated independently, in any process and in any order.
+"""
+
+import hashlib
+from dataclasses import dataclass
+
+import numpy as np
+
+from .maps import generate_maps, random_maps
+from .grid import component_labels
+from .shared import SharedDataset
+
+DEFAULT_SEED = 2025
+
+DS1_SIZE = 200
+DS1_DENSITIES = (0.10, 0.20, 0.30)
+DS1_MAPS = 2000
+
+DS2_SIZES = (50, 100, 150, 200, 250, 300, 400, 500)
+DS2_DENSITIES = (0.10, 0.15, 0.20, 0.25, 0.30, 0.35, 0.40)
+
+DS3_SIZE = 200
+DS3_DENSITIES = (0.10, 0.20, 0.30, 0.40)
+DS3_TOPOLOGIES = ("random", "clustered", "maze", "room", "open")
+
+PAIRS = 100
+DENSITY_TOLERANCE = 0.01
+
+
+def config_seed(seed, *key):
+    """Deterministic 64-bit seed for a configuration key.
+
+    Uses a cryptographic digest rather than ``hash`` so the value is stable
+    across processes and interpreter runs.
+    """
+    digest = hashlib.blake2b(repr((seed,) + key).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+@dataclass(frozen=True)
+class MapSpec:
+    """One generated grid together with its start-goal sampling policy."""
+
+    dataset: str
+    index: int
+    size: int
+    density: float
+    topology: str
+    seed: int
+    pairs: int = 1
+
+    @property
+    def key(self):
+        return f"{self.dataset}/{self.topology}/{self.size}/{self.density:.2f}/{self.index}"
+
+
+def ds1_specs(seed=DEFAULT_SEED, maps=DS1_MAPS, densities=DS1_DENSITIES):
+    """DS1: 200x200 Bernoulli grids, corner-to-corner, ``maps`` per density."""
+    return [
+        MapSpec("ds1", i, DS1_SIZE, d, "random", config_seed(seed, "ds1", d, i))
+        for d in densities
+        for i in range(maps)
+    ]
+
+
+def ds2_specs(seed=DEFAULT_SEED, sizes=DS2_SIZES, densities=DS2_DENSITIES, pairs=PAIRS):
+    """DS2: one grid per size-density configuration with ``pairs`` random queries."""
+    return [
+        MapSpec("ds2", 0, n, d, "random", config_seed(seed, "ds2", n, d), pairs)
+        for n in sizes
+        for d in densities
+    ]
+
+
+def ds3_specs(seed=DEFAULT_SEED, topologies=DS3_TOPOLOGIES, densities=DS3_DENSITIES, pairs=PAIRS):
+    """DS3: one 200x200 grid per topology-density configuration."""
+    return [
+        MapSpec("ds3", 0, DS3_SIZE, d, t, config_seed(seed, "ds3", t, d), pairs)
+        for t in topologies
+        for d in densities
+    ]
+
+
+SPECS = {"ds1": ds1_specs, "ds2": ds2_specs, "ds3": ds3_specs}
+
+
+def build_map(spec):
+    """Generate the grid of ``spec`` (preprocessing Steps 1, 4 and 5)."""
+    return build_maps([spec])[0]
+
+
+def build_maps(specs):
+    """Grids of ``specs`` as one (len(specs), H, W) stack; all must share a size.
+
+    Specs of the same dataset family, topology and density are generated
+    together (:func:`~ails.maps.random_maps`,
+    :func:`~ails.maps.generate_maps`), each map still from a generator
+    seeded with its own ``spec.seed``, so every grid equals what
+    :func:`build_map` returns for its spec alone.
+    """
+    sizes = {spec.size for spec in specs}
+    if len(sizes) > 1:
+        raise ValueError(f"build_maps needs specs of one size, got {sorted(sizes)}")
+    shape = (sizes.pop(),) * 2 if specs else (0, 0)
+    out = np.empty((len(specs),) + shape, dtype=np.uint8)
+    groups = {}
+    for i, spec in enumerate(specs):
+        groups.setdefault((spec.dataset == "ds1", spec.topology, spec.density), []).append(i)
+    for (ds1, topology, density), idx in groups.items():
+        rngs = [np.random.default_rng(specs[i].seed) for i in idx]
+        # Step 5: only topologies whose density is a free parameter are
+        # checked, and clustered maps block an exact cell count by construction.
+        if topology != "random":
+            out[idx] = generate_maps(topology, rngs, shape, density)
+            continue
+        free = None
+        if ds1:
+            # Keep the top row and rightmost column free (DS1 specification).
+            free = np.zeros(shape, dtype=bool)
+            free[0, :] = free[:, -1] = True
+        out[idx] = random_maps(rngs, len(idx), shape, density, DENSITY_TOLERANCE, free)
+    return out
+
+
+def iter_maps(specs, batch=256):
+    """Grids of ``specs`` in order, built :func:`build_maps` ``batch`` specs of one size at a time."""
+    run = []
+    for spec in specs:
+        if run and (len(run) == batch or spec.size != run[0].size):
+            yield from build_maps(run)
+            run = []
+        run.append(spec)
+    if run:
+        yield from build_maps(run)
+
+
+def endpoints(spec, occ, labels=None):
+    """Start-goal pairs for ``spec`` (Steps 6 and 7).
+
+    DS1 uses the fixed corners. Otherwise pairs are drawn from free cells
+    with a generator seeded from the map seed, and pairs whose cells lie in
+    different connected components are discarded and redrawn. ``labels``
+    may pass in the map's :func:`~ails.grid.component_labels`.
+    """
+    H, W = occ.shape
+    if spec.dataset == "ds1":
+        return [((0, 0), (H - 1, W - 1))]
+    rng = np.random.default_rng(config_seed(spec.seed, "pairs"))
+    free = np.flatnonzero(occ.ravel() == 0)
+    labels = (component_labels(occ) if labels is None else labels).ravel()
+    pairs = []
+    attempts = 0
+    while len(pairs) < spec.pairs and attempts < 50 * spec.pairs:
+        attempts += 1
+        s, g = (int(u) for u in rng.choice(free, 2, replace=False))
+        if labels[s] == labels[g]:
+            pairs.append((divmod(s, W), divmod(g, W)))
+    return pairs
+
+
+def load_shared(specs):
+    """Build the maps of ``specs`` into one :class:`~ails.shared.SharedDataset`.
+
+    Index ``i`` of the returned dataset holds the grid of ``specs[i]``. DS4
+    grids can be placed alongside by constructing the dataset directly.
+    """
+    return SharedDataset(list(iter_maps(specs)))
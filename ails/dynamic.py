@@ -0,0 +1,232 @@
+"""Dynamic maps: incremental density and corridor maintenance under updates.
+
+:class:`DynamicPlanner` keeps the obstacle counts in a 2-D Fenwick tree
+instead of a summed-area table, so a batch of k cell changes costs
+O(k log H log W) rather than the O(|V|) rebuild of alg:ails_main. Queries
+registered with :meth:`DynamicPlanner.track` keep their reference line,
+density profile, radii and corridor coverage counts; on :meth:`replan` only
+line cells whose density window (or gradient stencil) contains a changed
+cell are re-queried, and only balls whose radius actually changed are
+removed and repainted. The remaining work is the constrained search itself.
+"""
+
+import math
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from .corridor import adaptive_radii, coverage_counts, free_cells, line_profile, select_strategy, square_box
+from .grid import DIR_COSTS, bresenham, component_labels, neighbour_rows
+from .planner import GridPlanner, PlanResult
+
+
+class Fenwick2D:
+    """Binary indexed tree over an occupancy grid.
+
+    Indexing mirrors :func:`ails.grid.integral_image`: ``tree[x, y]`` is the
+    number of obstacles in ``occ[:x, :y]``, so it can stand in for an
+    integral image wherever only prefix lookups are made.
+    """
+
+    def __init__(self, occ):
+        H, W = occ.shape
+        self.shape = (H + 1, W + 1)
+        ii = np.zeros(self.shape, dtype=np.int64)
+        np.cumsum(np.cumsum(occ, axis=0, dtype=np.int64), axis=1, out=ii[1:, 1:])
+        i = np.arange(H + 1)[:, None]
+        j = np.arange(W + 1)[None, :]
+        li, lj = i - (i & -i), j - (j & -j)
+        # Node (i, j) covers rows (i - lowbit(i), i] x cols (j - lowbit(j), j].
+        self.tree = ii[i, j] - ii[li, j] - ii[i, lj] + ii[li, lj]
+        self.tree[0, :] = 0
+        self.tree[:, 0] = 0
+
+    def __getitem__(self, key):
+        xs, ys = np.broadcast_arrays(*(np.asarray(k, dtype=np.int64) for k in key))
+        H, W = self.shape[0] - 1, self.shape[1] - 1
+        i = np.where(xs < 0, xs + H + 1, xs).ravel()
+        j0 = np.where(ys < 0, ys + W + 1, ys).ravel()
+        total = np.zeros(i.shape, dtype=np.int64)
+        pos = np.arange(len(i))
+        while len(pos):
+            j, jp = j0[pos], pos
+            ip = i[pos]
+            while len(jp):
+                total[jp] += self.tree[ip, j]
+                j = j & (j - 1)
+                keep = j > 0
+                j, jp, ip = j[keep], jp[keep], ip[keep]
+            i[pos] &= i[pos] - 1
+            pos = pos[i[pos] > 0]
+        out = total.reshape(xs.shape)
+        return out[()] if out.ndim == 0 else out
+
+    def add(self, xs, ys, deltas):
+        """Add ``deltas`` to the cells (xs, ys)."""
+        H, W = self.shape[0] - 1, self.shape[1] - 1
+        i = np.asarray(xs, dtype=np.int64) + 1
+        j0 = np.asarray(ys, dtype=np.int64) + 1
+        d = np.asarray(deltas, dtype=np.int64)
+        while len(i):
+            j, ij, dj = j0, i, d
+            while len(j):
+                np.add.at(self.tree, (ij, j), dj)
+                j = j + (j & -j)
+                keep = j <= W
+                j, ij, dj = j[keep], ij[keep], dj[keep]
+            i = i + (i & -i)
+            keep = i <= H
+            i, j0, d = i[keep], j0[keep], d[keep]
+
+
+@dataclass
+class TrackedQuery:
+    """Corridor state of a query kept alive across map updates."""
+
+    start: tuple
+    goal: tuple
+    mode: str
+    xs: np.ndarray
+    ys: np.ndarray
+    sigma: np.ndarray
+    grad: np.ndarray
+    strategy: str
+    radii: np.ndarray
+    box: tuple
+    coverage: np.ndarray
+    version: int
+
+
+class DynamicPlanner(GridPlanner):
+    """:class:`GridPlanner` whose grid can change between queries."""
+
+    def __init__(self, grid, algorithm="astar", mode="ails", ils=None, ails=None, probe=None, costs=None,
+                 queue="heap"):
+        super().__init__(np.array(grid, dtype=np.uint8), algorithm, mode, ils, ails, probe=probe, costs=costs,
+                         queue=queue)
+        self.ii = Fenwick2D(self.occ)
+        self.version = 0
+        self._log = []
+        self._labels_stale = False
+
+    def update(self, cells, blocked=1):
+        """Set the occupancy of ``cells`` ((x, y) pairs) and return how many changed.
+
+        Later entries win when a cell is listed twice. Density counts,
+        neighbour rows of the changed cells and their 8 neighbours, and the
+        free-cell count are patched in place.
+        """
+        cells = np.asarray(cells, dtype=np.int64).reshape(-1, 2)
+        vals = np.broadcast_to(np.asarray(blocked, dtype=np.uint8), len(cells))
+        flat = cells[:, 0] * self.W + cells[:, 1]
+        _, last = np.unique(flat[::-1], return_index=True)
+        keep = len(flat) - 1 - last
+        flat, vals = flat[keep], vals[keep]
+        xs, ys = np.divmod(flat, self.W)
+        changed = self.occ[xs, ys] != vals
+        if not changed.any():
+            return 0
+        flat, xs, ys, vals = flat[changed], xs[changed], ys[changed], vals[changed]
+        delta = vals.astype(np.int64) - self.occ[xs, ys]
+        self.occ[xs, ys] = vals
+        self.ii.add(xs, ys, delta)
+        self.n_free -= int(delta.sum())
+        # Blocking only splits components, so the labels stay a sound
+        # unreachability test; a freed cell may join components and forces
+        # a relabel at the next reachability query.
+        self.labels[xs, ys] = np.where(vals == 1, -1, self.labels[xs, ys])
+        self._labels_stale |= bool((delta < 0).any())
+
+        near = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                x, y = xs + dx, ys + dy
+                inside = (x >= 0) & (x < self.H) & (y >= 0) & (y < self.W)
+                near.append(x[inside] * self.W + y[inside])
+        near = np.unique(np.concatenate(near))
+        rows = neighbour_rows(self.occ, near)
+        self.table[near] = rows
+        costs = [DIR_COSTS] * len(near) if self.costs is None else self.costs.values(near).tolist()
+        for u, row, crow in zip(near.tolist(), rows.tolist(), costs):
+            self.adj[u] = [(v, c) for v, c in zip(row, crow) if v >= 0]
+
+        self._log.append(flat)
+        self.version += 1
+        return len(flat)
+
+    def reachable(self, start, goal):
+        if self._labels_stale:
+            self.labels = component_labels(self.occ)
+            self._labels_stale = False
+        return super().reachable(start, goal)
+
+    def track(self, start, goal, mode=None):
+        """Build and remember the corridor state of an ILS or AILS query."""
+        start, goal, _, mode = self._check(start, goal, None, mode)
+        if mode == "standard":
+            raise ValueError("only ILS and AILS queries have a corridor to track")
+        xs, ys = bresenham(start, goal)
+        if mode == "ails":
+            p = self.ails
+            sigma, grad = line_profile(self.ii, xs, ys, p.omega)
+            strategy = select_strategy(sigma, grad, p.grad_threshold)
+            # r_min is clamped to r_max as in GridPlanner._ails_corridor.
+            radii = adaptive_radii(sigma, grad, strategy, min(p.r_min, self.r_max), self.r_max, p.alpha, p.beta)
+            reach = self.r_max
+        else:
+            sigma = grad = None
+            strategy = ""
+            radii = np.full(len(xs), self.w0, dtype=np.int64)
+            reach = self.w0
+        box = square_box(self.occ.shape, xs, ys, reach)
+        coverage = coverage_counts(box, xs, ys, radii)
+        return TrackedQuery(start, goal, mode, xs, ys, sigma, grad, strategy, radii, box, coverage,
+                            self.version)
+
+    def _paint(self, q, i, r, sign):
+        bx0, by0, bx1, by1 = q.box
+        x, y = int(q.xs[i]) - bx0, int(q.ys[i]) - by0
+        q.coverage[max(x - r, 0):x + r + 1, max(y - r, 0):y + r + 1] += sign
+
+    def _refresh(self, q):
+        """Bring ``q`` up to the current map version."""
+        if q.version == self.version:
+            return
+        changed = np.concatenate(self._log[q.version:])
+        q.version = self.version
+        if q.mode != "ails":
+            return
+        p = self.ails
+        cx, cy = np.divmod(changed, self.W)
+        reach = p.omega + 1
+        near = np.zeros(len(q.xs), dtype=bool)
+        for lo in range(0, len(cx), 1024):
+            bx, by = cx[lo:lo + 1024], cy[lo:lo + 1024]
+            near |= ((np.abs(q.xs[:, None] - bx) <= reach) & (np.abs(q.ys[:, None] - by) <= reach)).any(axis=1)
+        idx = np.flatnonzero(near)
+        if not len(idx):
+            return
+        q.sigma[idx], q.grad[idx] = line_profile(self.ii, q.xs[idx], q.ys[idx], p.omega)
+        q.strategy = select_strategy(q.sigma, q.grad, p.grad_threshold)
+        radii = adaptive_radii(q.sigma, q.grad, q.strategy, min(p.r_min, self.r_max), self.r_max, p.alpha, p.beta)
+        for i in np.flatnonzero(radii != q.radii).tolist():
+            self._paint(q, i, int(q.radii[i]), -1)
+            self._paint(q, i, int(radii[i]), 1)
+        q.radii = radii
+
+    def replan(self, q, algorithm=None):
+        """Re-solve a tracked query on the current map."""
+        start, goal, algorithm, mode = self._check(q.start, q.goal, algorithm, q.mode)
+        t0 = time.perf_counter()
+        self.probe.start()
+        self._refresh(q)
+        if not self.reachable(start, goal):
+            return self._finish(PlanResult(None, math.inf, 0, 0), algorithm, mode, t0)
+        cells = free_cells(self.occ, q.box, q.coverage > 0)
+        search = self._search(algorithm)
+        if mode == "ails":
+            result = self._ails_rounds(search, start, goal, cells, q.strategy)
+        else:
+            result = self._ils_rounds(search, start, goal, q.xs, q.ys, cells)
+        return self._finish(result, algorithm, mode, t0)
@@ -0,0 +1,250 @@
+"""Process-pool experiment runner with an append-only, resumable result store.
+
+A job is one :class:`~ails.datasets.MapSpec`: the worker regenerates the map
+from its seed, builds one :class:`~ails.planner.GridPlanner` and runs every
+start-goal pair under every algorithm and pipeline, timing each query
+``repeats`` times and keeping the median (subsec:protocol). Jobs carry only
+their spec, never the grid, and all randomness comes from the spec seed, so
+the deterministic columns are identical whether the jobs run serially or in
+any order across any number of processes.
+
+Usage::
+
+    python -m ails.experiments ds1 results/ds1.jsonl --workers 8
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+
+import numpy as np
+
+from .datasets import DEFAULT_SEED, SPECS, build_map, endpoints, load_shared
+from .instrument import COLUMNS as PROBE_COLUMNS, Probe
+from .planner import MODES, GridPlanner
+from .search import ALGORITHMS, CLASSICAL
+from . import corpus as _corpus, shared as _shared
+
+COLUMNS = (
+    "key", "dataset", "topology", "size", "density", "seed", "pair",
+    "start_x", "start_y", "goal_x", "goal_y", "algorithm", "mode",
+    "found", "cost", "expanded", "corridor_size", "rounds", "strategy", "time_ms",
+)
+
+
+def _freeze(value):
+    """JSON lists back to (nested) tuples, so stored job keys are hashable."""
+    return tuple(map(_freeze, value)) if isinstance(value, list) else value
+
+
+class ResultStore:
+    """Append-only JSON-lines file holding one line per completed job.
+
+    A job's records are written as a single line and flushed, so a crash can
+    at worst leave one truncated trailing line; :meth:`completed` drops it,
+    which makes the file its own checkpoint. A job key is any JSON value;
+    lists come back from :meth:`completed` as tuples.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def _lines(self):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, "rb") as f:
+            data = f.read()
+        lines = data.split(b"\n")
+        if lines and lines[-1]:
+            # Truncated final write from an interrupted run.
+            with open(self.path, "r+b") as f:
+                f.truncate(len(data) - len(lines[-1]))
+        return [json.loads(line) for line in lines[:-1] if line]
+
+    def completed(self):
+        """Keys of the jobs already present in the store."""
+        return {_freeze(entry["job"]) for entry in self._lines()}
+
+    def append(self, job, records):
+        line = json.dumps({"job": job, "records": records}, separators=(",", ":"))
+        with open(self.path, "a") as f:
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def load(self, columns=COLUMNS, order=("key", "pair", "algorithm", "mode")):
+        """All records as a dict of column arrays, sorted by the ``order`` columns.
+
+        Instrumentation columns are included when every record carries them.
+        Stores written by other runners (e.g. :mod:`ails.ablation`) pass
+        their own ``columns`` and ``order``.
+        """
+        records = [r for entry in self._lines() for r in entry["records"]]
+        records.sort(key=lambda r: tuple(r[c] for c in order))
+        extra = tuple(c for c in PROBE_COLUMNS if records and all(c in r for r in records))
+        return {c: np.array([r[c] for r in records]) for c in tuple(columns) + extra}
+
+
+def run_job(spec, algorithms, modes, repeats=3, grid=None, pairs=None, instrument=False, cells=None):
+    """Run every pair x algorithm x pipeline of one map and return the records.
+
+    ``grid`` is an optional (occ, ii) pair or (occ, ii, table) triple, e.g.
+    views into shared memory or a corpus; without it the map is regenerated
+    from the spec seed.
+    ``pairs`` overrides the sampled start-goal pairs. With ``instrument``
+    each record also carries the median phase timings and the open-list
+    peak (:data:`ails.instrument.COLUMNS`). The integral image is built once
+    per map, so ``integral_ms`` is its time split evenly over the map's
+    records and sums to the per-map cost. ``cells`` restricts the run to
+    those (algorithm, mode) pairs.
+    """
+    probe = Probe() if instrument else None
+    if grid is None:
+        planner = GridPlanner(build_map(spec), probe=probe)
+    else:
+        planner = GridPlanner(grid[0], ii=grid[1], probe=probe, table=grid[2] if len(grid) > 2 else None)
+    occ = planner.occ
+    records = []
+    if pairs is None:
+        pairs = endpoints(spec, occ, planner.labels)
+    for pair, (s, g) in enumerate(pairs):
+        for algorithm in algorithms:
+            for mode in modes:
+                if cells is not None and (algorithm, mode) not in cells:
+                    continue
+                runs = [planner.plan(s, g, algorithm, mode) for _ in range(repeats)]
+                r = runs[0]
+                record = {
+                    "key": spec.key, "dataset": spec.dataset, "topology": spec.topology,
+                    "size": spec.size, "density": spec.density, "seed": spec.seed, "pair": pair,
+                    "start_x": s[0], "start_y": s[1], "goal_x": g[0], "goal_y": g[1],
+                    "algorithm": algorithm, "mode": mode,
+                    "found": r.found, "cost": r.cost, "expanded": r.expanded,
+                    "corridor_size": r.corridor_size, "rounds": r.rounds, "strategy": r.strategy,
+                    "time_ms": statistics.median(run.time_ms for run in runs),
+                }
+                if probe is not None:
+                    rows = [probe.row(i) for i in range(len(probe))]
+                    record.update({c: statistics.median(row[c] for row in rows) for c in PROBE_COLUMNS})
+                    probe.clear()
+                records.append(record)
+    if probe is not None:
+        for record in records:
+            record["integral_ms"] = probe.integral_ms / len(records)
+    return spec.key, records
+
+
+def _grid_source(source, index):
+    """(grid, pairs) for a job, or (None, None) to regenerate from the seed."""
+    if source == "shared":
+        dataset = _shared.attached()
+        return dataset[index] + (dataset.table(index),), None
+    if source == "corpus":
+        corpus = _corpus.attached()
+        return corpus[index], corpus.pairs(index)
+    return None, None
+
+
+def _run_job(args):
+    source, index, spec, cells, repeats, instrument = args
+    grid, pairs = _grid_source(source, index)
+    algorithms = tuple(dict.fromkeys(a for a, _ in cells))
+    modes = tuple(dict.fromkeys(m for _, m in cells))
+    key, records = run_job(spec, algorithms, modes, repeats, grid, pairs, instrument, set(cells))
+    return (key, cells), records
+
+
+def _done_cells(store):
+    """(map key, algorithm, mode) triples already in ``store``.
+
+    Jobs are keyed by the map key and the (algorithm, mode) pairs they ran,
+    so a rerun with more algorithms or modes only runs the missing ones.
+    """
+    return {(key, a, m) for key, cells in store.completed() for a, m in cells}
+
+
+def run_experiment(specs, store, algorithms=CLASSICAL, modes=MODES, workers=None, repeats=3,
+                   shared=None, corpus=None, instrument=False):
+    """Run all ``specs`` not yet in ``store`` and append their results.
+
+    ``workers=1`` runs in-process; otherwise jobs are spread over a process
+    pool and stored in completion order. Maps come from one of:
+
+    * ``shared``: a :class:`~ails.shared.SharedDataset` whose map ``i``
+      belongs to ``specs[i]`` (see :func:`~ails.datasets.load_shared`);
+    * ``corpus``: the path of a :mod:`ails.corpus` file, which also supplies
+      the start-goal pairs; ``specs=None`` runs every map in it;
+    * otherwise each job regenerates its map from the spec seed.
+
+    Workers attach to a shared dataset or corpus once, and each task carries
+    only its map index. ``instrument`` is passed on to :func:`run_job`.
+    Resume works per (map, algorithm, mode): a job runs the pairs of its map
+    missing from ``store``. Returns the number of jobs run.
+    """
+    if not isinstance(store, ResultStore):
+        store = ResultStore(store)
+    if corpus is not None:
+        source, init, initargs, fini = "corpus", _corpus.attach, (corpus,), _corpus.detach
+        if specs is None:
+            with _corpus.Corpus(corpus) as c:
+                specs = [c.spec(i) for i in range(len(c))]
+    elif shared is not None:
+        source, init, initargs, fini = "shared", _shared.attach, (shared.handle,), _shared.detach
+    else:
+        source, init, initargs, fini = None, None, (), None
+    done = _done_cells(store)
+    todo = []
+    for i, spec in enumerate(specs):
+        cells = tuple((a, m) for a in algorithms for m in modes if (spec.key, a, m) not in done)
+        if cells:
+            todo.append((source, i, spec, cells, repeats, instrument))
+    if workers == 1:
+        if init is not None:
+            init(*initargs)
+        try:
+            for job in todo:
+                store.append(*_run_job(job))
+        finally:
+            if fini is not None:
+                fini()
+        return len(todo)
+    with multiprocessing.Pool(workers, initializer=init, initargs=initargs) as pool:
+        for key, records in pool.imap_unordered(_run_job, todo):
+            store.append(key, records)
+    return len(todo)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("dataset", help=f"one of {sorted(SPECS)}, or the path of a map corpus")
+    parser.add_argument("store", help="append-only results file (JSON lines)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--algorithms", nargs="+", default=list(CLASSICAL), choices=sorted(ALGORITHMS))
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    parser.add_argument("--shared", action="store_true",
+                        help="build all maps once in shared memory instead of per worker")
+    parser.add_argument("--instrument", action="store_true",
+                        help="also record phase timings and open-list peaks")
+    args = parser.parse_args(argv)
+    if args.dataset not in SPECS:
+        n = run_experiment(None, args.store, args.algorithms, args.modes, args.workers, args.repeats,
+                           corpus=args.dataset, instrument=args.instrument)
+        print(f"{n} jobs run, results in {args.store}", flush=True)
+        return
+    specs = SPECS[args.dataset](args.seed)
+    if args.shared:
+        with load_shared(specs) as shared:
+            n = run_experiment(specs, args.store, args.algorithms, args.modes, args.workers,
+                               args.repeats, shared, instrument=args.instrument)
+    else:
+        n = run_experiment(specs, args.store, args.algorithms, args.modes, args.workers, args.repeats,
+                           instrument=args.instrument)
+    print(f"{n} jobs run, results in {args.store}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
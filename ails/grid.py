@@ -0,0 +1,235 @@
+"""Grid primitives shared by the baseline, ILS and AILS pipelines (Section 3.3)."""
+
+import math
+
+import numpy as np
+
+SQRT2 = math.sqrt(2.0)
+
+# 8-connected moves: four cardinal, then four diagonal (eq:cost_8conn).
+DIRS = ((-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1))
+DIR_COSTS = (1.0, 1.0, 1.0, 1.0, SQRT2, SQRT2, SQRT2, SQRT2)
+
+
+def as_grid(grid):
+    """Return the occupancy grid as a C-contiguous uint8 array (1 = obstacle)."""
+    occ = np.ascontiguousarray(grid, dtype=np.uint8)
+    if occ.ndim != 2:
+        raise ValueError(f"occupancy grid must be 2-D, got shape {occ.shape}")
+    return occ
+
+
+def integral_image(occ):
+    """Summed-area table padded with a leading zero row and column.
+
+    ``ii[x + 1, y + 1]`` holds I(x, y) from Step 8 of the preprocessing
+    pipeline, so window sums never need special-casing at the border. The
+    table is int32 whenever the cell count allows it.
+    """
+    H, W = occ.shape
+    dtype = np.int32 if H * W < 2**31 else np.int64
+    ii = np.zeros((H + 1, W + 1), dtype=dtype)
+    np.cumsum(np.cumsum(occ, axis=0, dtype=dtype), axis=1, out=ii[1:, 1:])
+    return ii
+
+
+def window_density(ii, xs, ys, omega):
+    """Vectorised DensityQuery (eq:integral_query) for many centre cells.
+
+    Windows crossing the border are clamped and normalised by their clamped
+    area, i.e. |W(p)| in eq:density.
+    """
+    H, W = ii.shape[0] - 1, ii.shape[1] - 1
+    xs = np.asarray(xs)
+    ys = np.asarray(ys)
+    x0 = np.clip(xs - omega, 0, H)
+    x1 = np.clip(xs + omega + 1, 0, H)
+    y0 = np.clip(ys - omega, 0, W)
+    y1 = np.clip(ys + omega + 1, 0, W)
+    count = ii[x1, y1] - ii[x0, y1] - ii[x1, y0] + ii[x0, y0]
+    area = (x1 - x0) * (y1 - y0)
+    return count / np.maximum(area, 1)
+
+
+def density_query(ii, p, omega):
+    """Local obstacle density sigma(p) for a single cell."""
+    return float(window_density(ii, p[0], p[1], omega))
+
+
+def bresenham(s, g):
+    """Cells of the Bresenham line from ``s`` to ``g`` as (xs, ys) arrays.
+
+    The major axis advances one cell per step and the minor coordinate is the
+    integer rounding of the exact line, which is what the incremental error
+    term of the classical algorithm produces.
+    """
+    (x0, y0), (x1, y1) = s, g
+    dx, dy = x1 - x0, y1 - y0
+    n = max(abs(dx), abs(dy))
+    t = np.arange(n + 1, dtype=np.int64)
+    if n == 0:
+        return t + x0, t + y0
+    # Round-half-away-from-start keeps the line symmetric in the step count.
+    xs = x0 + np.sign(dx) * ((2 * t * abs(dx) + n) // (2 * n))
+    ys = y0 + np.sign(dy) * ((2 * t * abs(dy) + n) // (2 * n))
+    return xs, ys
+
+
+def segments(ax, ay, bx, by):
+    """Rasterise K Bresenham segments at once.
+
+    Returns (xs, ys, starts): the cells of all segments concatenated, with
+    segment k occupying ``starts[k]`` up to ``starts[k + 1]``. Each segment
+    matches :func:`bresenham` cell for cell.
+    """
+    ax, ay, bx, by = np.broadcast_arrays(*(np.asarray(v, dtype=np.int64) for v in (ax, ay, bx, by)))
+    dx, dy = bx - ax, by - ay
+    n = np.maximum(np.abs(dx), np.abs(dy))
+    lengths = n + 1
+    starts = np.cumsum(lengths) - lengths
+    seg = np.repeat(np.arange(len(n)), lengths)
+    t = np.arange(int(lengths.sum())) - starts[seg]
+    nn = np.maximum(n, 1)[seg]
+    xs = ax[seg] + np.sign(dx)[seg] * ((2 * t * np.abs(dx)[seg] + nn) // (2 * nn))
+    ys = ay[seg] + np.sign(dy)[seg] * ((2 * t * np.abs(dy)[seg] + nn) // (2 * nn))
+    return xs, ys, starts
+
+
+def polyline(px, py):
+    """Cells of the Bresenham polyline through waypoints (px, py), joints once."""
+    px, py = np.asarray(px, dtype=np.int64), np.asarray(py, dtype=np.int64)
+    if len(px) < 2:
+        return px.copy(), py.copy()
+    xs, ys, starts = segments(px[:-1], py[:-1], px[1:], py[1:])
+    keep = np.ones(len(xs), dtype=bool)
+    keep[starts[1:]] = False
+    return xs[keep], ys[keep]
+
+
+def octile(dx, dy):
+    """Octile distance (eq:octile) for absolute offsets ``dx``, ``dy``."""
+    if dx < dy:
+        dx, dy = dy, dx
+    return dx + (SQRT2 - 1.0) * dy
+
+
+def neighbour_table(occ):
+    """Flat 8-connected neighbour indices, shape (H*W, 8), -1 where invalid.
+
+    A diagonal move is only allowed when both cardinal cells it passes are
+    free, so paths never cut obstacle corners. Rows of blocked cells are -1.
+    """
+    H, W = occ.shape
+    free = occ == 0
+    padded = np.zeros((H + 2, W + 2), dtype=bool)
+    padded[1:-1, 1:-1] = free
+    flat = np.arange(H * W, dtype=np.int64).reshape(H, W)
+    table = np.full((H, W, 8), -1, dtype=np.int64)
+
+    def ok(dx, dy):
+        return padded[1 + dx:H + 1 + dx, 1 + dy:W + 1 + dy]
+
+    for k, (dx, dy) in enumerate(DIRS):
+        valid = free & ok(dx, dy)
+        if dx and dy:
+            valid &= ok(dx, 0) & ok(0, dy)
+        table[..., k] = np.where(valid, flat + dx * W + dy, -1)
+    return table.reshape(H * W, 8)
+
+
+def neighbour_rows(occ, cells):
+    """Rows of :func:`neighbour_table` for the flat indices ``cells`` only."""
+    H, W = occ.shape
+    cells = np.asarray(cells, dtype=np.int64)
+    xs, ys = np.divmod(cells, W)
+
+    def free(dx, dy):
+        x, y = xs + dx, ys + dy
+        inside = (x >= 0) & (x < H) & (y >= 0) & (y < W)
+        out = np.zeros(cells.shape, dtype=bool)
+        out[inside] = occ[x[inside], y[inside]] == 0
+        return out
+
+    here = occ[xs, ys] == 0
+    rows = np.full((len(cells), 8), -1, dtype=np.int64)
+    for k, (dx, dy) in enumerate(DIRS):
+        valid = here & free(dx, dy)
+        if dx and dy:
+            valid &= free(dx, 0) & free(0, dy)
+        rows[:, k] = np.where(valid, cells + dx * W + dy, -1)
+    return rows
+
+
+def adjacency(table, costs=None):
+    """Turn a neighbour table into per-cell lists of (neighbour, cost) pairs.
+
+    ``costs`` optionally gives per-cell, per-direction costs of the same
+    shape as ``table`` (see :class:`ails.costfield.CostField`) in place of
+    the unit and sqrt(2) step lengths.
+    """
+    if costs is None:
+        return [[(u, c) for u, c in zip(row, DIR_COSTS) if u >= 0] for row in table.tolist()]
+    return [[(u, c) for u, c in zip(row, crow) if u >= 0] for row, crow in zip(table.tolist(), costs.tolist())]
+
+
+class Adjacency(dict):
+    """Lazily built :func:`adjacency`: row ``v`` is made when first looked up.
+
+    Indexing, assignment and ``len`` behave as on the list, but a query
+    only pays, in time and memory, for the cells its searches reach. A
+    corridor search touches a small part of the grid, so on large maps
+    this avoids building H*W lists per planner. ``table`` may be a
+    read-only view, e.g. into a :class:`~ails.shared.SharedDataset`.
+    """
+
+    __slots__ = ("table", "costs")
+
+    def __init__(self, table, costs=None):
+        super().__init__()
+        self.table = table
+        self.costs = costs
+
+    def __len__(self):
+        return len(self.table)
+
+    def __missing__(self, v):
+        crow = DIR_COSTS if self.costs is None else self.costs[v].tolist()
+        row = self[v] = [(u, c) for u, c in zip(self.table[v].tolist(), crow) if u >= 0]
+        return row
+
+
+def component_labels(occ):
+    """Connected-component label of every cell, -1 for obstacles.
+
+    Because diagonal moves need both cardinal cells free, two free cells
+    are connected under the 8-neighbourhood exactly when they are
+    4-connected, so only horizontal and vertical edges are unioned. Union
+    is done for all edges at once: the larger root of every unmerged edge
+    is hooked onto the smaller, then pointer jumping flattens the forest.
+    Every round at least halves the number of roots per component. Labels
+    are consecutive int32 values in row-major order of first occurrence.
+    """
+    H, W = occ.shape
+    free = (occ == 0).ravel()
+    flat = np.arange(H * W, dtype=np.int64).reshape(H, W)
+    grid = free.reshape(H, W)
+    right = flat[:, :-1][grid[:, :-1] & grid[:, 1:]]
+    down = flat[:-1, :][grid[:-1, :] & grid[1:, :]]
+    a = np.concatenate([right, down])
+    b = np.concatenate([right + 1, down + W])
+    parent = np.arange(H * W, dtype=np.int64)
+    while len(a):
+        ra, rb = parent[a], parent[b]
+        todo = ra != rb
+        a, b, ra, rb = a[todo], b[todo], ra[todo], rb[todo]
+        if not len(a):
+            break
+        np.minimum.at(parent, np.maximum(ra, rb), np.minimum(ra, rb))
+        while True:
+            up = parent[parent]
+            if np.array_equal(up, parent):
+                break
+            parent = up
+    labels = np.full(H * W, -1, dtype=np.int32)
+    _, labels[free] = np.unique(parent[free], return_inverse=True)
+    return labels.reshape(H, W)
@@ -0,0 +1,126 @@
+"""Coarse-to-fine corridors for large maps.
+
+The straight Bresenham axis of ILS/AILS is a poor guess on maze and room
+layouts, where the corridor then widens round after round towards the full
+grid. :class:`HierarchicalPlanner` builds a pyramid of down-sampled grids,
+each level halving the previous one: a coarse cell is blocked when at least
+``threshold`` of its 2x2 block is, a block count read from the finer level's
+integral image, so one-cell walls and their doorways survive every level.
+
+A query is solved with plain A* on the coarsest level. Each finer level
+then searches a narrow ILS/AILS corridor whose axis is the coarser path
+projected up (cell centres joined by Bresenham segments) rather than the
+s-g line, down to the full-resolution grid; the usual widening or local
+expansion repairs the corridor where down-sampling opened or closed a gap.
+A level whose endpoints are blocked or disconnected after down-sampling
+falls back to the straight line. Mazes with one-cell passages do not
+survive down-sampling and take that fallback at every level.
+
+Levels search with the planner's open-list type and, on a risk-annotated
+grid, on a :class:`~ails.costfield.CostField` over the block means of the
+risk raster. With a probe attached, every level gets a
+:class:`~ails.instrument.Probe` of its own that records one row per
+coarse search; the parent's phases exclude that time.
+"""
+
+import numpy as np
+
+from .costfield import CostField
+from .grid import bresenham, polyline
+from .instrument import LINE, Probe
+from .planner import GridPlanner
+
+
+def downsample(occ, ii, threshold=0.5):
+    """Occupancy of 2x2 blocks: blocked when their obstacle share is at least ``threshold``."""
+    H, W = occ.shape
+    ex = np.minimum(np.arange(0, H + 2, 2), H)[:(H + 1) // 2 + 1]
+    ey = np.minimum(np.arange(0, W + 2, 2), W)[:(W + 1) // 2 + 1]
+    x0, x1 = ex[:-1, None], ex[1:, None]
+    y0, y1 = ey[None, :-1], ey[None, 1:]
+    count = ii[x1, y1] - ii[x0, y1] - ii[x1, y0] + ii[x0, y0]
+    area = (x1 - x0) * (y1 - y0)
+    return (count >= threshold * area).astype(np.uint8)
+
+
+def downsample_costs(costs, occ):
+    """:class:`CostField` on the down-sampled grid ``occ`` from the 2x2 block means of the risk."""
+    H, W = costs.shape
+    risk = np.pad(costs.risk, ((0, H % 2), (0, W % 2)), mode="edge")
+    risk = risk.reshape(risk.shape[0] // 2, 2, risk.shape[1] // 2, 2).mean(axis=(1, 3))
+    return CostField(occ, np.clip(risk, 0.0, 1.0), costs.weight, quantize=costs.scale != 1.0)
+
+
+class HierarchicalPlanner(GridPlanner):
+    """:class:`GridPlanner` whose ILS/AILS corridors follow a coarse-level path.
+
+    Levels are added while the coarser grid keeps at least ``min_size``
+    cells on its short side; ``levels`` caps their number. Corridors around
+    a projected path start ``reach`` cells wide (ILS width, AILS r_max) and
+    rely on the usual widening or local expansion when that is too narrow.
+    ``costs`` and ``queue`` apply to every level; with ``probe`` set, the
+    probe of level k is ``pyramid[k].probe``.
+    """
+
+    def __init__(self, grid, algorithm="astar", mode="ails", ils=None, ails=None, ii=None,
+                 levels=None, min_size=64, threshold=0.5, reach=3, probe=None, costs=None, queue="heap"):
+        super().__init__(grid, algorithm, mode, ils, ails, ii, probe, costs, queue)
+        self.reach = reach
+        self.pyramid = []
+        occ, ii = self.occ, self.ii
+        while min(occ.shape) // 2 >= min_size and (levels is None or len(self.pyramid) < levels):
+            occ = downsample(occ, ii, threshold)
+            costs = None if costs is None else downsample_costs(costs, occ)
+            level = GridPlanner(occ, "astar", "standard", ils, ails, probe=None if probe is None else Probe(),
+                                costs=costs, queue=queue)
+            self.pyramid.append(level)
+            occ, ii = level.occ, level.ii
+
+    def _coarse_path(self, start, goal, mode):
+        """Path on the finest pyramid level (or None) and the expansions spent on it."""
+        path = None
+        expanded = 0
+        for k in range(len(self.pyramid) - 1, -1, -1):
+            level = self.pyramid[k]
+            s = (start[0] >> (k + 1), start[1] >> (k + 1))
+            g = (goal[0] >> (k + 1), goal[1] >> (k + 1))
+            if not level.reachable(s, g):
+                path = None
+                continue
+            search = level._search("astar")
+            level.probe.start()
+            if path is None and k == len(self.pyramid) - 1:
+                res = level._plan_standard(search, s, g)
+            else:
+                res = self._refine(level, search, s, g, path, mode)
+            level.probe.stop(res)
+            expanded += res.expanded
+            path = res.path
+        return path, expanded
+
+    def _refine(self, level, search, start, goal, path, mode):
+        """Corridor search on ``level`` around ``path`` from the level above, or the line."""
+        if not path or len(path) < 3:
+            xs, ys = bresenham(start, goal)
+            level.probe.lap(LINE)
+            return level._plan_along(search, start, goal, xs, ys, mode)
+        inner = np.asarray(path[1:-1], dtype=np.int64)
+        px = np.concatenate([[start[0]], np.minimum(2 * inner[:, 0] + 1, level.H - 1), [goal[0]]])
+        py = np.concatenate([[start[1]], np.minimum(2 * inner[:, 1] + 1, level.W - 1), [goal[1]]])
+        xs, ys = polyline(px, py)
+        level.probe.lap(LINE)
+        return level._plan_along(search, start, goal, xs, ys, mode, self.reach)
+
+    def _plan_ils(self, search, start, goal):
+        return self._plan_hier(search, start, goal, "ils")
+
+    def _plan_ails(self, search, start, goal):
+        return self._plan_hier(search, start, goal, "ails")
+
+    def _plan_hier(self, search, start, goal, mode):
+        path, expanded = self._coarse_path(start, goal, mode)
+        # The levels' probes recorded the coarse searches.
+        self.probe.skip()
+        result = self._refine(self, search, start, goal, path, mode)
+        result.expanded += expanded
+        return result
@@ -0,0 +1,195 @@
+"""Incremental replanning (LPA*) confined to the ILS/AILS corridor.
+
+D* Lite and LPA* normally keep g/rhs values for the whole grid. Here the
+search state only ever covers the cells of a tracked corridor (see
+:mod:`ails.dynamic`): after a map update only corridor cells next to a
+change, and cells entering or leaving the corridor, are re-evaluated, and
+LPA* repairs the previous solution instead of searching from scratch. When
+the repaired search fails the corridor is grown locally by ``delta_r``
+(eq:ails_expansion) and the search resumes from its current state.
+
+The start is fixed, so LPA* rather than D* Lite is used; a moving robot can
+re-create the planner from its new position.
+"""
+
+import heapq
+import math
+import time
+
+import numpy as np
+
+from .corridor import expand_corridor, free_cells
+from .grid import octile
+from .instrument import CORRIDOR, SEARCH
+from .planner import PlanResult
+from .smoothing import path_length
+
+INF = math.inf
+# Keys are float sums g + h, so equal f-values can differ in the last bit.
+# Keys this close are treated as ties, and ties are processed.
+EPS = 1e-9
+
+
+def _before(a, b):
+    """Key ``a`` must be processed before the search may stop at key ``b``.
+
+    Errs towards processing: a node left behind on a rounding tie can keep
+    a stale g and send path extraction around in circles.
+    """
+    if abs(a[0] - b[0]) > EPS:
+        return a[0] < b[0]
+    return a[1] < b[1] + EPS
+
+
+class CorridorLPA:
+    """LPA* over the corridor of a query tracked by a :class:`~ails.dynamic.DynamicPlanner`."""
+
+    def __init__(self, planner, start, goal, mode=None):
+        self.planner = planner
+        self.query = planner.track(start, goal, mode)
+        self.W = planner.W
+        self.s = planner._flat(self.query.start)
+        self.t = planner._flat(self.query.goal)
+        self.version = planner.version
+        self.extra = set()
+        self.corridor = set(self._base().tolist())
+        self.g = {}
+        self.rhs = {self.s: 0.0}
+        self.heap = []
+        self.expanded = 0
+        self._push(self.s)
+
+    def _base(self):
+        q = self.query
+        return free_cells(self.planner.occ, q.box, q.coverage > 0)
+
+    def _h(self, u):
+        x, y = divmod(u, self.W)
+        gx, gy = divmod(self.t, self.W)
+        return octile(abs(x - gx), abs(y - gy))
+
+    def _key(self, u):
+        m = min(self.g.get(u, INF), self.rhs.get(u, INF))
+        return (m + self._h(u), m)
+
+    def _push(self, u):
+        heapq.heappush(self.heap, self._key(u) + (u,))
+
+    def _update(self, u):
+        if u not in self.corridor:
+            self.g.pop(u, None)
+            self.rhs.pop(u, None)
+            return
+        if u == self.s:
+            self.rhs[u] = 0.0
+        else:
+            g = self.g
+            best = INF
+            for v, c in self.planner.adj[u]:
+                if v in self.corridor:
+                    gv = g.get(v, INF) + c
+                    if gv < best:
+                        best = gv
+            if best == INF:
+                self.rhs.pop(u, None)
+            else:
+                self.rhs[u] = best
+        if self.g.get(u, INF) != self.rhs.get(u, INF):
+            self._push(u)
+
+    def _compute(self):
+        g, rhs, heap, adj, corridor = self.g, self.rhs, self.heap, self.planner.adj, self.corridor
+        t = self.t
+        while heap and (_before(heap[0], self._key(t)) or rhs.get(t, INF) != g.get(t, INF)):
+            k1, k2, u = heapq.heappop(heap)
+            gu, ru = g.get(u, INF), rhs.get(u, INF)
+            if gu == ru or u not in corridor:
+                continue
+            key = self._key(u)
+            if (k1, k2) < key:
+                heapq.heappush(heap, key + (u,))
+                continue
+            self.expanded += 1
+            if gu > ru:
+                g[u] = ru
+            else:
+                g.pop(u, None)
+                self._update(u)
+            for v, _ in adj[u]:
+                if v in corridor:
+                    self._update(v)
+        return g.get(t, INF) < INF
+
+    def _path(self):
+        path = [self.t]
+        u = self.t
+        while u != self.s:
+            u = min(((v, self.g.get(v, INF) + c) for v, c in self.planner.adj[u] if v in self.corridor),
+                    key=lambda vc: vc[1])[0]
+            path.append(u)
+        path.reverse()
+        return path
+
+    def _sync(self):
+        """Apply map updates made since the last call to the corridor and g/rhs."""
+        planner = self.planner
+        if self.version == planner.version:
+            return
+        changed = np.concatenate(planner._log[self.version:])
+        self.version = planner.version
+        planner._refresh(self.query)
+        occ = planner.occ
+        new = set(self._base().tolist()) | {u for u in self.extra if not occ.flat[u]}
+        removed = self.corridor - new
+        added = new - self.corridor
+        self.extra -= removed
+        self.corridor = new
+        # Cells whose edges changed: the changed cells and their 8 neighbours.
+        cx, cy = np.divmod(changed, self.W)
+        touched = set()
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                x, y = cx + dx, cy + dy
+                inside = (x >= 0) & (x < planner.H) & (y >= 0) & (y < planner.W)
+                touched.update((x[inside] * self.W + y[inside]).tolist())
+        dirty = touched | added | removed
+        for u in removed:
+            dirty.update(v for v, _ in planner.adj[u])
+            self.g.pop(u, None)
+            self.rhs.pop(u, None)
+        for u in dirty:
+            self._update(u)
+
+    def replan(self):
+        """Repair the solution on the current map and return a :class:`PlanResult`."""
+        planner = self.planner
+        t0 = time.perf_counter()
+        planner.probe.start()
+        self.expanded = 0
+        self._sync()
+        planner.probe.lap(CORRIDOR)
+        q = self.query
+        rounds = 0
+        if not planner.reachable(q.start, q.goal):
+            found = False
+        else:
+            while not (found := self._compute()):
+                cells = np.fromiter(self.corridor, dtype=np.int64, count=len(self.corridor))
+                grown = set(expand_corridor(planner.occ, cells, planner.ails.delta_r).tolist())
+                added = grown - self.corridor
+                if not added:
+                    break
+                self.corridor |= added
+                self.extra |= added
+                for u in added:
+                    self._update(u)
+                rounds += 1
+        planner.probe.lap(SEARCH)
+        if found:
+            flat = self._path()
+            path = [divmod(u, self.W) for u in flat]
+            cost = path_length(path) if planner.costs is None else planner.costs.path_cost(flat)
+            result = PlanResult(path, cost, self.expanded, len(self.corridor), rounds, q.strategy)
+        else:
+            result = PlanResult(None, INF, self.expanded, len(self.corridor), rounds, q.strategy)
+        return planner._finish(result, "astar", q.mode, t0)
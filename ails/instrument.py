@@ -0,0 +1,153 @@
+"""Per-query instrumentation of the planning pipelines (sec:meth_metrics).
+
+A :class:`Probe` attached to a :class:`~ails.planner.GridPlanner` records,
+for every query, the wall time of each pipeline phase, the expansions, the
+open-list peak, the fallback rounds and the final corridor size, into
+preallocated arrays that double when full. Phases are timed as laps: each
+call to :meth:`Probe.lap` charges the time since the previous lap to one
+phase, so a query costs a handful of ``perf_counter`` calls.
+
+Queries answered through a :class:`~ails.cache.PlanCache` also record how
+the cache served them (see :data:`CACHE_OUTCOMES`) and the time it saved;
+:meth:`Probe.cache_summary` turns these into hit rates.
+
+The integral image is built once per map, not per query. Its time is
+charged to the integral phase of the first query after the planner was
+built and is zero in every later row, so summing rows counts it once.
+
+Planners hold :data:`OFF` unless given a probe; its methods do nothing, so
+uninstrumented queries pay only a few no-op calls.
+"""
+
+import time
+
+import numpy as np
+
+PHASES = ("integral", "line", "corridor", "search", "smoothing")
+INTEGRAL, LINE, CORRIDOR, SEARCH, SMOOTHING = range(len(PHASES))
+COUNTERS = ("expanded", "peak_open", "rounds", "corridor_size", "cache")
+# Values of the "cache" counter: not cached, a miss, a hit on the whole
+# path, on a subpath of a cached path, or on the query's corridor only.
+CACHE_OUTCOMES = ("uncached", "miss", "path", "subpath", "corridor")
+UNCACHED, MISS, PATH_HIT, SUBPATH_HIT, CORRIDOR_HIT = range(len(CACHE_OUTCOMES))
+
+# Result-store columns added by instrumented runs.
+COLUMNS = tuple(p + "_ms" for p in PHASES) + ("peak_open",)
+
+
+class Probe:
+    """Phase timings and counters of every query, one row per query."""
+
+    def __init__(self, capacity=256):
+        self.phase_ms = np.zeros((capacity, len(PHASES)))
+        self.counts = np.zeros((capacity, len(COUNTERS)), dtype=np.int64)
+        self.saved_ms = np.zeros(capacity)
+        self.n = 0
+        self.integral_ms = 0.0
+        self._integral_due = False
+        self._t = 0.0
+        self._peak = 0
+        self._cache = UNCACHED
+        self._saved = 0.0
+
+    def __len__(self):
+        return self.n
+
+    def preprocess(self, integral_ms):
+        """Record the per-map integral-image time, charged to the next query only."""
+        self.integral_ms = integral_ms
+        self._integral_due = True
+
+    def start(self):
+        """Open a row for a new query and start its clock."""
+        if self.n == len(self.phase_ms):
+            self.phase_ms = np.concatenate([self.phase_ms, np.zeros_like(self.phase_ms)])
+            self.counts = np.concatenate([self.counts, np.zeros_like(self.counts)])
+            self.saved_ms = np.concatenate([self.saved_ms, np.zeros_like(self.saved_ms)])
+        self.phase_ms[self.n] = 0.0
+        if self._integral_due:
+            self.phase_ms[self.n, INTEGRAL] = self.integral_ms
+            self._integral_due = False
+        self._peak = 0
+        self._cache = UNCACHED
+        self._saved = 0.0
+        self._t = time.perf_counter()
+
+    def lap(self, phase):
+        """Charge the time since the last lap to ``phase``."""
+        t = time.perf_counter()
+        self.phase_ms[self.n, phase] += (t - self._t) * 1e3
+        self._t = t
+
+    def skip(self):
+        """Restart the lap clock without charging the elapsed time to any phase."""
+        self._t = time.perf_counter()
+
+    def search(self, res):
+        """Close a search lap and fold in its open-list peak."""
+        self.lap(SEARCH)
+        if res.peak > self._peak:
+            self._peak = res.peak
+
+    def cache(self, outcome, saved_ms=0.0):
+        """Record how a cache served the current query and the time it saved."""
+        self._cache = outcome
+        self._saved = saved_ms
+
+    def stop(self, result):
+        """Close the row with the counters of the finished :class:`PlanResult`."""
+        self.counts[self.n] = (result.expanded, self._peak, result.rounds, result.corridor_size, self._cache)
+        self.saved_ms[self.n] = self._saved
+        self.n += 1
+
+    def row(self, i=-1):
+        """Store columns (see :data:`COLUMNS`) of query ``i``, by default the last."""
+        i = range(self.n)[i]
+        out = {p + "_ms": float(t) for p, t in zip(PHASES, self.phase_ms[i])}
+        out["peak_open"] = int(self.counts[i, 1])
+        return out
+
+    def columns(self):
+        """All recorded queries as a dict of column arrays."""
+        out = {p + "_ms": self.phase_ms[:self.n, k] for k, p in enumerate(PHASES)}
+        out.update({c: self.counts[:self.n, k] for k, c in enumerate(COUNTERS)})
+        out["saved_ms"] = self.saved_ms[:self.n]
+        return out
+
+    def cache_summary(self):
+        """Share of cached queries per outcome (rates) and the total time saved."""
+        outcome = self.counts[:self.n, COUNTERS.index("cache")]
+        cached = outcome != UNCACHED
+        n = int(cached.sum())
+        out = {"queries": n, "saved_ms": float(self.saved_ms[:self.n].sum())}
+        for k, name in enumerate(CACHE_OUTCOMES[1:], 1):
+            out[name + "_rate"] = float(np.sum(outcome == k)) / n if n else 0.0
+        return out
+
+    def clear(self):
+        self.n = 0
+
+
+class _Off:
+    """Stand-in for an absent probe."""
+
+    def start(self):
+        pass
+
+    def lap(self, phase):
+        pass
+
+    def skip(self):
+        pass
+
+    def search(self, res):
+        pass
+
+    def cache(self, outcome, saved_ms=0.0):
+        pass
+
+    def stop(self, result):
+        pass
+
+
+OFF = _Off()
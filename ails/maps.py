@@ -0,0 +1,204 @@
+"""Synthetic obstacle layouts for DS1-DS3 (subsec:datasets).
+
+Every generator takes a ``numpy.random.Generator`` so that a map is fully
+determined by its seed, and returns a uint8 occupancy grid (1 = obstacle).
+Generators use whole-array operations rather than per-cell loops, so that
+a full DS2/DS3 sweep generates in seconds. :func:`random_maps` draws a
+stack of ``n`` Bernoulli grids, shape (n, H, W), and applies the density
+check of preprocessing Step 5 to the whole stack; :func:`generate_maps`
+stacks grids of any topology, each from its own generator.
+"""
+
+import numpy as np
+
+TOPOLOGIES = ("random", "clustered", "maze", "room", "open")
+
+
+def random_maps(rng, n, shape, density, tolerance=None, free=None):
+    """Batched Bernoulli grids (DS1, DS3 Random).
+
+    ``rng`` is one generator for the whole stack, or a sequence of ``n``
+    generators, one per grid. Grid i is then exactly
+    ``random_maps(rng[i], 1, ...)[0]``, so maps seeded one by one (see
+    :func:`~ails.datasets.config_seed`) are still drawn, cleared and checked
+    as one stack. Cells where the boolean mask ``free`` is set are cleared.
+    With ``tolerance`` set, grids whose realised density (after clearing)
+    is further than that from ``density`` are redrawn (preprocessing Step
+    5); only the rejected grids are resampled.
+    """
+    shape = tuple(shape)
+
+    def draw(idx):
+        if isinstance(rng, np.random.Generator):
+            return rng.random((len(idx),) + shape) < density
+        out = np.empty((len(idx),) + shape, dtype=bool)
+        for k, i in enumerate(idx):
+            np.less(rng[i].random(shape), density, out=out[k])
+        return out
+
+    occ = draw(range(n)).view(np.uint8)
+    if free is not None:
+        occ[:, free] = 0
+    if tolerance is not None:
+        bad = np.flatnonzero(np.abs(occ.mean(axis=(1, 2)) - density) > tolerance)
+        while len(bad):
+            redrawn = draw(bad)
+            if free is not None:
+                redrawn[:, free] = False
+            occ[bad] = redrawn
+            bad = bad[np.abs(occ[bad].mean(axis=(1, 2)) - density) > tolerance]
+    return occ
+
+
+def random_map(rng, shape, density):
+    """Independent Bernoulli obstacles."""
+    return random_maps(rng, 1, shape, density)[0]
+
+
+def clustered_map(rng, shape, density, clusters=None, spread=None, rounds=16):
+    """Obstacles splatted around Gaussian-distributed cluster centres.
+
+    Points are drawn in batches; duplicates are removed keeping draw order,
+    so exactly ``round(density * H * W)`` cells are blocked. The default
+    spread widens with density so that the clusters can hold the target.
+    If ``rounds`` batches still fall short (very dense or very small
+    maps), the remaining cells are drawn uniformly from the free ones.
+    """
+    H, W = shape
+    target = round(density * H * W)
+    clusters = clusters or max(1, (H * W) // 800)
+    spread = spread or max(max(H, W) / 40, np.sqrt(target / (2 * np.pi * clusters)))
+    centres = rng.random((clusters, 2)) * (H, W)
+    flat = np.empty(0, dtype=np.int64)
+    for _ in range(rounds):
+        if len(flat) >= target:
+            break
+        k = 2 * (target - len(flat)) + 16
+        pts = np.rint(centres[rng.integers(clusters, size=k)] + rng.normal(0.0, spread, (k, 2)))
+        pts = pts[(pts[:, 0] >= 0) & (pts[:, 0] < H) & (pts[:, 1] >= 0) & (pts[:, 1] < W)].astype(np.int64)
+        flat = np.concatenate([flat, pts[:, 0] * W + pts[:, 1]])
+        _, first = np.unique(flat, return_index=True)
+        flat = flat[np.sort(first)]
+    occ = np.zeros(H * W, dtype=np.uint8)
+    occ[flat[:target]] = 1
+    if len(flat) < target:
+        free = np.flatnonzero(occ == 0)
+        occ[rng.choice(free, target - len(flat), replace=False)] = 1
+    return occ.reshape(shape)
+
+
+def maze_map(rng, shape, density=None):
+    """Walls and corridors from recursive division.
+
+    Each chamber is split by a wall on an odd row or column with a single
+    even-indexed gap, so every open cell stays connected. Chambers are kept
+    on an explicit stack and each wall is a single slice assignment.
+    ``density`` is accepted for a uniform signature; the wall layout fixes
+    the density.
+    """
+    H, W = shape
+    occ = np.zeros(shape, dtype=np.uint8)
+    stack = [(0, 0, H, W)]
+    while stack:
+        x0, y0, h, w = stack.pop()
+        # Odd wall positions strictly inside the chamber; even gap positions.
+        nrows = (h - 1) // 2 if h > 2 else 0
+        ncols = (w - 1) // 2 if w > 2 else 0
+        if not nrows and not ncols:
+            continue
+        if nrows and (h > w or not ncols):
+            wx = x0 + 1 + 2 * int(rng.integers(nrows))
+            gap = y0 + 2 * int(rng.integers((w + 1) // 2))
+            occ[wx, y0:y0 + w] = 1
+            occ[wx, gap] = 0
+            stack.append((x0, y0, wx - x0, w))
+            stack.append((wx + 1, y0, x0 + h - wx - 1, w))
+        else:
+            wy = y0 + 1 + 2 * int(rng.integers(ncols))
+            gap = x0 + 2 * int(rng.integers((h + 1) // 2))
+            occ[x0:x0 + h, wy] = 1
+            occ[gap, wy] = 0
+            stack.append((x0, y0, h, wy - y0))
+            stack.append((x0, wy + 1, h, y0 + w - wy - 1))
+    return occ
+
+
+def room_map(rng, shape, density=None, room=20, door=2):
+    """Rectangular rooms on a lattice, joined by narrow doorways.
+
+    With ``density`` set, furniture is scattered over the free cells until
+    the expected obstacle share reaches it, or not at all when the walls
+    alone exceed it. Doorways and the cells on either side of them stay
+    free, so furniture never closes a door.
+    """
+    H, W = shape
+    occ = np.zeros(shape, dtype=np.uint8)
+    walls_x = np.arange(room, H, room)
+    walls_y = np.arange(room, W, room)
+    occ[walls_x, :] = 1
+    occ[:, walls_y] = 1
+    doors = np.zeros(shape, dtype=bool)
+    # One doorway per wall segment, at a random offset along the segment.
+    for walls, extent, vertical in ((walls_y, H, True), (walls_x, W, False)):
+        starts = np.arange(0, extent, room)
+        span = np.maximum(np.minimum(room, extent - starts) - door, 1)
+        offs = starts[None, :] + (rng.random((len(walls), len(starts))) * span).astype(np.int64)
+        along = (offs[..., None] + np.arange(door)).clip(max=extent - 1)
+        across = np.broadcast_to(walls[:, None, None], along.shape)
+        if vertical:
+            occ[along, across] = 0
+            for side in (-1, 0, 1):
+                doors[along, (across + side).clip(0, W - 1)] = True
+        else:
+            occ[across, along] = 0
+            for side in (-1, 0, 1):
+                doors[(across + side).clip(0, H - 1), along] = True
+    if density:
+        # Furniture on the free cells away from doorways, at the rate that
+        # brings the expected density to ``density``.
+        spare = (occ == 0) & ~doors
+        rate = (density * H * W - np.count_nonzero(occ)) / max(np.count_nonzero(spare), 1)
+        occ[spare & (rng.random(shape) < rate)] = 1
+    return occ
+
+
+def open_map(rng, shape, density):
+    """Sparse layout: Bernoulli obstacles capped at 10% density."""
+    return random_map(rng, shape, min(density, 0.1))
+
+
+GENERATORS = {
+    "random": random_map,
+    "clustered": clustered_map,
+    "maze": maze_map,
+    "room": room_map,
+    "open": open_map,
+}
+
+
+def generate(topology, rng, shape, density):
+    """Dispatch to the generator for ``topology``."""
+    try:
+        gen = GENERATORS[topology]
+    except KeyError:
+        raise ValueError(f"unknown topology {topology!r}; expected one of {TOPOLOGIES}") from None
+    return gen(rng, shape, density)
+
+
+def generate_maps(topology, rngs, shape, density):
+    """Stack of grids of one topology, shape (len(rngs), H, W).
+
+    Grid i is exactly ``generate(topology, rngs[i], shape, density)``.
+    Random and open layouts are drawn as one batch by :func:`random_maps`;
+    the other generators already work on whole arrays and are stacked.
+    """
+    if topology == "random":
+        return random_maps(rngs, len(rngs), shape, density)
+    if topology == "open":
+        return random_maps(rngs, len(rngs), shape, min(density, 0.1))
+    if topology not in GENERATORS:
+        raise ValueError(f"unknown topology {topology!r}; expected one of {TOPOLOGIES}")
+    out = np.empty((len(rngs),) + tuple(shape), dtype=np.uint8)
+    for k, rng in enumerate(rngs):
+        out[k] = GENERATORS[topology](rng, shape, density)
+    return out
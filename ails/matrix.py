@@ -0,0 +1,260 @@
+"""Waypoint distance matrices for multi-waypoint missions.
+
+A surveillance mission over N waypoints needs the cost of every leg, i.e.
+N(N - 1)/2 point-to-point queries, each building its own corridor and
+running its own search. :func:`distance_matrix` shares that work:
+
+* one planner per process holds the grid, its integral image and the
+  adjacency lists; with ``workers > 1`` grid and integral image reach the
+  pool through a :class:`~ails.shared.SharedDataset`, as in
+  :mod:`ails.service`;
+* the legs from waypoint i to every later waypoint j > i are solved
+  together. Their ILS/AILS corridors are merged into one union corridor,
+  and a single one-to-many Dijkstra search from i runs inside it until
+  every target is settled. Its shortest-path tree yields all of those legs
+  at once. When the union misses a target, the corridor is grown locally
+  by ``delta_r`` (``delta_w`` for ILS), as in alg:ails_main;
+* sources are independent and are spread over a process pool.
+
+Legs are symmetric on the 8-connected grid, so N - 1 searches replace the
+N(N - 1)/2 of pairwise planning. A leg's initial corridor is part of its
+source's union, so a leg the pairwise search solves in its first round
+costs at most as much here (before smoothing). A leg that needs fallback
+rounds is settled in whichever round its union first reaches it, and can
+end up slightly longer or shorter than the pairwise result. Costs and
+paths are grid costs and grid paths; they are not smoothed.
+
+Usage::
+
+    python -m ails.matrix --topology room --size 300 --waypoints 12
+"""
+
+import argparse
+import heapq
+import math
+import multiprocessing
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from . import shared as _shared
+from .corridor import expand_corridor, ils_corridor
+from .grid import bresenham
+from .maps import generate
+from .planner import GridPlanner
+from .search import reconstruct
+
+_planner = None
+_config = None
+
+
+@dataclass
+class ManyResult:
+    """Settled distances and shortest-path tree of a one-to-many search."""
+
+    dist: dict
+    parent: dict
+    expanded: int
+    peak: int
+
+
+def dijkstra_many(adj, start, goals, width=None, member=None, cancelled=None):
+    """Dijkstra from ``start`` until every vertex of ``goals`` is settled or none is left.
+
+    ``dist`` holds the settled distance of each goal reached. The signature
+    mirrors :mod:`ails.search` (``width`` is unused) so that it runs through
+    :meth:`~ails.planner.GridPlanner._search_in`.
+    """
+    g = {start: 0.0}
+    parent = {start: None}
+    closed = set()
+    left = set(goals)
+    dist = {}
+    heap = [(0.0, start)]
+    expanded = peak = 0
+    while heap and left:
+        if len(heap) > peak:
+            peak = len(heap)
+        gv, v = heapq.heappop(heap)
+        if v in closed:
+            continue
+        closed.add(v)
+        if v in left:
+            left.discard(v)
+            dist[v] = gv
+        expanded += 1
+        for u, c in adj[v]:
+            if member is not None and not member[u]:
+                continue
+            gu = gv + c
+            if gu < g.get(u, math.inf):
+                g[u] = gu
+                parent[u] = v
+                heapq.heappush(heap, (gu, u))
+    return ManyResult(dist, parent, expanded, peak)
+
+
+@dataclass
+class WaypointMatrix:
+    """Leg costs between waypoints; ``cost[i, j]`` is ``inf`` for unreachable pairs.
+
+    ``legs`` maps (i, j) with i < j to the grid path from waypoint i to
+    waypoint j, when paths were requested.
+    """
+
+    waypoints: list
+    cost: np.ndarray
+    legs: dict
+    expanded: int
+    searches: int
+    time_ms: float = 0.0
+
+    def path(self, i, j):
+        """Grid path from waypoint ``i`` to ``j`` (None if unreachable or not kept)."""
+        if i == j:
+            return [self.waypoints[i]]
+        leg = self.legs.get((min(i, j), max(i, j)))
+        if leg is None or i < j:
+            return leg
+        return leg[::-1]
+
+
+def source_row(planner, waypoints, i, mode="ails", paths=True):
+    """Legs from waypoint ``i`` to every later waypoint, from one union-corridor search.
+
+    Returns ``(i, legs, expanded, searches)`` where ``legs`` maps each
+    reachable j > i to (cost, path or None).
+    """
+    s = waypoints[i]
+    targets = {}
+    parts = []
+    for j in range(i + 1, len(waypoints)):
+        t = waypoints[j]
+        if not planner.reachable(s, t):
+            continue
+        targets.setdefault(planner._flat(t), []).append(j)
+        xs, ys = bresenham(s, t)
+        if mode == "ails":
+            parts.append(planner._ails_corridor(xs, ys)[0])
+        else:
+            parts.append(ils_corridor(planner.occ, xs, ys, planner.w0))
+    legs = {}
+    expanded = searches = 0
+    if not targets:
+        return i, legs, expanded, searches
+    cells = np.unique(np.concatenate(parts))
+    step = planner.ails.delta_r if mode == "ails" else planner.ils.delta_w
+    pending = set(targets)
+    while pending:
+        res = planner._search_in(dijkstra_many, planner._flat(s), pending, cells)
+        expanded += res.expanded
+        searches += 1
+        for u, d in res.dist.items():
+            path = [divmod(v, planner.W) for v in reconstruct(res.parent, u)] if paths else None
+            for j in targets[u]:
+                legs[j] = d, path
+        pending -= res.dist.keys()
+        if not pending:
+            break
+        grown = expand_corridor(planner.occ, cells, step)
+        if len(grown) == len(cells):
+            break
+        cells = grown
+    return i, legs, expanded, searches
+
+
+def _init(handle, ils, ails, costs, waypoints, mode, paths):
+    """Pool initializer: attach to the shared grid and keep the mission settings."""
+    global _config
+    _shared.attach(handle)
+    _config = ils, ails, costs, waypoints, mode, paths
+
+
+def _row(i):
+    global _planner
+    ils, ails, costs, waypoints, mode, paths = _config
+    if _planner is None:
+        dataset = _shared.attached()
+        occ, ii = dataset[0]
+        _planner = GridPlanner(occ, ils=ils, ails=ails, ii=ii, costs=costs, table=dataset.table(0))
+    return source_row(_planner, waypoints, i, mode, paths)
+
+
+def distance_matrix(planner, waypoints, mode="ails", workers=1, paths=True):
+    """All leg costs (and paths) between ``waypoints`` on ``planner``'s grid.
+
+    ``mode`` is "ils" or "ails" and shapes the corridors. ``workers=1``
+    runs in-process. Otherwise sources are spread over a pool of
+    ``workers`` processes (None: one per CPU), which rebuild the planner
+    from a shared copy of the grid.
+    """
+    if mode not in ("ils", "ails"):
+        raise ValueError(f"distance matrices need corridor mode 'ils' or 'ails', not {mode!r}")
+    waypoints = [planner._check(p, p, "astar", mode)[0] for p in waypoints]
+    t0 = time.perf_counter()
+    n = len(waypoints)
+    cost = np.full((n, n), math.inf)
+    np.fill_diagonal(cost, 0.0)
+    legs = {}
+    expanded = searches = 0
+    sources = range(n - 1)
+    if workers == 1:
+        rows = (source_row(planner, waypoints, i, mode, paths) for i in sources)
+        expanded, searches = _collect(rows, cost, legs)
+    else:
+        with _shared.SharedDataset([planner.occ]) as dataset:
+            args = (dataset.handle, planner.ils, planner.ails, planner.costs, waypoints, mode, paths)
+            with multiprocessing.Pool(workers, initializer=_init, initargs=args) as pool:
+                expanded, searches = _collect(pool.imap_unordered(_row, sources), cost, legs)
+    return WaypointMatrix(waypoints, cost, legs if paths else {}, expanded, searches,
+                          (time.perf_counter() - t0) * 1e3)
+
+
+def _collect(rows, cost, legs):
+    expanded = searches = 0
+    for i, row, e, k in rows:
+        expanded += e
+        searches += k
+        for j, (c, path) in row.items():
+            cost[i, j] = cost[j, i] = c
+            legs[i, j] = path
+    return expanded, searches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Waypoint distance matrix against pairwise planning.")
+    parser.add_argument("--size", type=int, default=300)
+    parser.add_argument("--density", type=float, default=0.2)
+    parser.add_argument("--topology", default="room")
+    parser.add_argument("--waypoints", type=int, default=12)
+    parser.add_argument("--mode", default="ails", choices=("ils", "ails"))
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    rng = np.random.default_rng(args.seed)
+    occ = generate(args.topology, rng, (args.size, args.size), args.density)
+    planner = GridPlanner(occ)
+    labels = planner.labels
+    free = np.argwhere(labels == np.bincount(labels[labels >= 0]).argmax())
+    waypoints = [tuple(map(int, p)) for p in free[rng.choice(len(free), args.waypoints, replace=False)]]
+
+    t0 = time.perf_counter()
+    pairwise = np.zeros((args.waypoints, args.waypoints))
+    expanded = 0
+    for i in range(args.waypoints):
+        for j in range(i + 1, args.waypoints):
+            search = getattr(planner, "_plan_" + args.mode)
+            r = search(planner._search("astar"), waypoints[i], waypoints[j])
+            pairwise[i, j] = pairwise[j, i] = r.cost
+            expanded += r.expanded
+    pairwise_ms = (time.perf_counter() - t0) * 1e3
+    m = distance_matrix(planner, waypoints, args.mode, args.workers)
+    upper = np.triu_indices(args.waypoints, 1)
+    print(f"pairwise {args.mode} A*: {len(upper[0])} searches, {pairwise_ms:.0f} ms, {expanded} expanded", flush=True)
+    print(f"matrix: {m.searches} searches, {m.time_ms:.0f} ms, {m.expanded} expanded, "
+          f"mean leg cost {np.mean(m.cost[upper] / pairwise[upper]):.4f} of pairwise", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+"""Planner bound to one grid, running the baseline, ILS and AILS pipelines.
+
+The integral image, obstacle bitmap, neighbour tables and connected-component
+labels depend only on the map, so :class:`GridPlanner` builds them once and
+every query pays only for its reference line, corridor and search.
+``plan_many`` runs a batch of start-goal pairs (e.g. the 100 pairs per
+DS2/DS3 configuration) and returns the metrics of subsec:metrics as
+columnar arrays.
+"""
+
+import functools
+import math
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .corridor import adaptive_radii, density_profile, expand_corridor, ils_corridor, union_of_squares
+from .grid import Adjacency, as_grid, bresenham, component_labels, integral_image, neighbour_table
+from .instrument import CORRIDOR, LINE, OFF, SMOOTHING
+from .search import ALGORITHMS, BUCKETED, SMOOTHED, UNIFORM_COST
+from .smoothing import path_length, smooth_path
+
+MODES = ("standard", "ils", "ails")
+QUEUES = ("heap", "bucket")
+
+
+@dataclass(frozen=True)
+class ILSParams:
+    """ILS corridor parameters (tab:ils_params)."""
+
+    gamma: float = 0.05
+    delta_w: int = 5
+
+
+@dataclass(frozen=True)
+class AILSParams:
+    """AILS corridor parameters (tab:ails_params); ``r_max=None`` means ceil(0.1 min(H, W))."""
+
+    r_min: int = 2
+    r_max: int = None
+    alpha: float = 1.0
+    omega: int = 3
+    beta: float = 0.3
+    delta_r: int = 2
+    grad_threshold: float = 0.1
+
+
+@dataclass
+class PlanResult:
+    """Metrics of a single query; ``path`` is a list of (x, y) cells or None."""
+
+    path: list
+    cost: float
+    expanded: int
+    corridor_size: int
+    rounds: int = 0
+    strategy: str = ""
+    time_ms: float = 0.0
+
+    @property
+    def found(self):
+        return self.path is not None
+
+
+@dataclass
+class PlanBatch:
+    """Columnar results of :meth:`GridPlanner.plan_many`.
+
+    Paths are stored CSR-style: the cells of query ``i`` are
+    ``path_cells[path_offsets[i]:path_offsets[i + 1]]``.
+    """
+
+    found: np.ndarray
+    cost: np.ndarray
+    expanded: np.ndarray
+    corridor_size: np.ndarray
+    rounds: np.ndarray
+    strategy: np.ndarray
+    time_ms: np.ndarray
+    path_offsets: np.ndarray
+    path_cells: np.ndarray = field(repr=False)
+
+    def __len__(self):
+        return len(self.found)
+
+    def path(self, i):
+        """Path of query ``i`` as a list of (x, y) tuples, or None."""
+        if not self.found[i]:
+            return None
+        cells = self.path_cells[self.path_offsets[i]:self.path_offsets[i + 1]]
+        return [tuple(c) for c in cells.tolist()]
+
+    @classmethod
+    def from_results(cls, results):
+        paths = [r.path or [] for r in results]
+        offsets = np.zeros(len(results) + 1, dtype=np.int64)
+        np.cumsum([len(p) for p in paths], out=offsets[1:])
+        cells = np.array([c for p in paths for c in p], dtype=np.int64).reshape(-1, 2)
+        return cls(
+            found=np.array([r.found for r in results], dtype=bool),
+            cost=np.array([r.cost for r in results], dtype=np.float64),
+            expanded=np.array([r.expanded for r in results], dtype=np.int64),
+            corridor_size=np.array([r.corridor_size for r in results], dtype=np.int64),
+            rounds=np.array([r.rounds for r in results], dtype=np.int32),
+            strategy=np.array([r.strategy for r in results], dtype=str),
+            time_ms=np.array([r.time_ms for r in results], dtype=np.float64),
+            path_offsets=offsets,
+            path_cells=cells,
+        )
+
+
+class GridPlanner:
+    """Shares per-map preprocessing across queries on one occupancy grid.
+
+    ``ii`` and ``table`` may pass in a precomputed integral image and
+    :func:`~ails.grid.neighbour_table`, e.g. views into a
+    :class:`~ails.shared.SharedDataset`. Adjacency rows are built from the
+    table as searches reach them (:class:`~ails.grid.Adjacency`).
+    ``probe`` attaches an :class:`~ails.instrument.Probe` that records every
+    query's phase timings and counters. ``costs`` plans on a risk-annotated
+    grid: a :class:`~ails.costfield.CostField` whose edge costs replace the
+    step lengths, in which case ``cost`` is the risk-weighted cost and paths
+    are not smoothed, since a line-of-sight shortcut ignores the risk it
+    crosses. Jump Point Search assumes uniform step costs and is rejected
+    on a cost field. ``queue="bucket"`` runs A*, Dijkstra and Greedy on a
+    :class:`~ails.search.BucketQueue` over exact octile keys instead of a
+    binary heap, and needs unit step costs. Grid path costs are identical;
+    ties between equal keys can break differently, so smoothed ILS/AILS
+    paths and costs may differ.
+    """
+
+    def __init__(self, grid, algorithm="astar", mode="ails", ils=None, ails=None, ii=None, probe=None,
+                 costs=None, queue="heap", table=None):
+        if queue not in QUEUES:
+            raise ValueError(f"unknown queue {queue!r}; expected one of {QUEUES}")
+        self.occ = as_grid(grid)
+        self.H, self.W = self.occ.shape
+        self.algorithm = algorithm
+        self.mode = mode
+        self.ils = ils or ILSParams()
+        self.ails = ails or AILSParams()
+        self.probe = OFF if probe is None else probe
+        self.queue = queue
+        t0 = time.perf_counter()
+        self.ii = integral_image(self.occ) if ii is None else ii
+        if probe is not None:
+            probe.preprocess((time.perf_counter() - t0) * 1e3)
+        self.table = neighbour_table(self.occ) if table is None else table
+        if costs is not None and costs.shape != self.occ.shape:
+            raise ValueError(f"cost field has shape {costs.shape}, expected {self.occ.shape}")
+        if costs is not None and queue == "bucket":
+            raise ValueError("the bucket queue keys on unit step costs and cannot plan on a cost field")
+        self.costs = costs
+        self._check_costs(algorithm)
+        self.adj = Adjacency(self.table, None if costs is None else costs.values())
+        self.n_free = int(self.H * self.W - np.count_nonzero(self.occ))
+        self.labels = component_labels(self.occ)
+        # Corridor membership buffer, set and cleared per search so that a
+        # query never touches more of it than its own corridor.
+        self._member = bytearray(self.H * self.W)
+        self._member_view = np.frombuffer(self._member, dtype=np.uint8)
+
+    @property
+    def r_max(self):
+        if self.ails.r_max is not None:
+            return self.ails.r_max
+        return math.ceil(0.1 * min(self.H, self.W))
+
+    def _check(self, start, goal, algorithm, mode):
+        algorithm = algorithm or self.algorithm
+        mode = mode or self.mode
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"unknown algorithm {algorithm!r}; expected one of {sorted(ALGORITHMS)}")
+        if mode not in MODES:
+            raise ValueError(f"unknown mode {mode!r}; expected one of {MODES}")
+        self._check_costs(algorithm)
+        start, goal = tuple(start), tuple(goal)
+        for p in (start, goal):
+            if not (0 <= p[0] < self.H and 0 <= p[1] < self.W):
+                raise ValueError(f"cell {p} lies outside the {self.H}x{self.W} grid")
+        return start, goal, algorithm, mode
+
+    def _check_costs(self, algorithm):
+        if self.costs is not None and algorithm in UNIFORM_COST:
+            raise ValueError(f"{algorithm!r} assumes uniform step costs and cannot plan on a cost field")
+
+    def _search(self, algorithm):
+        """Search function of ``algorithm`` on the planner's open-list type."""
+        if self.queue == "bucket" and algorithm in BUCKETED:
+            return functools.partial(ALGORITHMS[algorithm], buckets=True)
+        return ALGORITHMS[algorithm]
+
+    def reachable(self, start, goal):
+        """O(1) test that ``start`` and ``goal`` are free cells of one component."""
+        a = self.labels[start]
+        return a >= 0 and a == self.labels[goal]
+
+    def _finish(self, result, algorithm, mode, t0):
+        if result.found and mode != "standard" and algorithm in SMOOTHED and self.costs is None:
+            result.path = smooth_path(self.occ, result.path)
+            result.cost = path_length(result.path)
+        self.probe.lap(SMOOTHING)
+        self.probe.stop(result)
+        result.time_ms = (time.perf_counter() - t0) * 1e3
+        return result
+
+    def plan(self, start, goal, algorithm=None, mode=None):
+        """Run one query and return its :class:`PlanResult`."""
+        start, goal, algorithm, mode = self._check(start, goal, algorithm, mode)
+        t0 = time.perf_counter()
+        self.probe.start()
+        if not self.reachable(start, goal):
+            # Blocked endpoint or different components: no corridor can help.
+            result = PlanResult(None, math.inf, 0, 0)
+        else:
+            result = getattr(self, "_plan_" + mode)(self._search(algorithm), start, goal)
+        return self._finish(result, algorithm, mode, t0)
+
+    def plan_many(self, pairs, algorithm=None, mode=None):
+        """Run every (start, goal) pair in ``pairs`` and return a :class:`PlanBatch`."""
+        return PlanBatch.from_results([self.plan(s, g, algorithm, mode) for s, g in pairs])
+
+    def _flat(self, p):
+        return p[0] * self.W + p[1]
+
+    def _result(self, found, expanded, corridor_size, rounds=0, strategy=""):
+        if found.path is None:
+            return PlanResult(None, math.inf, expanded, corridor_size, rounds, strategy)
+        path = [divmod(u, self.W) for u in found.path]
+        cost = path_length(path) if self.costs is None else self.costs.path_cost(found.path)
+        return PlanResult(path, cost, expanded, corridor_size, rounds, strategy)
+
+    def _search_in(self, search, s, g, cells, cancelled=None):
+        self.probe.lap(CORRIDOR)
+        view = self._member_view
+        view[cells] = 1
+        try:
+            res = search(self.adj, s, g, self.W, self._member, cancelled)
+        finally:
+            view[cells] = 0
+        self.probe.search(res)
+        return res
+
+    def _plan_standard(self, search, start, goal):
+        res = search(self.adj, self._flat(start), self._flat(goal), self.W)
+        self.probe.search(res)
+        return self._result(res, res.expanded, self.n_free)
+
+    @property
+    def w0(self):
+        return max(1, math.floor(self.ils.gamma * min(self.H, self.W)))
+
+    def _plan_ils(self, search, start, goal):
+        xs, ys = bresenham(start, goal)
+        self.probe.lap(LINE)
+        return self._plan_along(search, start, goal, xs, ys, "ils")
+
+    def _plan_along(self, search, start, goal, xs, ys, mode, reach=None):
+        """ILS or AILS corridor search around the axis (xs, ys) instead of the line.
+
+        ``reach`` caps the initial ILS width and the AILS radius, for axes
+        that are already a path estimate rather than a straight line.
+        """
+        if mode == "ils":
+            return self._ils_rounds(search, start, goal, xs, ys, w=reach)
+        cells, strategy = self._ails_corridor(xs, ys, reach)
+        return self._ails_rounds(search, start, goal, cells, strategy)
+
+    def _ails_corridor(self, xs, ys, reach=None):
+        """Initial AILS corridor around (xs, ys) and the strategy that shaped it."""
+        p = self.ails
+        r_max = self.r_max if reach is None else reach
+        profile = density_profile(self.ii, xs, ys, p.omega)
+        sigma, grad = profile[p.omega]
+        strategy = profile.strategy(p.omega, p.grad_threshold)
+        radii = adaptive_radii(sigma, grad, strategy, min(p.r_min, r_max), r_max, p.alpha, p.beta)
+        return union_of_squares(self.occ, xs, ys, radii), strategy
+
+    def _ils_rounds(self, search, start, goal, xs, ys, cells=None, w=None):
+        """Alg:ils widening loop from width ``w`` (default w0); ``cells`` optionally supplies its corridor."""
+        s, g = self._flat(start), self._flat(goal)
+        # max(H, W) rather than min(H, W) so the last round always covers the grid.
+        w_max = max(self.H, self.W)
+        w = self.w0 if w is None else w
+        expanded = rounds = 0
+        while True:
+            if cells is None:
+                cells = ils_corridor(self.occ, xs, ys, w)
+            res = self._search_in(search, s, g, cells)
+            expanded += res.expanded
+            if res.path is not None or w >= w_max:
+                return self._result(res, expanded, len(cells), rounds)
+            w = min(w + self.ils.delta_w, w_max)
+            cells = None
+            rounds += 1
+
+    def _plan_ails(self, search, start, goal):
+        xs, ys = bresenham(start, goal)
+        self.probe.lap(LINE)
+        return self._plan_along(search, start, goal, xs, ys, "ails")
+
+    def _ails_rounds(self, search, start, goal, cells, strategy):
+        """Constrained search with local fallback expansion (alg:ails_main)."""
+        s, g = self._flat(start), self._flat(goal)
+        expanded = rounds = 0
+        while True:
+            res = self._search_in(search, s, g, cells)
+            expanded += res.expanded
+            if res.path is not None:
+                break
+            grown = expand_corridor(self.occ, cells, self.ails.delta_r)
+            if len(grown) == len(cells):
+                # Nothing left to add: the corridor already spans every cell
+                # reachable by expansion. With the component check in plan()
+                # this only happens once blocking updates on a DynamicPlanner
+                # have split a component.
+                break
+            cells = grown
+            rounds += 1
+        return self._result(res, expanded, len(cells), rounds, strategy)
@@ -0,0 +1,164 @@
+"""Streaming preprocessing of large image-derived grids (DS4, subsec:preprocessing).
+
+Steps 2-4 and 8 are applied one strip of rows at a time: each strip is
+converted to greyscale, thresholded at 128 (values below are obstacles),
+bit-packed, and appended to the summed-area table with a running carry, the
+last integral row of the previous strip. Output is a single-map corpus file
+(see :mod:`ails.corpus`), preallocated and written through memory maps, so
+peak memory is a few strips regardless of the image size, and
+:class:`~ails.corpus.Corpus` opens the result without copying.
+
+PGM/PPM (binary, 8-bit) and ``.npy`` rasters are read strip by strip through
+memory maps. Other formats go through Pillow if it is installed, which
+decodes the whole image up front.
+
+Usage::
+
+    python -m ails.raster penang.ppm data/ds4.ails --pair 10 10 900 1400
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+from .corpus import _ALIGN, _TRAILER, MAGIC
+
+THRESHOLD = 128
+
+
+def _read_pnm(path):
+    """Memory-mapped (H, W, C) view of a binary 8-bit PGM (P5) or PPM (P6)."""
+    with open(path, "rb") as f:
+        head = f.read(4096)
+    fields = []
+    pos = 0
+    while len(fields) < 4:
+        while head[pos:pos + 1].isspace():
+            pos += 1
+        if head[pos:pos + 1] == b"#":
+            pos = head.index(b"\n", pos) + 1
+            continue
+        end = pos
+        while not head[end:end + 1].isspace():
+            end += 1
+        fields.append(head[pos:end])
+        pos = end
+    magic, W, H, maxval = fields[0], int(fields[1]), int(fields[2]), int(fields[3])
+    if magic not in (b"P5", b"P6") or maxval != 255:
+        raise ValueError(f"{path}: only binary 8-bit PGM/PPM rasters are supported")
+    channels = 1 if magic == b"P5" else 3
+    # A single whitespace byte separates the header from the pixel data.
+    return np.memmap(path, dtype=np.uint8, mode="r", offset=pos + 1, shape=(H, W, channels))
+
+
+def open_raster(path):
+    """Array-like (H, W) or (H, W, C) uint8 view of the image at ``path``."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".pgm", ".ppm", ".pnm"):
+        return _read_pnm(path)
+    if ext == ".npy":
+        img = np.load(path, mmap_mode="r")
+    else:
+        try:
+            from PIL import Image
+        except ImportError:
+            raise ValueError(f"{path}: only PGM/PPM and .npy are read without Pillow") from None
+        with Image.open(path) as im:
+            img = np.asarray(im.convert("L"))
+    if img.dtype != np.uint8 or img.ndim not in (2, 3):
+        raise ValueError(f"{path}: expected an 8-bit greyscale or colour raster")
+    return img
+
+
+def greyscale(strip):
+    """Step 2: ITU-R 601 luma of an (h, W, C) strip, rounded as Pillow does."""
+    if strip.ndim == 2:
+        return np.asarray(strip)
+    if strip.shape[2] < 3:
+        return np.asarray(strip[..., 0])
+    rgb = strip[..., :3].astype(np.uint32)
+    return ((rgb[..., 0] * 299 + rgb[..., 1] * 587 + rgb[..., 2] * 114 + 500) // 1000).astype(np.uint8)
+
+
+def preprocess_raster(src, dst, rows=256, pairs=(), integral=True, meta=None):
+    """Stream the image at ``src`` into a single-map corpus at ``dst``.
+
+    ``rows`` is the strip height. ``pairs`` are the user-specified start-goal
+    cells of Step 6; they are stored with the map but, being DS4, not
+    resampled. Returns the metadata written to the index.
+    """
+    img = open_raster(src)
+    H, W = img.shape[:2]
+    row = -(-W // 8)
+    ii_dtype = np.dtype(np.int32 if H * W < 2 ** 31 else np.int64).newbyteorder("<")
+    bits_at = -(-len(MAGIC) // _ALIGN) * _ALIGN
+    ii_at = -(-(bits_at + H * row) // _ALIGN) * _ALIGN
+    end = ii_at + (H + 1) * (W + 1) * ii_dtype.itemsize if integral else bits_at + H * row
+
+    tmp = dst + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.truncate(end)
+    bits = np.memmap(tmp, dtype=np.uint8, mode="r+", offset=bits_at, shape=(H, row))
+    ii = None
+    if integral:
+        ii = np.memmap(tmp, dtype=ii_dtype, mode="r+", offset=ii_at, shape=(H + 1, W + 1))
+        ii[0] = 0
+    carry = np.zeros(W + 1, dtype=np.int64)
+    blocked = 0
+    for x0 in range(0, H, rows):
+        x1 = min(x0 + rows, H)
+        occ = (greyscale(img[x0:x1]) < THRESHOLD).astype(np.uint8)
+        bits[x0:x1] = np.packbits(occ, axis=1)
+        blocked += int(np.count_nonzero(occ))
+        if ii is not None:
+            strip = np.zeros((x1 - x0, W + 1), dtype=np.int64)
+            np.cumsum(occ, axis=1, dtype=np.int64, out=strip[:, 1:])
+            np.cumsum(strip, axis=0, out=strip)
+            strip += carry
+            ii[x0 + 1:x1 + 1] = strip
+            carry = strip[-1]
+    bits.flush()
+    del bits
+    if ii is not None:
+        ii.flush()
+        del ii
+
+    entry = {"shape": [H, W], "bits": bits_at, "meta": {
+        "dataset": "ds4", "index": 0, "size": max(H, W), "density": blocked / (H * W),
+        "topology": "satellite", "seed": 0,
+        "pairs": [[list(s), list(g)] for s, g in pairs],
+        "actual_density": blocked / (H * W),
+        "source": os.path.basename(src),
+        **(meta or {}),
+    }}
+    if integral:
+        entry["ii"] = ii_at
+        entry["ii_dtype"] = ii_dtype.str
+    with open(tmp, "r+b") as f:
+        f.seek(end)
+        f.write(json.dumps([entry], separators=(",", ":")).encode())
+        f.write(_TRAILER.pack(end, MAGIC))
+    os.replace(tmp, dst)
+    return entry["meta"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Preprocess a large raster into a map corpus file.")
+    parser.add_argument("image")
+    parser.add_argument("path")
+    parser.add_argument("--rows", type=int, default=256, help="strip height in rows")
+    parser.add_argument("--pair", type=int, nargs=4, action="append", default=[],
+                        metavar=("SX", "SY", "GX", "GY"), help="start-goal pair (repeatable)")
+    parser.add_argument("--no-integral", dest="integral", action="store_false",
+                        help="do not store the integral image")
+    args = parser.parse_args(argv)
+    pairs = [((sx, sy), (gx, gy)) for sx, sy, gx, gy in args.pair]
+    meta = preprocess_raster(args.image, args.path, args.rows, pairs, args.integral)
+    print(f"{args.image} -> {args.path}: density {meta['actual_density']:.4f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
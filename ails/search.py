@@ -0,0 +1,542 @@
+"""The five classical search algorithms, bidirectional A* and Dijkstra, and
+Jump Point Search, with optional corridor restriction.
+
+Every search works on flat cell indices and an adjacency list built once per
+grid by :func:`ails.grid.adjacency`. ``member`` is an optional byte buffer
+with ``member[u] == 1`` for corridor cells (eq:constrained_neighbors); when it
+is ``None`` the search runs on the full grid as in alg:baseline.
+
+``cancelled`` is an optional zero-argument callable polled every
+:data:`POLL` expansions; once it returns true the search gives up and
+reports no path, which lets a speculative caller abandon a search that is
+no longer needed.
+
+A*, Dijkstra and Greedy take an optional ``buckets``: on unit-cost grids
+their open list is then a :class:`BucketQueue` over exact octile keys
+instead of a binary heap. Grid path costs are unchanged. Its pushes and
+pops are O(1), but each is a few Python-level steps against one call into
+the C ``heapq``: on 300x300 maps A* and Dijkstra take about 1.2-1.3x
+their heap time, and short Greedy searches about 2x.
+"""
+
+import heapq
+import math
+from collections import deque
+from dataclasses import dataclass
+
+from .grid import SQRT2, octile
+
+POLL = 256
+# Buckets per unit of cost in a BucketQueue. Finer buckets hold fewer
+# distinct keys each, at the cost of a longer circular array.
+BUCKET_SCALE = 16
+# Exact costs a + b sqrt(2) packed as a << KEY_BITS | b.
+KEY_BITS = 32
+KEY_MASK = (1 << KEY_BITS) - 1
+
+
+@dataclass
+class SearchResult:
+    """Outcome of one search: flat-index path (or None), expanded vertices and peak open-list size."""
+
+    path: list
+    expanded: int
+    peak: int = 0
+
+
+def reconstruct(parent, goal):
+    """Follow parent pointers from ``goal`` back to the start."""
+    path = [goal]
+    u = parent[goal]
+    while u is not None:
+        path.append(u)
+        u = parent[u]
+    path.reverse()
+    return path
+
+
+class BucketQueue:
+    """Dial bucket queue over exact octile keys.
+
+    On a grid with step costs 1 and sqrt(2), every g, h and f value is
+    a + b sqrt(2) for integers a and b, and keys are pushed as the float
+    ``a + b * SQRT2``. An entry goes to bucket
+    floor(key * :data:`BUCKET_SCALE`) of a circular array wide enough for
+    ``span``, the largest spread of live keys the caller allows: 2 sqrt(2)
+    for A* and Dijkstra, whose keys never fall below the last one popped,
+    and the largest h for Greedy. Inside a bucket, entries are grouped by
+    key: the smallest key leaves first, and equal keys leave in insertion
+    order. Since sqrt(2) is irrational, two keys are equal exactly when
+    their (a, b) are, and distinct keys with a, b below 2^26 differ by far
+    more than float error, so ties carry no rounding noise. Pushes are
+    O(1); with monotone keys a pop moves the cursor forward over at most
+    ``span * BUCKET_SCALE`` empty buckets, and over each bucket once.
+    """
+
+    __slots__ = ("buckets", "size", "cur", "top", "n")
+
+    def __init__(self, span):
+        self.size = int(span * BUCKET_SCALE) + 2
+        self.buckets = [None] * self.size
+        # Absolute bucket numbers of the lowest live key and an upper bound
+        # on the highest.
+        self.cur = self.top = 0
+        self.n = 0
+
+    def __len__(self):
+        return self.n
+
+    def push(self, key, v):
+        i = int(key * BUCKET_SCALE)
+        if not self.n:
+            self.cur = self.top = i
+        elif i < self.cur:
+            self.cur = i
+        elif i > self.top:
+            self.top = i
+        if self.top - self.cur >= self.size:
+            raise ValueError("key outside the bucket queue's span")
+        bucket = self.buckets[i % self.size]
+        if bucket is None:
+            self.buckets[i % self.size] = bucket = {}
+        fifo = bucket.get(key)
+        if fifo is None:
+            bucket[key] = fifo = deque()
+        fifo.append(v)
+        self.n += 1
+
+    def pop(self):
+        buckets, size, cur = self.buckets, self.size, self.cur
+        bucket = buckets[cur % size]
+        while not bucket:
+            cur += 1
+            bucket = buckets[cur % size]
+        self.cur = cur
+        key = next(iter(bucket)) if len(bucket) == 1 else min(bucket)
+        fifo = bucket[key]
+        v = fifo.popleft()
+        if not fifo:
+            del bucket[key]
+        self.n -= 1
+        return v
+
+
+def _best_first(adj, start, goal, width, member, use_g, use_h, cancelled=None, buckets=False):
+    if buckets:
+        return _best_first_exact(adj, start, goal, width, member, use_g, use_h, cancelled)
+    gx, gy = divmod(goal, width)
+
+    def h(u):
+        x, y = divmod(u, width)
+        return octile(abs(x - gx), abs(y - gy))
+
+    g = {start: 0.0}
+    parent = {start: None}
+    closed = set()
+    heap = [(h(start) if use_h else 0.0, 0, start)]
+    tie = 1
+    expanded = peak = 0
+    while heap:
+        if len(heap) > peak:
+            peak = len(heap)
+        _, _, v = heapq.heappop(heap)
+        if v in closed:
+            continue
+        closed.add(v)
+        expanded += 1
+        if cancelled is not None and not expanded % POLL and cancelled():
+            return SearchResult(None, expanded, peak)
+        if v == goal:
+            return SearchResult(reconstruct(parent, goal), expanded, peak)
+        gv = g[v]
+        for u, c in adj[v]:
+            if u in closed or (member is not None and not member[u]):
+                continue
+            gu = gv + c
+            if use_g and gu >= g.get(u, float("inf")):
+                continue
+            if not use_g and u in parent:
+                continue
+            g[u] = gu
+            parent[u] = v
+            f = (gu if use_g else 0.0) + (h(u) if use_h else 0.0)
+            heapq.heappush(heap, (f, tie, u))
+            tie += 1
+    return SearchResult(None, expanded, peak)
+
+
+def _best_first_exact(adj, start, goal, width, member, use_g, use_h, cancelled=None):
+    """:func:`_best_first` on a :class:`BucketQueue`, with exact g and h.
+
+    Costs a + b sqrt(2) are packed into one integer a << KEY_BITS | b, so a
+    step adds ``1 << KEY_BITS`` or 1. Needs step costs of exactly 1 and
+    sqrt(2).
+    """
+    gx, gy = divmod(goal, width)
+    unit = 1 << KEY_BITS
+
+    def h(u):
+        x, y = divmod(u, width)
+        dx, dy = abs(x - gx), abs(y - gy)
+        return (dx - dy) << KEY_BITS | dy if dx > dy else (dy - dx) << KEY_BITS | dx
+
+    g = {start: 0}
+    dist = {start: 0.0}
+    parent = {start: None}
+    closed = set()
+    queue = BucketQueue(2 * SQRT2 if use_g else octile(len(adj) // width, width))
+    push, pop = queue.push, queue.pop
+    k = h(start) if use_h else 0
+    push((k >> KEY_BITS) + (k & KEY_MASK) * SQRT2, start)
+    expanded = peak = 0
+    while queue.n:
+        if queue.n > peak:
+            peak = queue.n
+        v = pop()
+        if v in closed:
+            continue
+        closed.add(v)
+        expanded += 1
+        if cancelled is not None and not expanded % POLL and cancelled():
+            return SearchResult(None, expanded, peak)
+        if v == goal:
+            return SearchResult(reconstruct(parent, goal), expanded, peak)
+        gv = g[v]
+        for u, c in adj[v]:
+            if u in closed or (member is not None and not member[u]):
+                continue
+            gu = gv + unit if c == 1.0 else gv + 1
+            if use_g:
+                key = (gu >> KEY_BITS) + (gu & KEY_MASK) * SQRT2
+                if key >= dist.get(u, math.inf):
+                    continue
+                dist[u] = key
+            elif u in parent:
+                continue
+            g[u] = gu
+            parent[u] = v
+            if use_h:
+                k = gu + h(u) if use_g else h(u)
+                key = (k >> KEY_BITS) + (k & KEY_MASK) * SQRT2
+            push(key, u)
+    return SearchResult(None, expanded, peak)
+
+
+def astar(adj, start, goal, width, member=None, cancelled=None, buckets=False):
+    """A* with the octile heuristic (eq:octile)."""
+    return _best_first(adj, start, goal, width, member, True, True, cancelled, buckets)
+
+
+def dijkstra(adj, start, goal, width, member=None, cancelled=None, buckets=False):
+    """Dijkstra's algorithm, i.e. A* with h = 0."""
+    return _best_first(adj, start, goal, width, member, True, False, cancelled, buckets)
+
+
+def greedy(adj, start, goal, width, member=None, cancelled=None, buckets=False):
+    """Greedy Best-First Search ordered by h alone."""
+    return _best_first(adj, start, goal, width, member, False, True, cancelled, buckets)
+
+
+def bfs(adj, start, goal, width, member=None, cancelled=None):
+    """Breadth-first search in hop order."""
+    parent = {start: None}
+    queue = deque([start])
+    expanded = peak = 0
+    while queue:
+        if len(queue) > peak:
+            peak = len(queue)
+        v = queue.popleft()
+        expanded += 1
+        if cancelled is not None and not expanded % POLL and cancelled():
+            return SearchResult(None, expanded, peak)
+        if v == goal:
+            return SearchResult(reconstruct(parent, goal), expanded, peak)
+        for u, _ in adj[v]:
+            if u in parent or (member is not None and not member[u]):
+                continue
+            parent[u] = v
+            queue.append(u)
+    return SearchResult(None, expanded, peak)
+
+
+def dfs(adj, start, goal, width, member=None, cancelled=None):
+    """Iterative depth-first search."""
+    parent = {start: None}
+    stack = [start]
+    seen = set()
+    expanded = peak = 0
+    while stack:
+        if len(stack) > peak:
+            peak = len(stack)
+        v = stack.pop()
+        if v in seen:
+            continue
+        seen.add(v)
+        expanded += 1
+        if cancelled is not None and not expanded % POLL and cancelled():
+            return SearchResult(None, expanded, peak)
+        if v == goal:
+            return SearchResult(reconstruct(parent, goal), expanded, peak)
+        for u, _ in reversed(adj[v]):
+            if u in seen or (member is not None and not member[u]):
+                continue
+            parent[u] = v
+            stack.append(u)
+    return SearchResult(None, expanded, peak)
+
+
+def _bidirectional(adj, start, goal, width, member, use_h, cancelled=None):
+    """Bidirectional best-first search meeting in the middle.
+
+    With ``use_h`` both directions use the average potentials
+    p_f(v) = (h_g(v) - h_s(v)) / 2 and p_r = -p_f, built from the octile
+    distances (eq:octile) to the goal and to the start. Both are consistent,
+    so every reduced edge cost stays non-negative with the sqrt(2) diagonal
+    costs. The potentials of the two directions cancel along any s-g path,
+    so the search may stop once the two open-list minima sum to at least
+    mu, the cheapest s-g path seen so far. Without ``use_h`` the potentials
+    are zero and this is the usual bidirectional Dijkstra rule. The
+    direction with the smaller open list is expanded next.
+
+    The gain is on the full grid. Inside an ILS/AILS corridor the corridor
+    width already caps both frontiers, so there is little left to save:
+    on 200x200 random, maze and room maps bidirectional A* expands about
+    0.76x the cells of A* on the full grid but 0.89x inside corridors, and
+    bidirectional Dijkstra about 1.02x the cells of Dijkstra inside
+    corridors.
+    """
+    if start == goal:
+        return SearchResult([start], 1, 1)
+    sx, sy = divmod(start, width)
+    gx, gy = divmod(goal, width)
+
+    def p(u):
+        x, y = divmod(u, width)
+        return (octile(abs(x - gx), abs(y - gy)) - octile(abs(x - sx), abs(y - sy))) / 2
+
+    g = ({start: 0.0}, {goal: 0.0})
+    parent = ({start: None}, {goal: None})
+    closed = (set(), set())
+    sign = (1.0, -1.0)
+    heaps = ([(p(start) if use_h else 0.0, 0, start)], [(-p(goal) if use_h else 0.0, 0, goal)])
+    tie = 1
+    mu, meet = math.inf, None
+    expanded = peak = 0
+    while True:
+        for d in (0, 1):
+            # Drop entries of vertices closed meanwhile so the tops are live keys.
+            while heaps[d] and heaps[d][0][2] in closed[d]:
+                heapq.heappop(heaps[d])
+        if not heaps[0] or not heaps[1]:
+            break
+        if len(heaps[0]) + len(heaps[1]) > peak:
+            peak = len(heaps[0]) + len(heaps[1])
+        if heaps[0][0][0] + heaps[1][0][0] >= mu:
+            break
+        d = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+        _, _, v = heapq.heappop(heaps[d])
+        closed[d].add(v)
+        expanded += 1
+        if cancelled is not None and not expanded % POLL and cancelled():
+            return SearchResult(None, expanded, peak)
+        gd, other = g[d], g[1 - d]
+        gv = gd[v]
+        for u, c in adj[v]:
+            if u in closed[d] or (member is not None and not member[u]):
+                continue
+            gu = gv + c
+            if gu >= gd.get(u, math.inf):
+                continue
+            gd[u] = gu
+            parent[d][u] = v
+            f = gu + sign[d] * p(u) if use_h else gu
+            heapq.heappush(heaps[d], (f, tie, u))
+            tie += 1
+            if u in other and gu + other[u] < mu:
+                mu, meet = gu + other[u], u
+    if meet is None:
+        return SearchResult(None, expanded, peak)
+    path = reconstruct(parent[0], meet)
+    u = parent[1][meet]
+    while u is not None:
+        path.append(u)
+        u = parent[1][u]
+    return SearchResult(path, expanded, peak)
+
+
+def bidir_astar(adj, start, goal, width, member=None, cancelled=None):
+    """Bidirectional A* with average octile potentials."""
+    return _bidirectional(adj, start, goal, width, member, True, cancelled)
+
+
+def bidir_dijkstra(adj, start, goal, width, member=None, cancelled=None):
+    """Bidirectional Dijkstra."""
+    return _bidirectional(adj, start, goal, width, member, False, cancelled)
+
+
+def jps(adj, start, goal, width, member=None, cancelled=None):
+    """Jump Point Search on the no-corner-cutting 8-connected grid.
+
+    Uses the pruning rules for grids where a diagonal step needs both
+    cardinal cells free: diagonal jumps stop where a straight jump along
+    either component finds a jump point, and straight jumps stop beside an
+    obstacle whose far side opens up. A cell is free when it has neighbours
+    in ``adj`` (a free cell without any is unreachable anyway). With a
+    corridor, jumps only land on cells ``member`` holds, but corner cutting
+    is still decided by obstacles alone, as in the adjacency lists: a
+    diagonal step may pass a free cell outside the corridor. Such a cell is
+    not a wall for the pruning rules either. Instead, a diagonal step past
+    it can only be taken from the cell beside it, so jumps also stop there
+    (forced neighbours past the corridor edge), and paths cost the same as
+    A* in the same corridor. Jump points are searched by A* with the octile
+    heuristic; ``expanded`` counts jump points, not scanned cells, and the
+    returned path lists every cell between them.
+    """
+    start, goal = int(start), int(goal)
+    H = len(adj) // width
+    gx, gy = divmod(goal, width)
+
+    def free(x, y):
+        return 0 <= x < H and 0 <= y < width and bool(adj[x * width + y])
+
+    def ok(x, y):
+        return free(x, y) and (member is None or bool(member[x * width + y]))
+
+    def edge(cx, cy, tx, ty, ox, oy):
+        # A diagonal step to (tx, ty) past the corner (cx, cy), which is
+        # free but outside the corridor, with (ox, oy) the other corner.
+        return free(cx, cy) and not ok(cx, cy) and ok(tx, ty) and free(ox, oy)
+
+    def jump(x, y, dx, dy):
+        while True:
+            if dx and dy and not (free(x + dx, y) and free(x, y + dy)):
+                return None
+            x += dx
+            y += dy
+            if not ok(x, y):
+                return None
+            if x == gx and y == gy:
+                return x, y
+            if dx and dy:
+                if member is not None and (edge(x - dx, y, x - dx, y + dy, x, y + dy)
+                                           or edge(x, y - dy, x + dx, y - dy, x + dx, y)):
+                    return x, y
+                if jump(x, y, dx, 0) is not None or jump(x, y, 0, dy) is not None:
+                    return x, y
+            elif dx:
+                if (ok(x, y + 1) and not free(x - dx, y + 1)) or (ok(x, y - 1) and not free(x - dx, y - 1)):
+                    return x, y
+                if member is not None and (edge(x, y + 1, x + dx, y + 1, x + dx, y)
+                                           or edge(x, y - 1, x + dx, y - 1, x + dx, y)):
+                    return x, y
+            else:
+                if (ok(x + 1, y) and not free(x + 1, y - dy)) or (ok(x - 1, y) and not free(x - 1, y - dy)):
+                    return x, y
+                if member is not None and (edge(x + 1, y, x + 1, y + dy, x, y + dy)
+                                           or edge(x - 1, y, x - 1, y + dy, x, y + dy)):
+                    return x, y
+
+    def directions(x, y, dx, dy):
+        if dx == 0 and dy == 0:
+            return [(ex, ey) for ex in (-1, 0, 1) for ey in (-1, 0, 1) if ex or ey]
+        if dx and dy:
+            out = []
+            if ok(x, y + dy):
+                out.append((0, dy))
+            if ok(x + dx, y):
+                out.append((dx, 0))
+            if free(x, y + dy) and free(x + dx, y):
+                out.append((dx, dy))
+            # Back diagonals past a corner outside the corridor.
+            if member is not None:
+                if not ok(x - dx, y):
+                    out.append((-dx, dy))
+                if not ok(x, y - dy):
+                    out.append((dx, -dy))
+            return out
+        # Straight move: ahead, the perpendicular turn when that cell is open
+        # and the forward diagonal when it is free.
+        out = [(dx, dy)] if ok(x + dx, y + dy) else []
+        for px, py in (((0, 1), (0, -1)) if dx else ((1, 0), (-1, 0))):
+            if ok(x + px, y + py):
+                out.append((px, py))
+            if free(x + px, y + py):
+                out.append((dx + px, dy + py))
+        return out
+
+    g = {start: 0.0}
+    parent = {start: None}
+    closed = set()
+    sx, sy = divmod(start, width)
+    heap = [(octile(abs(sx - gx), abs(sy - gy)), 0, start)]
+    tie = 1
+    expanded = peak = 0
+    while heap:
+        if len(heap) > peak:
+            peak = len(heap)
+        _, _, v = heapq.heappop(heap)
+        if v in closed:
+            continue
+        closed.add(v)
+        expanded += 1
+        if cancelled is not None and not expanded % POLL and cancelled():
+            return SearchResult(None, expanded, peak)
+        if v == goal:
+            return SearchResult(_interpolate(reconstruct(parent, goal), width), expanded, peak)
+        x, y = divmod(v, width)
+        dx = dy = 0
+        if parent[v] is not None:
+            px, py = divmod(parent[v], width)
+            dx, dy = (x > px) - (x < px), (y > py) - (y < py)
+        gv = g[v]
+        for ex, ey in directions(x, y, dx, dy):
+            point = jump(x, y, ex, ey)
+            if point is None:
+                continue
+            u = point[0] * width + point[1]
+            if u in closed:
+                continue
+            gu = gv + octile(abs(point[0] - x), abs(point[1] - y))
+            if gu >= g.get(u, float("inf")):
+                continue
+            g[u] = gu
+            parent[u] = v
+            heapq.heappush(heap, (gu + octile(abs(point[0] - gx), abs(point[1] - gy)), tie, u))
+            tie += 1
+    return SearchResult(None, expanded, peak)
+
+
+def _interpolate(points, width):
+    """Cell-by-cell path through jump points joined by straight or diagonal runs."""
+    path = [points[0]]
+    for a, b in zip(points, points[1:]):
+        ax, ay = divmod(a, width)
+        bx, by = divmod(b, width)
+        step = ((bx > ax) - (bx < ax)) * width + (by > ay) - (by < ay)
+        path.extend(range(a + step, b + step, step))
+    return path
+
+
+ALGORITHMS = {
+    "astar": astar,
+    "dijkstra": dijkstra,
+    "bfs": bfs,
+    "dfs": dfs,
+    "greedy": greedy,
+    "bidir_astar": bidir_astar,
+    "bidir_dijkstra": bidir_dijkstra,
+    "jps": jps,
+}
+
+# Algorithms that accept ``buckets`` and so can run on a BucketQueue.
+BUCKETED = frozenset({"astar", "dijkstra", "greedy"})
+
+# Algorithms that assume unit and sqrt(2) step costs rather than reading them
+# from the adjacency lists, and so cannot run on a cost field.
+UNIFORM_COST = frozenset({"jps"})
+
+# The five algorithms of the thesis experiments, the default algorithm set.
+CLASSICAL = ("astar", "dijkstra", "bfs", "dfs", "greedy")
+
+# Algorithms that receive line-of-sight post-processing (subsec:reconstruction).
+SMOOTHED = frozenset({"astar", "dijkstra", "bfs", "bidir_astar", "bidir_dijkstra", "jps"})
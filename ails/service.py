@@ -0,0 +1,208 @@
+"""Asyncio planning service for online queries.
+
+:class:`PlanningService` keeps a registry of named maps: their grids and
+integral images live in one :class:`~ails.shared.SharedDataset`, and the
+service holds a :class:`~ails.planner.GridPlanner` per map for validation
+and the O(1) component-label reachability test, so unreachable queries are
+answered without leaving the event loop. Reachable queries are queued per
+map and coalesced into micro-batches: a batch is dispatched to the process
+pool when it reaches ``max_batch`` queries or ``max_delay`` seconds after
+its first query, whichever comes first. Workers attach to the shared block
+once and build a planner per map on first use, so a batch carries only the
+map index and its endpoints.
+
+Every request's latency (submission to result) is recorded, and
+:meth:`PlanningService.stats` reports p50/p99. :func:`load_test` is a local
+closed-loop load generator.
+
+Usage::
+
+    python -m ails.service --size 300 --workers 1 2 4 --requests 2000
+"""
+
+import argparse
+import asyncio
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import shared as _shared
+from .maps import generate
+from .planner import GridPlanner, PlanResult
+
+_planners = {}
+
+
+def _plan_batch(index, queries):
+    """Worker side: run ``queries`` on map ``index`` of the attached dataset."""
+    planner = _planners.get(index)
+    if planner is None:
+        dataset = _shared.attached()
+        occ, ii = dataset[index]
+        planner = _planners[index] = GridPlanner(occ, ii=ii, table=dataset.table(index))
+    return [planner.plan(s, g, a, m) for s, g, a, m in queries]
+
+
+class PlanningService:
+    """Micro-batching front end to a process pool of planners.
+
+    ``maps`` maps names to occupancy grids. Use as an async context manager,
+    or call :meth:`start` and :meth:`close`.
+    """
+
+    def __init__(self, maps, workers=None, max_batch=8, max_delay=0.002, algorithm="astar", mode="ails"):
+        self.names = list(maps)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.workers = workers
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.algorithm = algorithm
+        self.mode = mode
+        self.dataset = _shared.SharedDataset([maps[name] for name in self.names])
+        self.planners = []
+        for i in range(len(self.names)):
+            occ, ii = self.dataset[i]
+            self.planners.append(GridPlanner(occ, algorithm, mode, ii=ii, table=self.dataset.table(i)))
+        self._pending = {}
+        self._timers = {}
+        self._latency = []
+        self._batches = 0
+        self._pool = None
+
+    async def start(self):
+        self._pool = ProcessPoolExecutor(self.workers, initializer=_shared.attach,
+                                         initargs=(self.dataset.handle,))
+        return self
+
+    async def close(self):
+        """Dispatch the batches still waiting for their timer, then shut the pool down.
+
+        Queries already submitted get their results. The pool is shut down
+        in a thread so that the event loop keeps running meanwhile.
+        """
+        for i in list(self._pending):
+            self._flush(i)
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await asyncio.get_running_loop().run_in_executor(None, pool.shutdown)
+        # Views into the shared block must go before it is closed.
+        self.planners = []
+        self.dataset.close()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def plan(self, name, start, goal, algorithm=None, mode=None):
+        """Plan on map ``name`` and return the :class:`PlanResult`."""
+        t0 = time.perf_counter()
+        i = self.index[name]
+        planner = self.planners[i]
+        start, goal, algorithm, mode = planner._check(start, goal, algorithm, mode)
+        if not planner.reachable(start, goal):
+            result = PlanResult(None, math.inf, 0, 0)
+        else:
+            fut = asyncio.get_running_loop().create_future()
+            batch = self._pending.setdefault(i, [])
+            batch.append(((start, goal, algorithm, mode), fut))
+            if len(batch) >= self.max_batch:
+                self._flush(i)
+            elif i not in self._timers:
+                self._timers[i] = asyncio.get_running_loop().call_later(self.max_delay, self._flush, i)
+            result = await fut
+        self._latency.append(time.perf_counter() - t0)
+        return result
+
+    def _flush(self, i):
+        timer = self._timers.pop(i, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(i, None)
+        if not batch:
+            return
+        if self._pool is None:
+            for _, f in batch:
+                if not f.done():
+                    f.set_exception(RuntimeError("planning service is not running"))
+            return
+        self._batches += 1
+        queries = [q for q, _ in batch]
+        futures = [f for _, f in batch]
+        task = asyncio.get_running_loop().run_in_executor(self._pool, _plan_batch, i, queries)
+        task.add_done_callback(lambda t: self._deliver(t, futures))
+
+    @staticmethod
+    def _deliver(task, futures):
+        if task.exception() is not None:
+            for f in futures:
+                if not f.done():
+                    f.set_exception(task.exception())
+            return
+        for f, result in zip(futures, task.result()):
+            if not f.done():
+                f.set_result(result)
+
+    def stats(self):
+        """Request count, batch count and p50/p99 latency in milliseconds."""
+        lat = np.asarray(self._latency) * 1e3
+        p50, p99 = np.percentile(lat, [50, 99]) if len(lat) else (math.nan, math.nan)
+        return {"requests": len(lat), "batches": self._batches, "p50_ms": float(p50), "p99_ms": float(p99)}
+
+    def reset_stats(self):
+        self._latency = []
+        self._batches = 0
+
+
+async def load_test(service, name, pairs, requests=1000, concurrency=64):
+    """Closed-loop load: ``concurrency`` clients cycling through ``pairs``.
+
+    Returns the service stats plus the achieved throughput (requests/s).
+    """
+    service.reset_stats()
+    counter = iter(range(requests))
+
+    async def client():
+        for k in counter:
+            s, g = pairs[k % len(pairs)]
+            await service.plan(name, s, g)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+    return dict(service.stats(), throughput=requests / elapsed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the planning service on a synthetic map.")
+    parser.add_argument("--size", type=int, default=300)
+    parser.add_argument("--density", type=float, default=0.2)
+    parser.add_argument("--topology", default="random")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    rng = np.random.default_rng(args.seed)
+    occ = generate(args.topology, rng, (args.size, args.size), args.density)
+    free = np.argwhere(occ == 0)
+    pairs = [tuple(map(tuple, free[rng.choice(len(free), 2, replace=False)])) for _ in range(256)]
+
+    async def run(workers):
+        async with PlanningService({"map": occ}, workers, args.max_batch) as service:
+            # Warm-up: every worker builds its planner before timing starts.
+            await load_test(service, "map", pairs, 4 * workers * args.max_batch, args.concurrency)
+            return await load_test(service, "map", pairs, args.requests, args.concurrency)
+
+    for workers in args.workers:
+        r = asyncio.run(run(workers))
+        print(f"workers={workers}: {r['throughput']:.0f} req/s, p50 {r['p50_ms']:.1f} ms, "
+              f"p99 {r['p99_ms']:.1f} ms, {r['requests'] / max(r['batches'], 1):.1f} req/batch", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Shared-memory transport of grids, integral images and neighbour tables for worker processes.
+
+:class:`SharedDataset` packs the occupancy grids of a dataset, their
+integral images and their neighbour tables into one
+``multiprocessing.shared_memory`` block. Workers
+attach once by name (see :func:`attach`), after which a task needs only the
+map index: dispatch cost no longer depends on grid size, and every process
+reads the same physical pages instead of holding its own copy. A
+:class:`~ails.planner.GridPlanner` built on the views (``ii=``, ``table=``)
+only adds the rows of :class:`~ails.grid.Adjacency` that its searches
+reach and the component labels (4 bytes per cell).
+"""
+
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .grid import integral_image, neighbour_table
+
+_ALIGN = 64
+# Neighbour indices are stored as int32 (32 bytes per cell instead of 64).
+TABLE_DTYPE = np.int32
+
+
+@dataclass(frozen=True)
+class DatasetHandle:
+    """Picklable description of a :class:`SharedDataset` block."""
+
+    name: str
+    shapes: tuple
+    ii_dtype: str
+    offsets: tuple
+
+
+def _layout(shapes, ii_itemsize):
+    offsets = []
+    pos = 0
+    for H, W in shapes:
+        occ_at = pos
+        pos += -(-(H * W) // _ALIGN) * _ALIGN
+        ii_at = pos
+        pos += -(-((H + 1) * (W + 1) * ii_itemsize) // _ALIGN) * _ALIGN
+        table_at = pos
+        pos += -(-(H * W * 8 * np.dtype(TABLE_DTYPE).itemsize) // _ALIGN) * _ALIGN
+        offsets.append((occ_at, ii_at, table_at))
+    return tuple(offsets), max(pos, 1)
+
+
+class SharedDataset:
+    """Grids, integral images and neighbour tables of many maps in one shared-memory block.
+
+    Create it in the parent from a list of grids, hand :attr:`handle` to the
+    workers, and call :meth:`close` (or use it as a context manager) when
+    done; the creating process also unlinks the block.
+    """
+
+    def __init__(self, grids=None, handle=None):
+        if handle is None:
+            grids = [np.asarray(g, dtype=np.uint8) for g in grids]
+            shapes = tuple(g.shape for g in grids)
+            iis = [integral_image(g) for g in grids]
+            ii_dtype = np.result_type(*(ii.dtype for ii in iis)) if iis else np.dtype(np.int32)
+            offsets, size = _layout(shapes, ii_dtype.itemsize)
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+            self._owner = True
+            self.handle = DatasetHandle(self._shm.name, shapes, ii_dtype.str, offsets)
+            for i, (g, ii) in enumerate(zip(grids, iis)):
+                occ_view, ii_view = self[i]
+                occ_view[...] = g
+                ii_view[...] = ii
+                self.table(i)[...] = neighbour_table(g)
+        else:
+            # Only the owner may unlink the block. Pool workers share the
+            # owner's resource tracker, so their registration is a no-op;
+            # where supported, skip tracking outright.
+            try:
+                self._shm = shared_memory.SharedMemory(name=handle.name, track=False)
+            except TypeError:
+                self._shm = shared_memory.SharedMemory(name=handle.name)
+            self._owner = False
+            self.handle = handle
+
+    def __len__(self):
+        return len(self.handle.shapes)
+
+    def __getitem__(self, i):
+        """Zero-copy (occ, ii) views of map ``i``."""
+        H, W = self.handle.shapes[i]
+        occ_at, ii_at, _ = self.handle.offsets[i]
+        buf = self._shm.buf
+        occ = np.ndarray((H, W), dtype=np.uint8, buffer=buf, offset=occ_at)
+        ii = np.ndarray((H + 1, W + 1), dtype=np.dtype(self.handle.ii_dtype), buffer=buf, offset=ii_at)
+        return occ, ii
+
+    def table(self, i):
+        """Zero-copy view of the :func:`~ails.grid.neighbour_table` of map ``i``."""
+        H, W = self.handle.shapes[i]
+        return np.ndarray((H * W, 8), dtype=TABLE_DTYPE, buffer=self._shm.buf, offset=self.handle.offsets[i][2])
+
+    def close(self):
+        """Detach; views returned by ``self[i]`` and :meth:`table` must be released first."""
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_attached = None
+
+
+def attach(handle):
+    """Pool initializer: attach this worker to the dataset described by ``handle``."""
+    global _attached
+    _attached = SharedDataset(handle=handle)
+
+
+def attached():
+    """The dataset this worker attached to via :func:`attach`."""
+    if _attached is None:
+        raise RuntimeError("no shared dataset attached in this process")
+    return _attached
+
+
+def detach():
+    """Close the dataset attached via :func:`attach`, if any."""
+    global _attached
+    if _attached is not None:
+        _attached.close()
+        _attached = None
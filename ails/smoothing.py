@@ -0,0 +1,91 @@
+"""Line-of-sight path post-processing (subsec:reconstruction).
+
+Visibility tests are batched: :func:`visible` rasterises many Bresenham
+segments in one pass and checks them against the occupancy array, so the
+smoother below costs a handful of NumPy calls per kept waypoint instead of
+one Python-level Bresenham walk per path vertex.
+"""
+
+import math
+
+import numpy as np
+
+from .grid import bresenham, segments
+
+
+def line_of_sight(occ, a, b):
+    """True if every cell on the Bresenham line from ``a`` to ``b`` is free."""
+    xs, ys = bresenham(a, b)
+    return not occ[xs, ys].any()
+
+
+def visible(occ, ax, ay, bx, by):
+    """Vectorised :func:`line_of_sight` for K segments given as coordinate arrays.
+
+    All segments are rasterised together by :func:`ails.grid.segments`;
+    returns a boolean array of length K.
+    """
+    xs, ys, starts = segments(ax, ay, bx, by)
+    blocked = np.add.reduceat(occ[xs, ys].astype(np.int64), starts) if len(starts) else np.zeros(0)
+    return blocked == 0
+
+
+def _first_blocked(occ, pts, window):
+    """For every vertex i, the first j in (i + 1, i + window] it cannot see.
+
+    All n x window segments are tested in one batch. Entries are ``n`` when
+    everything up to the path end is visible and -1 when the window was
+    exhausted before the path end.
+    """
+    n = len(pts)
+    i = np.arange(n)[:, None]
+    j = i + np.arange(2, window + 1)[None, :]
+    inside = j < n
+    ii, jj = np.broadcast_to(i, j.shape)[inside], j[inside]
+    ok = np.ones(j.shape, dtype=bool)
+    ok[inside] = visible(occ, pts[ii, 0], pts[ii, 1], pts[jj, 0], pts[jj, 1])
+    blocked = ~ok
+    first = np.where(blocked.any(axis=1), j[np.arange(n), blocked.argmax(axis=1)], -1)
+    first[(first < 0) & (i[:, 0] + window >= n - 1)] = n
+    return first
+
+
+def smooth_path(occ, path, window=16, chunk=32):
+    """Drop a waypoint whenever its predecessor can see its successor.
+
+    Theta*-style post-processing: from the current anchor the path is
+    followed until the first vertex the anchor cannot see, and the vertex
+    before it becomes the next anchor. Visibility over the next ``window``
+    vertices is tested for every vertex in one batch; anchors that see
+    further continue in batches of ``chunk`` vertices (doubling while all
+    are visible). The result is identical to testing one vertex at a time.
+    """
+    if len(path) < 3:
+        return list(path)
+    pts = np.asarray(path, dtype=np.int64)
+    n = len(pts)
+    first = _first_blocked(occ, pts, window)
+    keep = [0]
+    a = 0
+    while True:
+        j = int(first[a])
+        if j < 0:
+            j, step = a + window + 1, chunk
+            while j < n:
+                hi = min(j + step, n)
+                ok = visible(occ, pts[a, 0], pts[a, 1], pts[j:hi, 0], pts[j:hi, 1])
+                if not ok.all():
+                    j += int(np.argmin(ok))
+                    break
+                j, step = hi, 2 * step
+        if j >= n:
+            break
+        a = j - 1
+        keep.append(a)
+    keep.append(n - 1)
+    return [tuple(p) for p in pts[keep].tolist()]
+
+
+def path_length(path):
+    """Euclidean length of a waypoint sequence (equals edge cost on raw paths)."""
+    return sum(math.hypot(b[0] - a[0], b[1] - a[1]) for a, b in zip(path, path[1:]))
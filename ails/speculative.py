@@ -0,0 +1,205 @@
+"""Speculative ILS: several corridor widths searched concurrently.
+
+alg:ils tries w0, w0 + dw, w0 + 2 dw, ... one after another, and every
+failed width costs a full constrained search. On maze and room layouts a
+query can fail many times before its corridor is wide enough.
+:class:`SpeculativeILS` instead submits the next ``k`` widths of that
+sequence to a process pool at once and returns the narrowest width that
+succeeds, which is exactly the path sequential ILS would have returned. A
+hard query then costs about one search of latency per batch of ``k``
+widths rather than ``k`` searches, paid for with ``k`` cores. That latency
+gain is the design expectation only: it has not been measured, since the
+module was developed and tested on a single CPU, where the widths of a
+batch run one after another.
+
+Once width ``i`` succeeds and every narrower width has finished, the wider
+searches are no longer needed. A shared flag tells the workers, and their
+searches give up at the next ``cancelled`` poll (see :mod:`ails.search`).
+The reported expansions count every search of the query, including
+abandoned ones, so they measure total work rather than the sequential cost.
+
+The grid and integral image reach the workers through a
+:class:`~ails.shared.SharedDataset`, as in :mod:`ails.service`.
+
+Usage::
+
+    python -m ails.speculative --topology maze --size 300 --workers 4
+"""
+
+import argparse
+import itertools
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from . import shared as _shared
+from .corridor import ils_corridor
+from .grid import bresenham
+from .maps import generate
+from .planner import GridPlanner, PlanResult
+from .search import ALGORITHMS
+
+_planner = None
+_flags = None
+
+
+def _init(handle, flags):
+    """Pool initializer: attach to the shared grid and the cancellation flags."""
+    global _flags
+    _shared.attach(handle)
+    _flags = flags
+
+
+def _search_width(query, i, start, goal, algorithm, w):
+    """Worker side: constrained search of width ``w``, candidate ``i`` of ``query``."""
+    global _planner
+    if _planner is None:
+        dataset = _shared.attached()
+        occ, ii = dataset[0]
+        _planner = GridPlanner(occ, ii=ii, table=dataset.table(0))
+
+    def cancelled():
+        # A newer query, or a narrower candidate that already succeeded.
+        return _flags[0] != query or 0 <= _flags[1] < i
+
+    if cancelled():
+        return i, None, 0
+    xs, ys = bresenham(start, goal)
+    cells = ils_corridor(_planner.occ, xs, ys, w)
+    res = _planner._search_in(ALGORITHMS[algorithm], _planner._flat(start), _planner._flat(goal),
+                              cells, cancelled)
+    return i, res, len(cells)
+
+
+class SpeculativeILS:
+    """ILS on one grid with ``k`` candidate widths searched at once on ``workers`` processes.
+
+    ``k`` defaults to the number of workers. Use as a context manager, or
+    call :meth:`close`.
+    """
+
+    def __init__(self, grid, workers=None, k=None, algorithm="astar", ils=None):
+        self.dataset = _shared.SharedDataset([grid])
+        occ, ii = self.dataset[0]
+        self.planner = GridPlanner(occ, algorithm, "ils", ils, ii=ii, table=self.dataset.table(0))
+        self.workers = workers or os.cpu_count() or 1
+        self.k = k or self.workers
+        self._flags = multiprocessing.RawArray("q", 2)
+        self._query = 0
+        self._pool = ProcessPoolExecutor(self.workers, initializer=_init,
+                                         initargs=(self.dataset.handle, self._flags))
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        # Views into the shared block must go before it is closed.
+        self.planner = None
+        self.dataset.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def widths(self):
+        """The width sequence of alg:ils, ending at max(H, W)."""
+        p = self.planner
+        w_max = max(p.H, p.W)
+        w = p.w0
+        while True:
+            yield w
+            if w >= w_max:
+                return
+            w = min(w + p.ils.delta_w, w_max)
+
+    def plan(self, start, goal, algorithm=None):
+        """Run one query and return its :class:`~ails.planner.PlanResult`.
+
+        ``rounds`` is the index of the returned width in the sequence, i.e.
+        the number of widening rounds sequential ILS would have needed.
+        """
+        p = self.planner
+        start, goal, algorithm, _ = p._check(start, goal, algorithm, "ils")
+        t0 = time.perf_counter()
+        if not p.reachable(start, goal):
+            result = PlanResult(None, math.inf, 0, 0)
+        else:
+            result = self._speculate(start, goal, algorithm)
+        return p._finish(result, algorithm, "ils", t0)
+
+    def _speculate(self, start, goal, algorithm):
+        widths = self.widths()
+        expanded = rounds = 0
+        while True:
+            batch = list(itertools.islice(widths, self.k))
+            self._query += 1
+            self._flags[1] = -1
+            self._flags[0] = self._query
+            futures = [self._pool.submit(_search_width, self._query, i, start, goal, algorithm, w)
+                       for i, w in enumerate(batch)]
+            results = [None] * len(batch)
+            best = None
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    i, res, size = fut.result()
+                    results[i] = res, size
+                    if res is not None and res.path is not None and (best is None or i < best):
+                        best = i
+                        self._flags[1] = i
+                if best is not None and all(results[j] is not None for j in range(best)):
+                    break
+            # Wider candidates see the flag at their next poll; waiting for
+            # them keeps the expansion count exact and the pool idle for
+            # the next query.
+            for fut in pending:
+                fut.cancel()
+            for fut in pending:
+                if not fut.cancelled():
+                    i, res, size = fut.result()
+                    results[i] = res, size
+            expanded += sum(r[0].expanded for r in results if r is not None and r[0] is not None)
+            if best is not None:
+                res, size = results[best]
+                return self.planner._result(res, expanded, size, rounds + best)
+            rounds += len(batch)
+            if len(batch) < self.k or batch[-1] >= max(self.planner.H, self.planner.W):
+                res, size = results[-1]
+                return self.planner._result(res, expanded, size, rounds - 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latency of sequential against speculative ILS.")
+    parser.add_argument("--size", type=int, default=300)
+    parser.add_argument("--density", type=float, default=0.2)
+    parser.add_argument("--topology", default="maze")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--k", type=int, default=None)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    rng = np.random.default_rng(args.seed)
+    occ = generate(args.topology, rng, (args.size, args.size), args.density)
+    with SpeculativeILS(occ, args.workers, args.k) as spec:
+        labels = spec.planner.labels
+        free = np.argwhere(labels == np.bincount(labels[labels >= 0]).argmax())
+        pairs = [tuple(map(tuple, free[rng.choice(len(free), 2, replace=False)])) for _ in range(args.queries)]
+        spec.plan(*pairs[0])
+        for name, run in (("sequential", lambda s, g: spec.planner.plan(s, g, mode="ils")),
+                          ("speculative", spec.plan)):
+            results = [run(s, g) for s, g in pairs]
+            ms = np.array([r.time_ms for r in results])
+            print(f"{name}: p50 {np.percentile(ms, 50):.1f} ms, p99 {np.percentile(ms, 99):.1f} ms, "
+                  f"max {ms.max():.1f} ms, mean rounds {np.mean([r.rounds for r in results]):.2f}, "
+                  f"mean expanded {np.mean([r.expanded for r in results]):.0f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
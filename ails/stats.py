@@ -0,0 +1,293 @@
+"""Statistical analysis of a results store (subsec:protocol).
+
+Everything works on the column arrays returned by
+:meth:`~ails.experiments.ResultStore.load`. A grouping key is turned into
+one integer code per row with :func:`group_ids`, and per-group statistics
+are ``numpy.bincount`` or ``reduceat`` reductions over those codes, so each
+grouping costs a few passes over the columns instead of a Python loop per
+configuration.
+
+* :func:`summarise`: count, mean, standard deviation and median per group;
+* :func:`paired_test`: two-sided paired t-test of one mode (or algorithm)
+  against another, matched per map and start-goal pair, with Cohen's d;
+* :func:`bootstrap_ci`: percentile bootstrap intervals of group means,
+  with replicates drawn in chunks across a process pool.
+
+The t distribution is evaluated through a vectorised regularised
+incomplete beta function, so scipy is not needed.
+
+Usage::
+
+    python -m ails.stats results/ds2.jsonl --metric time_ms --a standard --b ails
+"""
+
+import argparse
+import math
+import multiprocessing
+
+import numpy as np
+
+# The compared column (``on``) is dropped from both key lists.
+GROUP_BY = ("dataset", "size", "density", "topology", "algorithm", "mode")
+MATCH = ("key", "pair", "algorithm", "mode")
+# Cohen's thresholds used in the results chapters.
+EFFECT_LABELS = ((0.2, "negligible"), (0.5, "small"), (0.8, "medium"), (math.inf, "large"))
+
+
+def group_ids(cols, keys, rows=None):
+    """Dense group code of every row (or of ``rows``) under the columns ``keys``.
+
+    Returns (ids, groups) where ``groups`` maps each key to its value per
+    group, groups being ordered by key values.
+    """
+    sel = slice(None) if rows is None else rows
+    if not keys:
+        n = len(next(iter(cols.values()))[sel])
+        return np.zeros(n, dtype=np.int64), {}
+    combined = None
+    for k in keys:
+        values, code = np.unique(cols[k][sel], return_inverse=True)
+        code = code.ravel().astype(np.int64)
+        if combined is None:
+            combined = code
+        else:
+            # Re-densify after every key so the combined code cannot overflow.
+            _, combined = np.unique(combined * len(values) + code, return_inverse=True)
+            combined = combined.ravel()
+    _, first, ids = np.unique(combined, return_index=True, return_inverse=True)
+    idx = np.arange(len(combined)) if rows is None else np.asarray(rows)
+    if idx.dtype == bool:
+        idx = np.flatnonzero(idx)
+    return ids.ravel(), {k: cols[k][idx[first]] for k in keys}
+
+
+def grouped_mean_std(ids, values, n_groups):
+    """Count, mean and sample standard deviation of ``values`` per group."""
+    n = np.bincount(ids, minlength=n_groups)
+    mean = np.bincount(ids, values, minlength=n_groups) / np.maximum(n, 1)
+    ss = np.bincount(ids, (values - mean[ids]) ** 2, minlength=n_groups)
+    std = np.sqrt(ss / np.maximum(n - 1, 1))
+    return n, mean, std
+
+
+def grouped_median(ids, values, n_groups):
+    """Median of ``values`` per group (NaN for empty groups)."""
+    order = np.lexsort((values, ids))
+    v = values[order]
+    n = np.bincount(ids, minlength=n_groups)
+    start = np.cumsum(n) - n
+    lo = start + np.maximum(n - 1, 0) // 2
+    hi = start + n // 2
+    out = np.full(n_groups, np.nan)
+    ok = n > 0
+    out[ok] = (v[lo[ok]] + v[np.minimum(hi[ok], len(v) - 1)]) / 2
+    return out
+
+
+def summarise(cols, metric="time_ms", by=GROUP_BY, where=None):
+    """Per-group count, mean, std and median of ``metric``.
+
+    ``where`` is an optional boolean row mask, e.g. ``cols["found"]`` to
+    exclude failed queries from timing metrics as in sec:meth_metrics.
+    """
+    ids, out = group_ids(cols, by, where)
+    values = np.asarray(cols[metric] if where is None else cols[metric][where], dtype=np.float64)
+    G = int(ids.max()) + 1 if len(ids) else 0
+    out["n"], out["mean"], out["std"] = grouped_mean_std(ids, values, G)
+    out["median"] = grouped_median(ids, values, G)
+    return out
+
+
+def _betacf(a, b, x, iterations=300, eps=1e-14):
+    tiny = 1e-300
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    c = np.ones_like(x)
+    d = 1.0 - qab * x / qap
+    d = 1.0 / np.where(np.abs(d) < tiny, tiny, d)
+    h = d.copy()
+    for m in range(1, iterations + 1):
+        m2 = 2 * m
+        for aa in (m * (b - m) * x / ((qam + m2) * (a + m2)),
+                   -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))):
+            d = 1.0 + aa * d
+            d = 1.0 / np.where(np.abs(d) < tiny, tiny, d)
+            c = 1.0 + aa / c
+            c = np.where(np.abs(c) < tiny, tiny, c)
+            step = d * c
+            h *= step
+        if np.all(np.abs(step - 1.0) < eps):
+            break
+    return h
+
+
+def betainc(a, b, x):
+    """Regularised incomplete beta function I_x(a, b), elementwise."""
+    a, b, x = np.broadcast_arrays(*(np.asarray(v, dtype=np.float64) for v in (a, b, x)))
+    lgamma = np.frompyfunc(math.lgamma, 1, 1)
+    flip = x > (a + 1.0) / (a + b + 2.0)
+    a2, b2 = np.where(flip, b, a), np.where(flip, a, b)
+    x2 = np.clip(np.where(flip, 1.0 - x, x), 0.0, 1.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lbeta = np.asarray(lgamma(a2 + b2) - lgamma(a2) - lgamma(b2), dtype=np.float64)
+        front = np.exp(a2 * np.log(x2) + b2 * np.log1p(-x2) + lbeta) / a2
+        res = np.where(x2 > 0, front * _betacf(a2, b2, x2), 0.0)
+    return np.where(flip, 1.0 - res, res)
+
+
+def t_pvalue(t, df):
+    """Two-sided p-value of Student's t statistic with ``df`` degrees of freedom."""
+    t = np.asarray(t, dtype=np.float64)
+    df = np.asarray(df, dtype=np.float64)
+    ok = df > 0
+    # Groups of one pair have df = 0; evaluate them at df = 1 and mask them out.
+    dfs = np.where(ok, df, 1.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = betainc(dfs / 2.0, 0.5, dfs / (dfs + t * t))
+    return np.where(ok, p, np.nan)
+
+
+def effect_label(d):
+    """Cohen's label for each |d|."""
+    d = np.abs(np.asarray(d, dtype=np.float64))
+    bounds = np.array([b for b, _ in EFFECT_LABELS])
+    names = np.array([n for _, n in EFFECT_LABELS])
+    out = names[np.minimum(np.searchsorted(bounds, d, side="right"), len(names) - 1)]
+    return np.where(np.isnan(d), "", out)
+
+
+def pair_rows(cols, a, b, on="mode", match=MATCH):
+    """Row indices (ia, ib) of measurements of ``a`` and ``b`` on the same instance."""
+    sel = np.flatnonzero((cols[on] == a) | (cols[on] == b))
+    match = tuple(k for k in match if k != on)
+    ids, _ = group_ids(cols, match, sel)
+    n = int(ids.max()) + 1 if len(ids) else 0
+    ia = np.full(n, -1, dtype=np.int64)
+    ib = np.full(n, -1, dtype=np.int64)
+    is_a = cols[on][sel] == a
+    ia[ids[is_a]] = sel[is_a]
+    ib[ids[~is_a]] = sel[~is_a]
+    ok = (ia >= 0) & (ib >= 0)
+    return ia[ok], ib[ok]
+
+
+def paired_test(cols, metric="time_ms", a="standard", b="ails", on="mode", by=GROUP_BY, match=MATCH,
+                found_only=True):
+    """Two-sided paired t-test of ``a`` against ``b`` per group (subsec:protocol).
+
+    Rows with ``cols[on] == a`` are matched to rows with ``cols[on] == b``
+    on ``match`` (by default the same map, start-goal pair and whichever of
+    algorithm or mode is not being compared).
+    Cohen's d uses the average of the two conditions' variances as its
+    denominator, so it does not shrink with the pair correlation. With
+    ``found_only`` instances that either side failed are left out.
+    """
+    ia, ib = pair_rows(cols, a, b, on, match)
+    if found_only:
+        keep = cols["found"][ia].astype(bool) & cols["found"][ib].astype(bool)
+        ia, ib = ia[keep], ib[keep]
+    by = tuple(k for k in by if k != on)
+    ids, out = group_ids(cols, by, ia)
+    G = int(ids.max()) + 1 if len(ids) else 0
+    xa = np.asarray(cols[metric][ia], dtype=np.float64)
+    xb = np.asarray(cols[metric][ib], dtype=np.float64)
+    n, mean_a, sd_a = grouped_mean_std(ids, xa, G)
+    _, mean_b, sd_b = grouped_mean_std(ids, xb, G)
+    _, diff, sd_diff = grouped_mean_std(ids, xa - xb, G)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = diff / (sd_diff / np.sqrt(n))
+        d = diff / np.sqrt((sd_a ** 2 + sd_b ** 2) / 2)
+    out.update({"n": n, "mean_" + str(a): mean_a, "mean_" + str(b): mean_b, "diff": diff,
+                "t": t, "p": t_pvalue(t, n - 1), "d": d, "effect": effect_label(d)})
+    return out
+
+
+_boot = None
+
+
+def _boot_init(values, ids, n_groups):
+    global _boot
+    order = np.argsort(ids, kind="stable")
+    n = np.bincount(ids, minlength=n_groups)
+    _boot = (values[order], ids[order], n, np.cumsum(n) - n)
+
+
+def _boot_chunk(args):
+    seed, reps = args
+    values, ids, n, start = _boot
+    rng = np.random.default_rng(seed)
+    nonempty = np.flatnonzero(n)
+    out = np.full((reps, len(n)), np.nan)
+    # Keep each draw near 4M cells.
+    step = max(1, (1 << 22) // max(len(values), 1))
+    for r0 in range(0, reps, step):
+        r1 = min(r0 + step, reps)
+        idx = start[ids] + (rng.random((r1 - r0, len(values))) * n[ids]).astype(np.int64)
+        sums = np.add.reduceat(values[idx], start[nonempty], axis=1)
+        out[r0:r1, nonempty] = sums / n[nonempty]
+    return out
+
+
+def bootstrap_ci(values, ids, n_groups=None, reps=2000, level=0.95, seed=0, workers=None, chunk=250):
+    """Percentile bootstrap interval of the mean of ``values`` in every group.
+
+    Replicates resample each group with replacement, all groups at once.
+    They are split into chunks of ``chunk`` replicates with independent
+    seeds, run on a process pool (``workers=1`` runs in-process), so the
+    interval depends on ``seed`` but not on the number of workers.
+    Returns (lo, hi) arrays of length ``n_groups``.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    ids = np.asarray(ids, dtype=np.int64)
+    n_groups = int(ids.max()) + 1 if n_groups is None else n_groups
+    seeds = np.random.SeedSequence(seed).spawn(-(-reps // chunk))
+    tasks = [(s, min(chunk, reps - i * chunk)) for i, s in enumerate(seeds)]
+    if workers == 1:
+        _boot_init(values, ids, n_groups)
+        parts = [_boot_chunk(t) for t in tasks]
+    else:
+        with multiprocessing.Pool(workers, initializer=_boot_init, initargs=(values, ids, n_groups)) as pool:
+            parts = pool.map(_boot_chunk, tasks)
+    means = np.concatenate(parts)
+    tail = (1.0 - level) / 2 * 100
+    lo, hi = np.percentile(means, [tail, 100 - tail], axis=0)
+    return lo, hi
+
+
+def format_table(table):
+    """Plain-text rendering of a dict of equal-length columns."""
+    keys = list(table)
+    rows = [[f"{v:.4g}" if isinstance(v, (float, np.floating)) else str(v) for v in col] for col in table.values()]
+    widths = [max([len(k)] + [len(v) for v in col]) for k, col in zip(keys, rows)]
+    lines = ["  ".join(k.rjust(w) for k, w in zip(keys, widths))]
+    lines += ["  ".join(col[i].rjust(w) for col, w in zip(rows, widths)) for i in range(len(rows[0]) if rows else 0)]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    from .experiments import ResultStore
+
+    parser = argparse.ArgumentParser(description="Paired comparison of two pipelines in a results store.")
+    parser.add_argument("store")
+    parser.add_argument("--metric", default="time_ms")
+    parser.add_argument("--on", default="mode", choices=("mode", "algorithm"))
+    parser.add_argument("--a", default="standard")
+    parser.add_argument("--b", default="ails")
+    parser.add_argument("--by", nargs="+", default=list(GROUP_BY))
+    parser.add_argument("--reps", type=int, default=2000, help="bootstrap replicates (0 to skip)")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+    cols = ResultStore(args.store).load()
+    table = paired_test(cols, args.metric, args.a, args.b, args.on, args.by)
+    if args.reps:
+        ia, ib = pair_rows(cols, args.a, args.b, args.on)
+        keep = cols["found"][ia].astype(bool) & cols["found"][ib].astype(bool)
+        ia, ib = ia[keep], ib[keep]
+        ids, _ = group_ids(cols, tuple(k for k in args.by if k != args.on), ia)
+        diff = cols[args.metric][ia].astype(np.float64) - cols[args.metric][ib]
+        table["diff_lo"], table["diff_hi"] = bootstrap_ci(diff, ids, len(table["n"]), args.reps,
+                                                          workers=args.workers)
+    print(format_table(table), flush=True)
+
+
+if __name__ == "__main__":
+    main()
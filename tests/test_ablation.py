@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from ails.ablation import AUTO, COLUMNS, FACTORS, factor_table, load, run_sweep, settings, sweep_query
+from ails.corridor import BASE
+from ails.datasets import MapSpec, config_seed
+from ails.experiments import ResultStore
+from ails.maps import generate
+from ails.planner import AILSParams, GridPlanner
+
+
+def _query(planner, rng):
+    labels = planner.labels
+    free = np.argwhere(labels == np.bincount(labels[labels >= 0]).argmax())
+    return (tuple(map(int, p)) for p in free[rng.choice(len(free), 2, replace=False)])
+
+
+def test_sweep_matches_independent_runs():
+    rng = np.random.default_rng(0)
+    occ = generate("room", rng, (60, 60), 0.25)
+    planner = GridPlanner(occ)
+    grid = settings(radii=((1, 5), (2, None)), omegas=(1, 3), alphas=(0.5, 1.5), strategies=(AUTO, BASE))
+    for _ in range(4):
+        s, g = _query(planner, rng)
+        results = sweep_query(planner, "astar", s, g, grid, repeats=1)
+        assert len(results) == len(grid)
+        for (r_min, r_max, omega, alpha, strategy), res in zip(grid, results):
+            if strategy != AUTO:
+                continue
+            single = GridPlanner(occ, ails=AILSParams(r_min=r_min, r_max=r_max, omega=omega, alpha=alpha))
+            r = single.plan(s, g, "astar", "ails")
+            assert res["selected"] == r.strategy
+            assert res["cost"] == pytest.approx(r.cost)
+            assert (res["expanded"], res["corridor_size"], res["rounds"]) == (r.expanded, r.corridor_size,
+                                                                            r.rounds)
+
+
+def test_sweep_dedupes_corridors():
+    rng = np.random.default_rng(1)
+    planner = GridPlanner(generate("random", rng, (60, 60), 0.2))
+    s, g = _query(planner, rng)
+    # Base ignores omega and alpha: one corridor per (r_min, r_max).
+    grid = settings(radii=((1, 5), (2, 10)), omegas=(1, 3, 5), alphas=(0.5, 1.0, 2.0), strategies=(BASE,))
+    results = sweep_query(planner, "astar", s, g, grid, repeats=1)
+    assert sorted({r["corridor"] for r in results}) == [0, 1]
+    for (r_min, _, _, _, _), r in zip(grid, results):
+        assert r["corridor"] == (0 if r_min == 1 else 1)
+    by_corridor = {}
+    for r in results:
+        metrics = (r["found"], r["cost"], r["expanded"], r["corridor_size"], r["rounds"])
+        assert by_corridor.setdefault(r["corridor"], metrics) == metrics
+
+
+def test_run_sweep(tmp_path):
+    specs = [MapSpec("ablation", i, 40, 0.2, "random", config_seed(i, "ablation", "random", 40, 0.2), 2)
+             for i in range(2)]
+    grid = settings(radii=((1, 5),), omegas=(1, 3), alphas=(1.0,), strategies=(AUTO, BASE))
+    path = tmp_path / "ablation.jsonl"
+    assert run_sweep(specs, str(path), grid, workers=1, repeats=1) == 2
+    assert run_sweep(specs, str(path), grid, workers=1, repeats=1) == 0
+    assert ResultStore(str(path)).completed() == {(spec.key, ("astar",)) for spec in specs}
+    cols = load(str(path))
+    assert set(COLUMNS) <= set(cols)
+    assert len(cols["key"]) == 2 * 2 * len(grid)
+    assert cols["found"].all()
+    for factor in FACTORS:
+        table = factor_table(cols, factor)
+        assert table["n"].sum() == len(cols["key"])
+        assert np.all((table["optimal"] >= 0) & (table["optimal"] <= 100))
+    assert len(factor_table(cols, "omega")["omega"]) == 2
+    # A new algorithm sweeps only that algorithm.
+    assert run_sweep(specs, str(path), grid, ("astar", "bfs"), workers=1, repeats=1) == 2
+    cols = load(str(path))
+    assert sorted(np.unique(cols["algorithm"], return_counts=True)[1]) == [2 * 2 * len(grid)] * 2
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from ails.anytime import AnytimeParams, AnytimePlanner, weighted_astar
+from ails.maps import generate
+from ails.planner import GridPlanner
+
+
+def _pairs(planner, rng, n):
+    labels = planner.labels
+    free = np.argwhere(labels == np.bincount(labels[labels >= 0]).argmax())
+    return [tuple(tuple(map(int, p)) for p in free[rng.choice(len(free), 2, replace=False)]) for _ in range(n)]
+
+
+@pytest.mark.parametrize("topology", ["random", "room", "maze"])
+def test_bound_holds(topology):
+    rng = np.random.default_rng(8)
+    occ = generate(topology, rng, (80, 80), 0.25)
+    planner = AnytimePlanner(occ)
+    exact = GridPlanner(occ)
+    for s, g in _pairs(planner, rng, 6):
+        optimum = exact.plan(s, g, "dijkstra", "standard").cost
+        trace = []
+        r = planner.plan_anytime(s, g, 1000.0, trace.append)
+        assert r.found and r.improvements == trace
+        assert r.path[0] == s and r.path[-1] == g
+        # The reported cost is within the bound of the optimum, and never below it.
+        assert optimum - 1e-9 <= r.cost <= r.bound * optimum + 1e-9
+        costs = [step.cost for step in trace]
+        assert costs == sorted(costs, reverse=True)
+        assert trace[-1].bound == r.bound
+
+
+def test_weighted_astar_lower_bound():
+    rng = np.random.default_rng(9)
+    occ = generate("random", rng, (60, 60), 0.3)
+    planner = GridPlanner(occ)
+    for s, g in _pairs(planner, rng, 10):
+        optimum = planner.plan(s, g, "dijkstra", "standard").cost
+        for weight in (1.0, 2.0, 4.0):
+            res = weighted_astar(planner.adj, planner._flat(s), planner._flat(g), planner.W, weight=weight)
+            assert res.lower <= optimum + 1e-9
+            if weight == 1.0:
+                assert res.lower == pytest.approx(optimum)
+
+
+def test_expired_deadline_and_params():
+    occ = generate("room", np.random.default_rng(1), (100, 100), 0.2)
+    planner = AnytimePlanner(occ)
+    s, g = _pairs(planner, np.random.default_rng(2), 1)[0]
+    r = planner.plan_anytime(s, g, 0.0)
+    assert r.found or not r.improvements
+    with pytest.raises(ValueError):
+        AnytimePlanner(occ, anytime=AnytimeParams(w0=0.5))
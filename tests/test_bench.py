@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from ails.bench import CELL, SUITES, THRESHOLDS, compare, main, run_case, run_suite
+from ails.datasets import MapSpec, config_seed
+
+
+def _doc(**metrics):
+    row = {"topology": "random", "size": 50, "density": 0.1, "algorithm": "astar", "mode": "ails",
+           "time_ms": 10.0, "expanded": 100.0, "peak_kib": 50.0, "corridor_efficiency": 0.2, "success": 1.0}
+    row.update(metrics)
+    return {"rows": [row]}
+
+
+@pytest.mark.parametrize("metric", sorted(THRESHOLDS))
+def test_compare_thresholds(metric):
+    base = _doc()
+    value = base["rows"][0][metric]
+    tol = THRESHOLDS[metric]
+    assert compare(base, _doc(**{metric: value * (1 + tol / 2)})) == []
+    out = compare(base, _doc(**{metric: value * (1 + 2 * tol)}))
+    assert [r["metric"] for r in out] == [metric]
+    assert out[0]["ratio"] == pytest.approx(1 + 2 * tol)
+    assert {k: out[0][k] for k in CELL} == {k: base["rows"][0][k] for k in CELL}
+    # Getting better is never a regression.
+    assert compare(base, _doc(**{metric: value / 2})) == []
+
+
+def test_compare_success_may_not_drop():
+    assert [r["metric"] for r in compare(_doc(), _doc(success=0.9))] == ["success"]
+    assert compare(_doc(success=0.9), _doc()) == []
+    # Cells missing from the baseline are ignored.
+    assert compare(_doc(size=100), _doc(time_ms=1e6)) == []
+
+
+def test_compare_cli(tmp_path):
+    base, new = tmp_path / "base.json", tmp_path / "new.json"
+    base.write_text(json.dumps(_doc()))
+    new.write_text(json.dumps(_doc(time_ms=20.0)))
+    assert main(["compare", str(base), str(new)]) == 1
+    assert main(["compare", str(base), str(new), "--time-ms", "1.5"]) == 0
+
+
+def test_run_case():
+    spec = MapSpec("bench", 0, 40, 0.2, "random", config_seed(0, "bench", "random", 40, 0.2), 2)
+    rows = run_case(spec, ("astar", "bfs"), repeats=1)
+    assert [(r["algorithm"], r["mode"]) for r in rows] == [(a, m) for a in ("astar", "bfs")
+                                                            for m in ("standard", "ils", "ails")]
+    for r in rows:
+        assert r["pairs"] == 2 and r["success"] == 1.0
+        assert r["time_ms"] > 0 and r["expanded"] > 0 and r["peak_kib"] > 0
+        assert 0 < r["corridor_efficiency"] <= 1
+        if r["mode"] == "standard":
+            assert r["node_reduction"] == 0.0
+    # The tracemalloc pass is optional.
+    assert all(r["peak_kib"] == 0 for r in run_case(spec, ("astar",), repeats=1, memory=False))
+
+
+def test_suite_settings(monkeypatch):
+    monkeypatch.setitem(SUITES, "tiny", dict(topologies=("random",), sizes=(30,), densities=(0.1,),
+                                             algorithms=("astar",), pairs=1, repeats=1, memory=False))
+    doc = run_suite("tiny", modes=("standard",))
+    assert doc["repeats"] == 1 and len(doc["rows"]) == 1
+    assert doc["rows"][0]["peak_kib"] == 0
+    assert 2000 in SUITES["xl"]["sizes"]
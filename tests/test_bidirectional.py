@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from ails.corridor import ils_corridor
+from ails.grid import bresenham
+from ails.maps import generate
+from ails.planner import GridPlanner
+from ails.search import astar, bidir_astar, bidir_dijkstra
+
+
+def _pairs(planner, rng, n):
+    labels = planner.labels
+    free = np.argwhere(labels == np.bincount(labels[labels >= 0]).argmax())
+    return [tuple(tuple(map(int, p)) for p in free[rng.choice(len(free), 2, replace=False)]) for _ in range(n)]
+
+
+def _cost(planner, res):
+    return planner._result(res, res.expanded, 0).cost
+
+
+@pytest.mark.parametrize("topology", ["random", "maze", "room"])
+def test_bidirectional_matches_astar(topology):
+    rng = np.random.default_rng(4)
+    planner = GridPlanner(generate(topology, rng, (80, 80), 0.25))
+    for s, g in _pairs(planner, rng, 8):
+        a, b = planner._flat(s), planner._flat(g)
+        xs, ys = bresenham(s, g)
+        corridors = [None, ils_corridor(planner.occ, xs, ys, planner.w0), planner._ails_corridor(xs, ys)[0]]
+        for cells in corridors:
+            if cells is None:
+                ref = astar(planner.adj, a, b, planner.W)
+            else:
+                ref = planner._search_in(astar, a, b, cells)
+            for search in (bidir_astar, bidir_dijkstra):
+                if cells is None:
+                    res = search(planner.adj, a, b, planner.W)
+                else:
+                    res = planner._search_in(search, a, b, cells)
+                if ref.path is None:
+                    assert res.path is None
+                    continue
+                assert res.path[0] == a and res.path[-1] == b
+                if cells is not None:
+                    assert set(res.path) <= set(cells.tolist())
+                assert _cost(planner, res) == pytest.approx(_cost(planner, ref), abs=1e-9)
+
+
+def test_bidirectional_edge_cases():
+    occ = np.zeros((12, 12), dtype=np.uint8)
+    occ[:, 6] = 1
+    planner = GridPlanner(occ)
+    for search in (bidir_astar, bidir_dijkstra):
+        assert search(planner.adj, 5, 5, planner.W).path == [5]
+        assert search(planner.adj, 0, 11, planner.W).path is None
+        r = planner.plan((0, 0), (11, 5), search.__name__, "standard")
+        assert r.cost == pytest.approx(planner.plan((0, 0), (11, 5), "astar", "standard").cost)
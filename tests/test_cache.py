@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from ails.cache import PlanCache
+from ails.dynamic import DynamicPlanner
+from ails.hierarchy import HierarchicalPlanner
+from ails.instrument import COUNTERS, PATH_HIT, Probe
+from ails.maps import generate
+from ails.planner import GridPlanner
+
+
+def _pairs(planner, rng, n):
+    labels = planner.labels
+    free = np.argwhere(labels == np.bincount(labels[labels >= 0]).argmax())
+    return [tuple(tuple(map(int, p)) for p in free[rng.choice(len(free), 2, replace=False)]) for _ in range(n)]
+
+
+def test_hits_match_fresh_results():
+    rng = np.random.default_rng(0)
+    occ = generate("room", rng, (100, 100), 0.2)
+    probe = Probe()
+    planner = GridPlanner(occ, probe=probe)
+    cache = PlanCache(planner)
+    fresh = GridPlanner(occ)
+    pairs = _pairs(planner, rng, 10)
+    for _ in range(2):
+        for s, g in pairs:
+            for mode in ("standard", "ils", "ails"):
+                a, b = cache.plan(s, g, "astar", mode), fresh.plan(s, g, "astar", mode)
+                assert a.path == b.path and a.cost == pytest.approx(b.cost)
+    outcome = probe.counts[:len(probe), COUNTERS.index("cache")]
+    assert np.count_nonzero(outcome == PATH_HIT) >= len(pairs) * 3
+    assert probe.cache_summary()["path_rate"] > 0
+
+
+def test_updates_invalidate_affected_entries():
+    rng = np.random.default_rng(1)
+    occ = generate("random", rng, (120, 120), 0.15)
+    planner = DynamicPlanner(occ)
+    cache = PlanCache(planner, subpaths=False)
+    pairs = _pairs(planner, rng, 12)
+    for s, g in pairs:
+        cache.plan(s, g, "astar", "ails")
+    stored = len(cache)
+    # Block a free cell in the middle of the first cached path.
+    path = cache.plan(*pairs[0], "astar", "ails").path
+    blocked = path[len(path) // 2]
+    planner.update([blocked], 1)
+    fresh = GridPlanner(planner.occ.copy())
+    for s, g in pairs:
+        a, b = cache.plan(s, g, "astar", "ails"), fresh.plan(s, g, "astar", "ails")
+        assert a.found == b.found
+        if a.found:
+            assert a.path == b.path and a.cost == pytest.approx(b.cost)
+    assert blocked not in cache.plan(*pairs[0], "astar", "ails").path
+    assert 1 <= cache.invalidations
+    assert len(cache) <= stored
+
+
+def test_capacity_and_unsupported_planners():
+    occ = generate("random", np.random.default_rng(2), (70, 70), 0.1)
+    planner = GridPlanner(occ)
+    cache = PlanCache(planner, capacity=3)
+    for s, g in _pairs(planner, np.random.default_rng(3), 6):
+        cache.plan(s, g, "astar", "ails")
+    assert len(cache) == 3 and cache.evictions >= 3
+    with pytest.raises(TypeError):
+        PlanCache(HierarchicalPlanner(occ))
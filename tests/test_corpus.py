@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from ails.corpus import Corpus, write_specs
+from ails.datasets import SPECS, build_map, endpoints
+from ails.grid import integral_image
+
+
+@pytest.mark.parametrize("integral", [False, True])
+def test_corpus_round_trip(tmp_path, integral):
+    specs = SPECS["ds3"](densities=(0.2,), pairs=4)
+    path = str(tmp_path / "ds3.ails")
+    write_specs(path, specs, integral)
+    with Corpus(path) as corpus:
+        assert len(corpus) == len(specs)
+        for i, spec in enumerate(specs):
+            occ, ii = corpus[i]
+            assert corpus.spec(i) == spec
+            assert np.array_equal(occ, build_map(spec))
+            assert np.array_equal(ii, integral_image(occ))
+            assert corpus.pairs(i) == endpoints(spec, occ)
+            del occ, ii
+
+
+def test_corpus_close_with_live_view(tmp_path):
+    path = str(tmp_path / "one.ails")
+    write_specs(path, SPECS["ds3"](topologies=("room",), densities=(0.2,), pairs=1), integral=True)
+    corpus = Corpus(path)
+    view = corpus.integral(0)
+    copy = corpus.integral(0, copy=True)
+    with pytest.raises(BufferError):
+        corpus.close()
+    del view
+    corpus.close()
+    assert np.array_equal(copy, integral_image(build_map(corpus.spec(0))))
@@ -0,0 +1,65 @@
+import math
+
+import numpy as np
+import pytest
+
+from ails.corridor import density_profile, line_profile
+from ails.dynamic import Fenwick2D
+from ails.grid import bresenham, integral_image
+
+
+def _density(occ, x, y, omega):
+    """Obstacle share of the window of half-size ``omega`` around (x, y), clipped to the grid."""
+    H, W = occ.shape
+    x0, x1 = min(max(x - omega, 0), H), min(max(x + omega + 1, 0), H)
+    y0, y1 = min(max(y - omega, 0), W), min(max(y + omega + 1, 0), W)
+    area = (x1 - x0) * (y1 - y0)
+    return occ[x0:x1, y0:y1].sum() / area if area else 0.0
+
+
+def _brute(occ, xs, ys, omega):
+    sigma, grad = [], []
+    for x, y in zip(xs.tolist(), ys.tolist()):
+        sigma.append(_density(occ, x, y, omega))
+        gx = _density(occ, x + 1, y, omega) - _density(occ, x - 1, y, omega)
+        gy = _density(occ, x, y + 1, omega) - _density(occ, x, y - 1, omega)
+        grad.append(math.hypot(gx, gy) / 2)
+    return np.array(sigma), np.array(grad)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_density_profile_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    H, W = rng.integers(5, 40, 2)
+    occ = (rng.random((H, W)) < rng.uniform(0.1, 0.5)).astype(np.uint8)
+    ii = integral_image(occ)
+    omegas = (0, 1, 3, 7, 50)
+    # Lines along the border and corner to corner, so windows get clipped.
+    ends = [((0, 0), (H - 1, W - 1)), ((0, W - 1), (H - 1, 0)), ((0, 0), (0, W - 1)), ((H - 1, 2), (1, W - 1))]
+    ends.append(tuple(tuple(int(v) for v in rng.integers(0, (H, W))) for _ in range(2)))
+    for s, g in ends:
+        xs, ys = bresenham(s, g)
+        profile = density_profile(ii, xs, ys, omegas)
+        assert profile.omegas == omegas
+        for k, omega in enumerate(omegas):
+            sigma, grad = _brute(occ, xs, ys, omega)
+            assert np.allclose(profile.sigma[k], sigma) and np.allclose(profile.grad[k], grad)
+            assert profile.sigma_max[k] == pytest.approx(sigma.max())
+            assert profile.grad_max[k] == pytest.approx(grad.max())
+            assert np.allclose(line_profile(ii, xs, ys, omega)[0], sigma)
+
+
+def test_density_profile_fenwick():
+    rng = np.random.default_rng(9)
+    occ = (rng.random((25, 31)) < 0.3).astype(np.uint8)
+    xs, ys = bresenham((0, 3), (24, 30))
+    a = density_profile(integral_image(occ), xs, ys, (1, 4))
+    b = density_profile(Fenwick2D(occ), xs, ys, (1, 4))
+    assert np.allclose(a.sigma, b.sigma) and np.allclose(a.grad, b.grad)
+
+
+def test_density_profile_empty_line():
+    ii = integral_image(np.zeros((4, 4), dtype=np.uint8))
+    profile = density_profile(ii, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), (1, 2))
+    assert profile.sigma.shape == (2, 0)
+    assert profile.sigma_max.tolist() == [0.0, 0.0]
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from ails.costfield import CostField
+from ails.maps import random_map
+from ails.planner import GridPlanner
+
+
+def _setup(seed=0, size=40):
+    rng = np.random.default_rng(seed)
+    occ = random_map(rng, (size, size), 0.2)
+    risk = rng.random((size, size)).astype(np.float32)
+    return rng, occ, CostField(occ, risk, weight=4.0)
+
+
+def _pairs(rng, planner, n):
+    free = np.argwhere(planner.labels == np.bincount(planner.labels[planner.labels >= 0]).argmax())
+    return [tuple(map(tuple, free[rng.choice(len(free), 2, replace=False)].tolist())) for _ in range(n)]
+
+
+def test_jps_rejected_on_cost_field():
+    _, occ, field = _setup()
+    with pytest.raises(ValueError):
+        GridPlanner(occ, algorithm="jps", costs=field)
+    planner = GridPlanner(occ, costs=field)
+    with pytest.raises(ValueError):
+        planner.plan((0, 0), (1, 1), "jps")
+
+
+def test_astar_is_optimal_under_costs():
+    rng, occ, field = _setup()
+    risky = GridPlanner(occ, costs=field)
+    plain = GridPlanner(occ)
+    for s, g in _pairs(rng, risky, 20):
+        a = risky.plan(s, g, "astar", "standard")
+        d = risky.plan(s, g, "dijkstra", "standard")
+        assert a.cost == pytest.approx(d.cost)
+        # A uniform-cost JPS path is never cheaper under the risk weights.
+        j = plain.plan(s, g, "jps", "standard")
+        assert field.path_cost([plain._flat(c) for c in j.path]) >= a.cost - 1e-9
+
+
+def test_quantize_large_weights():
+    occ = np.zeros((4, 4), dtype=np.uint8)
+    risk = np.ones((4, 4), dtype=np.float32)
+    # Largest cost sqrt(2) * 40001, still under 65536: scale 1, no step cheaper than w.
+    field = CostField(occ, risk, weight=40000.0, quantize=True)
+    exact = CostField(occ, risk, weight=40000.0)
+    assert field.scale == 1.0
+    assert np.all(field.values() >= exact.values() - 1e-3)
+    with pytest.raises(ValueError):
+        CostField(occ, risk, weight=50000.0, quantize=True)
+    assert CostField(occ, risk, weight=50000.0).values().max() > 65535
@@ -0,0 +1,66 @@
+import time
+
+import numpy as np
+import pytest
+
+from ails.datasets import DENSITY_TOLERANCE, SPECS, build_map, build_maps, iter_maps
+from ails.maps import random_maps
+
+
+def test_random_maps_rejects_by_density():
+    free = np.zeros((30, 30), dtype=bool)
+    free[0, :] = True
+    occ = random_maps(np.random.default_rng(1), 50, (30, 30), 0.3, tolerance=0.005, free=free)
+    assert occ.shape == (50, 30, 30)
+    assert not occ[:, 0, :].any()
+    assert np.all(np.abs(occ.mean(axis=(1, 2)) - 0.3) <= 0.005)
+
+
+def test_build_map_ds1():
+    for spec in SPECS["ds1"](maps=5):
+        occ = build_map(spec)
+        assert not occ[0, :].any() and not occ[:, -1].any()
+        assert abs(occ.mean() - spec.density) <= DENSITY_TOLERANCE
+        assert np.array_equal(occ, build_map(spec))
+
+
+def test_build_map_ds3_topologies():
+    seen = set()
+    for spec in SPECS["ds3"](densities=(0.3,), pairs=1):
+        occ = build_map(spec)
+        assert occ.shape == (spec.size, spec.size) and occ.dtype == np.uint8
+        if spec.topology in ("random", "clustered"):
+            assert abs(occ.mean() - spec.density) <= DENSITY_TOLERANCE
+        seen.add(spec.topology)
+    assert seen == {"random", "clustered", "maze", "room", "open"}
+
+
+def test_build_maps_matches_build_map():
+    specs = SPECS["ds1"](maps=6) + SPECS["ds3"](densities=(0.1, 0.3), pairs=1)
+    for size in {spec.size for spec in specs}:
+        group = [spec for spec in specs if spec.size == size]
+        occ = build_maps(group)
+        assert occ.shape == (len(group), size, size) and occ.dtype == np.uint8
+        for spec, grid in zip(group, occ):
+            assert np.array_equal(grid, build_map(spec))
+    with pytest.raises(ValueError):
+        build_maps(SPECS["ds2"](sizes=(50, 100), densities=(0.1,)))
+
+
+def test_iter_maps_order_and_batches():
+    specs = SPECS["ds2"](sizes=(50, 100), densities=(0.1, 0.2))
+    specs = specs[::2] + specs[1::2]
+    grids = list(iter_maps(specs, batch=3))
+    assert len(grids) == len(specs)
+    for spec, grid in zip(specs, grids):
+        assert np.array_equal(grid, build_map(spec))
+
+
+def test_build_maps_throughput():
+    specs = SPECS["ds1"]()[:1000]
+    t0 = time.perf_counter()
+    occ = build_maps(specs)
+    # About 0.25 s here; the bound only catches a fall back to slow paths.
+    assert time.perf_counter() - t0 < 5.0
+    assert occ.shape == (1000, 200, 200)
+    assert np.all(np.abs(occ.mean(axis=(1, 2)) - [s.density for s in specs]) <= DENSITY_TOLERANCE)
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from ails.corridor import free_cells
+from ails.dynamic import DynamicPlanner
+from ails.maps import generate
+from ails.planner import AILSParams, GridPlanner
+
+
+def _pairs(planner, rng, n):
+    labels = planner.labels
+    free = np.argwhere(labels == np.bincount(labels[labels >= 0]).argmax())
+    return [tuple(tuple(map(int, p)) for p in free[rng.choice(len(free), 2, replace=False)]) for _ in range(n)]
+
+
+@pytest.mark.parametrize("ails", [AILSParams(), AILSParams(r_min=6, r_max=3)])
+def test_replan_matches_fresh_plan(ails):
+    rng = np.random.default_rng(11)
+    occ = generate("random", rng, (80, 80), 0.2)
+    planner = DynamicPlanner(occ, ails=ails)
+    queries = [planner.track(s, g) for s, g in _pairs(planner, rng, 6)]
+    for _ in range(4):
+        cells = rng.integers(0, 80, size=(40, 2))
+        planner.update(cells, rng.integers(0, 2, size=40))
+        fresh = GridPlanner(planner.occ.copy(), ails=ails)
+        for q in queries:
+            a, b = planner.replan(q), fresh.plan(q.start, q.goal)
+            assert a.found == b.found
+            if a.found:
+                assert a.path == b.path and a.expanded == b.expanded
+                assert a.cost == pytest.approx(b.cost)
+            tracked = free_cells(planner.occ, q.box, q.coverage > 0)
+            assert np.array_equal(np.sort(tracked), np.sort(fresh._ails_corridor(q.xs, q.ys)[0]))
@@ -0,0 +1,75 @@
+import numpy as np
+
+from ails import corpus, shared
+from ails.corpus import write_specs
+from ails.datasets import SPECS, load_shared
+from ails.experiments import COLUMNS, ResultStore, run_experiment
+
+DETERMINISTIC = ("key", "pair", "algorithm", "mode", "found", "cost", "expanded", "corridor_size", "rounds")
+
+
+def _specs():
+    return SPECS["ds2"](sizes=(50,), densities=(0.1, 0.2, 0.3), pairs=2)
+
+
+def test_resume_after_truncated_write(tmp_path):
+    specs = _specs()
+    full = tmp_path / "full.jsonl"
+    assert run_experiment(specs, str(full), ("astar",), ("ils", "ails"), workers=1, repeats=1) == 3
+    assert run_experiment(specs, str(full), ("astar",), ("ils", "ails"), workers=1, repeats=1) == 0
+
+    # A run interrupted after one job and halfway through writing the next.
+    lines = full.read_bytes().split(b"\n")
+    part = tmp_path / "part.jsonl"
+    part.write_bytes(lines[0] + b"\n" + lines[1][:len(lines[1]) // 2])
+    store = ResultStore(str(part))
+    assert len(store.completed()) == 1
+    assert run_experiment(specs, store, ("astar",), ("ils", "ails"), workers=1, repeats=1) == 2
+
+    a, b = ResultStore(str(full)).load(), store.load()
+    assert set(a) == set(COLUMNS)
+    for c in DETERMINISTIC:
+        assert np.array_equal(a[c], b[c])
+
+
+def test_pool_and_shared_match_serial(tmp_path):
+    specs = _specs()
+    serial, pooled = tmp_path / "serial.jsonl", tmp_path / "pooled.jsonl"
+    run_experiment(specs, str(serial), ("astar", "bfs"), ("standard", "ails"), workers=1, repeats=1)
+    with load_shared(specs) as shared:
+        run_experiment(specs, str(pooled), ("astar", "bfs"), ("standard", "ails"), workers=2, repeats=1,
+                       shared=shared)
+    a, b = ResultStore(str(serial)).load(), ResultStore(str(pooled)).load()
+    for c in DETERMINISTIC:
+        assert np.array_equal(a[c], b[c])
+
+
+def test_resume_per_algorithm_and_mode(tmp_path):
+    specs = _specs()
+    path = str(tmp_path / "store.jsonl")
+    assert run_experiment(specs, path, ("astar",), ("ils",), workers=1, repeats=1) == 3
+    # New algorithms or modes run only the missing cells of each map.
+    assert run_experiment(specs, path, ("astar", "bfs"), ("ils", "ails"), workers=1, repeats=1) == 3
+    assert run_experiment(specs, path, ("astar", "bfs"), ("ils", "ails"), workers=1, repeats=1) == 0
+    assert run_experiment(specs, path, ("bfs",), ("ils",), workers=1, repeats=1) == 0
+    cols = ResultStore(path).load()
+    cells = list(zip(cols["key"], cols["pair"], cols["algorithm"], cols["mode"]))
+    assert len(cells) == len(set(cells)) == 3 * 2 * 2 * 2
+
+    fresh = str(tmp_path / "fresh.jsonl")
+    run_experiment(specs, fresh, ("astar", "bfs"), ("ils", "ails"), workers=1, repeats=1)
+    ref = ResultStore(fresh).load()
+    for c in DETERMINISTIC:
+        assert np.array_equal(cols[c], ref[c])
+
+
+def test_serial_run_detaches(tmp_path):
+    specs = _specs()
+    with load_shared(specs) as data:
+        run_experiment(specs, str(tmp_path / "a.jsonl"), ("astar",), ("ils",), workers=1, repeats=1,
+                       shared=data)
+    assert shared._attached is None
+    path = str(tmp_path / "maps.ails")
+    write_specs(path, specs)
+    run_experiment(None, str(tmp_path / "b.jsonl"), ("astar",), ("ils",), workers=1, repeats=1, corpus=path)
+    assert corpus._attached is None
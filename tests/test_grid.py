@@ -0,0 +1,77 @@
+from collections import deque
+
+import numpy as np
+import pytest
+
+from ails.grid import component_labels
+from ails.maps import generate
+from ails.planner import GridPlanner
+
+
+def _bfs_labels(occ):
+    """Reference labelling: BFS over 8-neighbour moves that do not cut corners."""
+    H, W = occ.shape
+    labels = np.full((H, W), -1, dtype=np.int64)
+    n = 0
+    for x0 in range(H):
+        for y0 in range(W):
+            if occ[x0, y0] or labels[x0, y0] >= 0:
+                continue
+            labels[x0, y0] = n
+            queue = deque([(x0, y0)])
+            while queue:
+                x, y = queue.popleft()
+                for dx in (-1, 0, 1):
+                    for dy in (-1, 0, 1):
+                        u, v = x + dx, y + dy
+                        if not (0 <= u < H and 0 <= v < W) or occ[u, v] or labels[u, v] >= 0:
+                            continue
+                        if dx and dy and (occ[x + dx, y] or occ[x, y + dy]):
+                            continue
+                        labels[u, v] = n
+                        queue.append((u, v))
+            n += 1
+    return labels
+
+
+@pytest.mark.parametrize("topology", ["random", "maze", "room"])
+@pytest.mark.parametrize("density", [0.2, 0.45])
+def test_component_labels_match_bfs(topology, density):
+    for seed in range(3):
+        occ = generate(topology, np.random.default_rng(seed), (37, 53), density)
+        labels = component_labels(occ)
+        assert labels.dtype == np.int32
+        # Same labels in the same row-major order of first occurrence.
+        assert np.array_equal(labels, _bfs_labels(occ))
+
+
+def test_component_labels_diagonal_gaps():
+    # Free cells touching only at a corner are separate components.
+    occ = np.array([[0, 1, 0],
+                    [1, 0, 1],
+                    [0, 1, 0]], dtype=np.uint8)
+    assert component_labels(occ).tolist() == [[0, -1, 1], [-1, 2, -1], [3, -1, 4]]
+    assert component_labels(np.ones((3, 4), dtype=np.uint8)).max() == -1
+    assert component_labels(np.zeros((1, 1), dtype=np.uint8)).tolist() == [[0]]
+
+
+def test_reachable_split_grid():
+    occ = np.zeros((20, 30), dtype=np.uint8)
+    occ[:, 12] = 1
+    occ[5, 20] = 1
+    planner = GridPlanner(occ)
+    assert planner.reachable((0, 0), (19, 11))
+    assert planner.reachable((0, 13), (19, 29))
+    assert not planner.reachable((0, 0), (0, 29))
+    # Obstacle endpoints are never reachable.
+    assert not planner.reachable((5, 20), (5, 21))
+    assert not planner.reachable((0, 12), (0, 12))
+    r = planner.plan((10, 3), (10, 25), "astar", "ails")
+    assert not r.found and r.expanded == 0
+    # A gap in the wall joins the halves; a diagonal gap does not.
+    occ[10, 12] = 0
+    assert GridPlanner(occ).reachable((0, 0), (0, 29))
+    occ = np.zeros((20, 30), dtype=np.uint8)
+    for x in range(20):
+        occ[x, 12 + x % 2] = 1
+    assert not GridPlanner(occ).reachable((0, 0), (0, 29))
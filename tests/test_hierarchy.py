@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from ails.costfield import CostField
+from ails.hierarchy import HierarchicalPlanner
+from ails.instrument import INTEGRAL, Probe
+from ails.maps import generate
+from ails.planner import GridPlanner
+
+
+def _room(size=256, seed=0):
+    return generate("room", np.random.default_rng(seed), (size, size), 0.2)
+
+
+def _pairs(planner, n, seed=1):
+    rng = np.random.default_rng(seed)
+    labels = planner.labels
+    free = np.argwhere(labels == np.bincount(labels[labels >= 0]).argmax())
+    return [tuple(tuple(map(int, p)) for p in free[rng.choice(len(free), 2, replace=False)]) for _ in range(n)]
+
+
+def test_levels_share_costs_and_queue():
+    occ = _room()
+    field = CostField(occ, np.random.default_rng(3).random(occ.shape), weight=2.0)
+    planner = HierarchicalPlanner(occ, costs=field, min_size=32)
+    assert len(planner.pyramid) >= 2
+    for level in planner.pyramid:
+        assert level.costs is not None and level.costs.shape == level.occ.shape
+    exact = GridPlanner(occ, costs=field)
+    for s, g in _pairs(planner, 8):
+        r = planner.plan(s, g, "astar", "ails")
+        assert r.found
+        assert r.cost == pytest.approx(field.path_cost([planner._flat(c) for c in r.path]))
+        assert r.cost >= exact.plan(s, g, "astar", "standard").cost - 1e-6
+
+    bucket = HierarchicalPlanner(occ, queue="bucket", min_size=32)
+    assert all(level.queue == "bucket" for level in bucket.pyramid)
+    heap = HierarchicalPlanner(occ, min_size=32)
+    for s, g in _pairs(bucket, 8):
+        assert bucket.plan(s, g, "astar", "ils").found == heap.plan(s, g, "astar", "ils").found
+
+
+def test_level_probes():
+    occ = _room()
+    probe = Probe()
+    planner = HierarchicalPlanner(occ, probe=probe, min_size=32)
+    pairs = _pairs(planner, 6)
+    times = [planner.plan(s, g, "astar", "ails").time_ms for s, g in pairs]
+    assert len(probe) == len(pairs)
+    coarse = 0.0
+    for level in planner.pyramid:
+        # One row per coarse search; a level is skipped where its endpoints are cut off.
+        assert level.probe is not probe and len(level.probe) <= len(pairs)
+        phases = level.probe.phase_ms[:len(level.probe)]
+        coarse += phases.sum() - phases[:, INTEGRAL].sum()
+    assert coarse > 0
+    own = probe.phase_ms[:len(pairs)]
+    # Coarse-level time is reported by the levels, not folded into the parent's phases.
+    assert own.sum() - own[:, INTEGRAL].sum() + coarse <= sum(times) + 1e-6
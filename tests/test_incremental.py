@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from ails.dynamic import DynamicPlanner
+from ails.incremental import CorridorLPA
+from ails.maps import generate
+from ails.matrix import dijkstra_many
+from ails.planner import GridPlanner
+
+
+def _pairs(planner, rng, n):
+    labels = planner.labels
+    free = np.argwhere(labels == np.bincount(labels[labels >= 0]).argmax())
+    return [tuple(tuple(map(int, p)) for p in free[rng.choice(len(free), 2, replace=False)]) for _ in range(n)]
+
+
+@pytest.mark.parametrize("topology", ["random", "room"])
+def test_lpa_matches_search_in_its_corridor(topology):
+    rng = np.random.default_rng(21)
+    occ = generate(topology, rng, (70, 70), 0.2)
+    planner = DynamicPlanner(occ)
+    lpas = [CorridorLPA(planner, s, g) for s, g in _pairs(planner, rng, 4)]
+    for step in range(5):
+        if step:
+            cells = rng.integers(0, 70, size=(30, 2))
+            planner.update(cells, rng.integers(0, 2, size=30))
+        fresh = GridPlanner(planner.occ.copy())
+        for lpa in lpas:
+            r = lpa.replan()
+            s, t = lpa.s, lpa.t
+            optimum = fresh.plan(lpa.query.start, lpa.query.goal, "dijkstra", "standard")
+            assert r.found == optimum.found
+            if not r.found:
+                continue
+            cost = lpa.g[t]
+            # Optimal within the repaired corridor, hence never below the grid optimum.
+            cells = np.fromiter(lpa.corridor, dtype=np.int64)
+            inside = fresh._search_in(dijkstra_many, s, {t}, cells)
+            assert cost == pytest.approx(inside.dist[t])
+            assert cost >= optimum.cost - 1e-9
+            assert r.path[0] == lpa.query.start and r.path[-1] == lpa.query.goal
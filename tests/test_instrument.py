@@ -0,0 +1,31 @@
+import numpy as np
+
+from ails.datasets import SPECS
+from ails.experiments import run_job
+from ails.instrument import INTEGRAL, PHASES, Probe
+from ails.maps import generate
+from ails.planner import GridPlanner
+
+
+def test_integral_charged_once_per_map():
+    occ = generate("random", np.random.default_rng(0), (120, 120), 0.2)
+    probe = Probe(capacity=2)
+    planner = GridPlanner(occ, probe=probe)
+    free = np.argwhere(planner.labels >= 0)
+    results = [planner.plan(tuple(free[0]), tuple(free[-k])) for k in range(1, 6)]
+    assert len(probe) == 5
+    integral = probe.phase_ms[:5, INTEGRAL]
+    assert integral[0] == probe.integral_ms > 0
+    assert not integral[1:].any()
+    for i, r in enumerate(results):
+        assert probe.phase_ms[i].sum() <= r.time_ms + probe.phase_ms[i, INTEGRAL] + 1e-6
+    assert set(probe.columns()) >= {p + "_ms" for p in PHASES}
+
+
+def test_run_job_splits_integral_over_records():
+    spec = SPECS["ds2"](sizes=(100,), densities=(0.2,), pairs=3)[0]
+    _, records = run_job(spec, ("astar", "bfs"), ("standard", "ails"), repeats=1, instrument=True)
+    assert len(records) == 3 * 2 * 2
+    shares = {r["integral_ms"] for r in records}
+    assert len(shares) == 1 and shares.pop() > 0
+    assert all(r["search_ms"] >= 0 for r in records)
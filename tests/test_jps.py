@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from ails.corridor import ils_corridor
+from ails.grid import bresenham
+from ails.maps import generate
+from ails.planner import GridPlanner
+from ails.search import astar, jps
+
+
+def _check(planner, res, ref, cells=None):
+    if ref.path is None:
+        assert res.path is None
+        return
+    steps = zip(res.path, res.path[1:])
+    assert all(v in {u for u, _ in planner.adj[w]} for w, v in steps)
+    if cells is not None:
+        assert set(res.path) <= set(cells.tolist())
+    assert planner._result(res, 0, 0).cost == pytest.approx(planner._result(ref, 0, 0).cost, abs=1e-9)
+
+
+@pytest.mark.parametrize("topology", ["random", "maze", "room"])
+def test_jps_matches_astar(topology):
+    for seed in range(3):
+        rng = np.random.default_rng(seed)
+        planner = GridPlanner(generate(topology, rng, (80, 80), 0.25))
+        labels = planner.labels
+        free = np.argwhere(labels == np.bincount(labels[labels >= 0]).argmax())
+        for _ in range(10):
+            s, g = (tuple(map(int, p)) for p in free[rng.choice(len(free), 2, replace=False)])
+            a, b = planner._flat(s), planner._flat(g)
+            _check(planner, jps(planner.adj, a, b, planner.W), astar(planner.adj, a, b, planner.W))
+            xs, ys = bresenham(s, g)
+            for cells in (ils_corridor(planner.occ, xs, ys, planner.w0), planner._ails_corridor(xs, ys)[0]):
+                _check(planner, planner._search_in(jps, a, b, cells), planner._search_in(astar, a, b, cells), cells)
+
+
+def test_jps_diagonal_past_corridor_edge():
+    # A staircase corridor: every diagonal step passes a free cell outside it.
+    planner = GridPlanner(np.zeros((8, 8), dtype=np.uint8))
+    cells = np.array([i * 8 + i for i in range(8)] + [(i + 1) * 8 + i for i in range(7)])
+    res = planner._search_in(jps, 0, 63, cells)
+    assert res.path == [i * 8 + i for i in range(8)]
+    _check(planner, res, planner._search_in(astar, 0, 63, cells), cells)
+    # A lone diagonal line works only because corners outside the corridor may be cut.
+    line = np.arange(8) * 9
+    assert planner._search_in(jps, 0, 63, line).path == line.tolist()
+
+
+def test_jps_through_planner():
+    occ = np.zeros((30, 30), dtype=np.uint8)
+    occ[5:25, 15] = 1
+    planner = GridPlanner(occ)
+    for mode in ("standard", "ils", "ails"):
+        r = planner.plan((15, 2), (15, 28), "jps", mode)
+        ref = planner.plan((15, 2), (15, 28), "astar", mode)
+        assert r.found and r.cost == pytest.approx(ref.cost)
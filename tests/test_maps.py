@@ -0,0 +1,44 @@
+import time
+
+import numpy as np
+import pytest
+
+from ails.maps import TOPOLOGIES, clustered_map, generate, generate_maps, room_map
+
+
+@pytest.mark.parametrize("size,density", [(20, 0.9), (50, 0.1), (50, 0.25), (50, 0.4), (100, 0.4)])
+def test_clustered_map_small_dense(size, density):
+    t0 = time.perf_counter()
+    occ = clustered_map(np.random.default_rng(7), (size, size), density)
+    assert time.perf_counter() - t0 < 1.0
+    assert occ.dtype == np.uint8 and occ.shape == (size, size)
+    assert int(occ.sum()) == round(density * size * size)
+
+
+def test_clustered_map_is_seeded():
+    a = clustered_map(np.random.default_rng(3), (60, 40), 0.3)
+    b = clustered_map(np.random.default_rng(3), (60, 40), 0.3)
+    assert np.array_equal(a, b)
+
+
+@pytest.mark.parametrize("topology", TOPOLOGIES)
+def test_generate_maps_matches_generate(topology):
+    occ = generate_maps(topology, [np.random.default_rng(s) for s in range(4)], (45, 60), 0.25)
+    assert occ.shape == (4, 45, 60) and occ.dtype == np.uint8
+    for s, grid in enumerate(occ):
+        assert np.array_equal(grid, generate(topology, np.random.default_rng(s), (45, 60), 0.25))
+
+
+@pytest.mark.parametrize("density", [0.1, 0.2, 0.3, 0.4])
+def test_room_map_doorways_stay_free(density):
+    walls = room_map(np.random.default_rng(5), (200, 200))
+    occ = room_map(np.random.default_rng(5), (200, 200), density)
+    # Doorways of the bare layout, widened by one cell across each wall.
+    door = np.zeros(walls.shape, dtype=bool)
+    for side in (-1, 0, 1):
+        door[20 + side::20, :][:9] |= walls[20::20, :] == 0
+        door[:, 20 + side::20][:, :9] |= walls[:, 20::20] == 0
+    # No furniture there; the only obstacles are walls where a doorway
+    # meets a crossing wall.
+    assert np.array_equal(occ[door], walls[door])
+    assert abs(occ.mean() - density) < 0.01
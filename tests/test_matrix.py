@@ -0,0 +1,63 @@
+import math
+
+import numpy as np
+import pytest
+
+from ails.maps import generate
+from ails.matrix import dijkstra_many, distance_matrix
+from ails.planner import GridPlanner
+from ails.search import dijkstra
+
+
+def _waypoints(planner, rng, n):
+    labels = planner.labels
+    free = np.argwhere(labels == np.bincount(labels[labels >= 0]).argmax())
+    return [tuple(map(int, p)) for p in free[rng.choice(len(free), n, replace=False)]]
+
+
+def test_dijkstra_many_matches_single_searches():
+    rng = np.random.default_rng(0)
+    planner = GridPlanner(generate("random", rng, (60, 60), 0.2))
+    s, *goals = [planner._flat(p) for p in _waypoints(planner, rng, 6)]
+    res = dijkstra_many(planner.adj, s, goals)
+    assert set(res.dist) == set(goals)
+    for t in goals:
+        one = dijkstra(planner.adj, s, t, planner.W)
+        cost = sum(math.dist(divmod(u, planner.W), divmod(v, planner.W)) for u, v in zip(one.path, one.path[1:]))
+        assert res.dist[t] == pytest.approx(cost)
+
+
+@pytest.mark.parametrize("mode", ["ils", "ails"])
+def test_matrix_against_optimal(mode):
+    rng = np.random.default_rng(1)
+    planner = GridPlanner(generate("room", rng, (80, 80), 0.2))
+    waypoints = _waypoints(planner, rng, 7)
+    m = distance_matrix(planner, waypoints, mode)
+    assert m.searches >= len(waypoints) - 1
+    assert np.array_equal(m.cost, m.cost.T) and np.all(np.diag(m.cost) == 0)
+    for i in range(len(waypoints)):
+        for j in range(len(waypoints)):
+            if i == j:
+                continue
+            optimum = planner.plan(waypoints[i], waypoints[j], "dijkstra", "standard").cost
+            # Corridor legs are never shorter than the optimum.
+            assert m.cost[i, j] >= optimum - 1e-9
+            path = m.path(i, j)
+            assert path[0] == waypoints[i] and path[-1] == waypoints[j]
+            assert path == m.path(j, i)[::-1]
+
+
+def test_matrix_pool_matches_in_process():
+    rng = np.random.default_rng(2)
+    planner = GridPlanner(generate("random", rng, (60, 60), 0.2))
+    waypoints = _waypoints(planner, rng, 5)
+    serial = distance_matrix(planner, waypoints, "ails")
+    pooled = distance_matrix(planner, waypoints, "ails", workers=2)
+    assert np.array_equal(serial.cost, pooled.cost)
+    assert serial.legs == pooled.legs
+
+
+def test_matrix_rejects_standard():
+    planner = GridPlanner(np.zeros((10, 10), dtype=bool))
+    with pytest.raises(ValueError):
+        distance_matrix(planner, [(0, 0), (9, 9)], "standard")
@@ -0,0 +1,74 @@
+import math
+
+import numpy as np
+import pytest
+
+import ails.planner as planner_module
+from ails.maps import generate
+from ails.planner import GridPlanner, PlanBatch
+
+
+def _pairs(planner, rng, n):
+    labels = planner.labels
+    free = np.argwhere(labels == np.bincount(labels[labels >= 0]).argmax())
+    return [tuple(tuple(map(int, p)) for p in free[rng.choice(len(free), 2, replace=False)]) for _ in range(n)]
+
+
+@pytest.mark.parametrize("mode", ["standard", "ils", "ails"])
+def test_plan_many_matches_plan(mode):
+    rng = np.random.default_rng(0)
+    planner = GridPlanner(generate("room", rng, (60, 60), 0.2))
+    pairs = _pairs(planner, rng, 12)
+    batch = planner.plan_many(pairs, "astar", mode)
+    assert len(batch) == len(pairs)
+    for i, (s, g) in enumerate(pairs):
+        r = planner.plan(s, g, "astar", mode)
+        assert batch.found[i] == r.found
+        assert batch.cost[i] == pytest.approx(r.cost)
+        assert batch.expanded[i] == r.expanded
+        assert batch.corridor_size[i] == r.corridor_size
+        assert batch.rounds[i] == r.rounds and batch.strategy[i] == r.strategy
+        assert batch.path(i) == r.path
+        assert batch.time_ms[i] > 0
+
+
+def test_plan_many_preprocesses_once(monkeypatch):
+    calls = {"integral_image": 0, "component_labels": 0, "neighbour_table": 0}
+    for name in calls:
+        original = getattr(planner_module, name)
+
+        def counted(occ, _name=name, _original=original):
+            calls[_name] += 1
+            return _original(occ)
+
+        monkeypatch.setattr(planner_module, name, counted)
+    rng = np.random.default_rng(1)
+    planner = GridPlanner(generate("random", rng, (50, 50), 0.2))
+    ii, labels = planner.ii, planner.labels
+    for mode in ("standard", "ils", "ails"):
+        planner.plan_many(_pairs(planner, rng, 10), "astar", mode)
+    assert calls == {"integral_image": 1, "component_labels": 1, "neighbour_table": 1}
+    assert planner.ii is ii and planner.labels is labels
+
+
+def test_plan_many_unreachable():
+    occ = np.zeros((20, 20), dtype=np.uint8)
+    occ[:, 10] = 1
+    planner = GridPlanner(occ)
+    pairs = [((0, 0), (19, 9)), ((0, 0), (19, 19)), ((5, 10), (5, 12)), ((2, 15), (18, 13))]
+    batch = planner.plan_many(pairs)
+    assert batch.found.tolist() == [True, False, False, True]
+    assert math.isinf(batch.cost[1]) and math.isinf(batch.cost[2])
+    assert batch.expanded[1] == batch.expanded[2] == 0
+    assert batch.path(1) is None and batch.path(2) is None
+    # Failed queries take no room in the path arrays.
+    n0, n3 = len(batch.path(0)), len(batch.path(3))
+    assert batch.path_offsets.tolist() == [0, n0, n0, n0, n0 + n3]
+    assert len(batch.path_cells) == n0 + n3
+    assert batch.path(3)[0] == (2, 15) and batch.path(3)[-1] == (18, 13)
+
+
+def test_plan_batch_empty():
+    batch = PlanBatch.from_results([])
+    assert len(batch) == 0 and batch.path_cells.shape == (0, 2)
+    assert batch.path_offsets.tolist() == [0]
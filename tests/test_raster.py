@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from ails.corpus import Corpus
+from ails.grid import integral_image
+from ails.raster import THRESHOLD, greyscale, preprocess_raster
+
+
+def _write_pnm(path, img):
+    magic = b"P5" if img.ndim == 2 else b"P6"
+    H, W = img.shape[:2]
+    with open(path, "wb") as f:
+        f.write(magic + b"\n# test raster\n" + f"{W} {H}\n255\n".encode())
+        f.write(np.ascontiguousarray(img).tobytes())
+
+
+@pytest.mark.parametrize("ext,channels", [(".pgm", 1), (".ppm", 3), (".npy", 1)])
+@pytest.mark.parametrize("rows", [7, 256])
+def test_raster_round_trip(tmp_path, ext, channels, rows):
+    rng = np.random.default_rng(channels + rows)
+    shape = (53, 37) if channels == 1 else (53, 37, 3)
+    img = rng.integers(0, 256, size=shape, dtype=np.uint8)
+    src = str(tmp_path / ("map" + ext))
+    if ext == ".npy":
+        np.save(src, img)
+    else:
+        _write_pnm(src, img)
+    dst = str(tmp_path / "map.ails")
+    meta = preprocess_raster(src, dst, rows=rows, pairs=[((0, 0), (52, 36))])
+    expected = (greyscale(img) < THRESHOLD).astype(np.uint8)
+    with Corpus(dst) as corpus:
+        occ, ii = corpus[0]
+        assert np.array_equal(occ, expected)
+        assert np.array_equal(ii, integral_image(expected))
+        assert corpus.pairs(0) == [((0, 0), (52, 36))]
+        del occ, ii
+    assert meta["actual_density"] == pytest.approx(expected.mean())
+
+
+def test_raster_without_integral(tmp_path):
+    img = np.random.default_rng(0).integers(0, 256, size=(20, 30), dtype=np.uint8)
+    src, dst = str(tmp_path / "m.npy"), str(tmp_path / "m.ails")
+    np.save(src, img)
+    preprocess_raster(src, dst, rows=4, integral=False)
+    with Corpus(dst) as corpus:
+        occ, ii = corpus[0]
+        assert "ii" not in corpus.index[0]
+        assert np.array_equal(ii, integral_image(occ))
@@ -0,0 +1,86 @@
+import heapq
+import math
+
+import numpy as np
+import pytest
+
+from ails.costfield import CostField
+from ails.maps import generate
+from ails.planner import GridPlanner
+from ails.grid import SQRT2
+from ails.search import BUCKET_SCALE, BucketQueue
+
+
+def test_bucket_queue_order():
+    q = BucketQueue(4)
+    for (a, b), v in [((3, 0), "a"), ((0, 2), "b"), ((1, 1), "c"), ((0, 2), "d"), ((2, 0), "e")]:
+        q.push(a + b * SQRT2, v)
+    # 2 < 2.414 (1 + sqrt 2) < 2.828 (2 sqrt 2, FIFO between b and d) < 3.
+    assert [q.pop() for _ in range(len(q))] == ["e", "c", "b", "d", "a"]
+
+
+def test_bucket_queue_exact_within_bucket():
+    # 17 + sqrt 2 = 18.414 and 13 sqrt 2 = 18.385 share a bucket.
+    assert int((17 + SQRT2) * BUCKET_SCALE) == int(13 * SQRT2 * BUCKET_SCALE)
+    q = BucketQueue(4)
+    q.push(17 + SQRT2, "a")
+    q.push(13 * SQRT2, "b")
+    q.push(17 + SQRT2, "c")
+    q.push(13 * SQRT2, "d")
+    assert [q.pop() for _ in range(4)] == ["b", "d", "a", "c"]
+
+
+def test_bucket_queue_matches_heap_order():
+    # A monotone stream, as in Dijkstra, that wraps the circular array many times.
+    rng = np.random.default_rng(0)
+    q = BucketQueue(2 * SQRT2)
+    ref = []
+    keys = [(0, 0)] * 4
+    for v in range(4):
+        q.push(0.0, v)
+        heapq.heappush(ref, (0.0, v))
+    for _ in range(5000):
+        v = q.pop()
+        assert v == heapq.heappop(ref)[1]
+        a, b = keys[v]
+        for step in rng.integers(0, 2, 2):
+            keys.append((a + 1, b) if step else (a, b + 1))
+            key = keys[-1][0] + keys[-1][1] * SQRT2
+            q.push(key, len(keys) - 1)
+            heapq.heappush(ref, (key, len(keys) - 1))
+    assert q.cur > 3 * q.size
+    with pytest.raises(ValueError):
+        q.push(q.cur / BUCKET_SCALE + 10, "far")
+
+
+@pytest.mark.parametrize("topology", ["random", "maze", "room"])
+def test_bucket_matches_heap(topology):
+    rng = np.random.default_rng(5)
+    occ = generate(topology, rng, (80, 80), 0.25)
+    heap, bucket = GridPlanner(occ), GridPlanner(occ, queue="bucket")
+    labels = heap.labels
+    free = np.argwhere(labels == np.bincount(labels[labels >= 0]).argmax())
+    for _ in range(6):
+        s, g = (tuple(map(int, p)) for p in free[rng.choice(len(free), 2, replace=False)])
+        for algorithm in ("astar", "dijkstra", "greedy"):
+            for mode in ("standard", "ils", "ails"):
+                a = getattr(heap, "_plan_" + mode)(heap._search(algorithm), s, g)
+                b = getattr(bucket, "_plan_" + mode)(bucket._search(algorithm), s, g)
+                assert b.path[0] == s and b.path[-1] == g
+                if algorithm != "greedy":
+                    assert b.cost == pytest.approx(a.cost, abs=1e-9)
+                    assert b.rounds == a.rounds
+
+
+def test_bucket_rejects_cost_field():
+    occ = np.zeros((10, 10), dtype=np.uint8)
+    with pytest.raises(ValueError):
+        GridPlanner(occ, queue="bucket", costs=CostField(occ, np.zeros((10, 10))))
+
+
+def test_bucket_unreachable():
+    occ = np.zeros((10, 10), dtype=np.uint8)
+    occ[:, 5] = 1
+    planner = GridPlanner(occ, queue="bucket")
+    r = planner._plan_standard(planner._search("astar"), (0, 0), (9, 9))
+    assert not r.found and r.cost == math.inf
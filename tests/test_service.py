@@ -0,0 +1,58 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from ails.maps import generate
+from ails.planner import GridPlanner
+from ails.service import PlanningService
+
+
+def _setup():
+    rng = np.random.default_rng(0)
+    occ = generate("random", rng, (60, 60), 0.2)
+    planner = GridPlanner(occ)
+    free = np.argwhere(planner.labels == np.bincount(planner.labels[planner.labels >= 0]).argmax())
+    pairs = [tuple(tuple(map(int, p)) for p in free[rng.choice(len(free), 2, replace=False)]) for _ in range(5)]
+    return occ, planner, pairs
+
+
+def test_service_matches_planner():
+    occ, planner, pairs = _setup()
+
+    async def run():
+        async with PlanningService({"m": occ}, workers=1, max_batch=2) as service:
+            return await asyncio.gather(*(service.plan("m", s, g) for s, g in pairs))
+
+    for (s, g), r in zip(pairs, asyncio.run(run())):
+        assert r.cost == pytest.approx(planner.plan(s, g).cost)
+
+
+def test_close_flushes_pending_batches():
+    occ, planner, pairs = _setup()
+
+    async def run():
+        # The batch timer would only fire long after close().
+        service = await PlanningService({"m": occ}, workers=1, max_batch=100, max_delay=60.0).start()
+        tasks = [asyncio.ensure_future(service.plan("m", s, g)) for s, g in pairs]
+        await asyncio.sleep(0)
+        assert not any(t.done() for t in tasks)
+        await asyncio.wait_for(service.close(), 30)
+        return await asyncio.wait_for(asyncio.gather(*tasks), 30)
+
+    results = asyncio.run(run())
+    assert [r.cost for r in results] == pytest.approx([planner.plan(s, g).cost for s, g in pairs])
+
+
+def test_unstarted_service_fails_queries():
+    occ, _, pairs = _setup()
+
+    async def run():
+        service = PlanningService({"m": occ}, max_batch=1)
+        try:
+            with pytest.raises(RuntimeError):
+                await service.plan("m", *pairs[0])
+        finally:
+            await service.close()
+
+    asyncio.run(run())
@@ -0,0 +1,49 @@
+import numpy as np
+
+from ails.grid import Adjacency, adjacency, integral_image, neighbour_table
+from ails.maps import generate
+from ails.planner import GridPlanner
+from ails.shared import SharedDataset
+
+
+def _grids():
+    rng = np.random.default_rng(2)
+    return [generate("random", rng, (30, 40), 0.25), generate("room", rng, (50, 50), 0.2)]
+
+
+def test_shared_dataset_round_trip():
+    grids = _grids()
+    with SharedDataset(grids) as dataset:
+        assert len(dataset) == 2
+        for i, g in enumerate(grids):
+            occ, ii = dataset[i]
+            table = dataset.table(i)
+            assert np.array_equal(occ, g)
+            assert np.array_equal(ii, integral_image(g))
+            assert np.array_equal(table, neighbour_table(g))
+            del occ, ii, table
+
+
+def test_lazy_adjacency_matches_lists():
+    g = _grids()[1]
+    table = neighbour_table(g)
+    lazy = Adjacency(table)
+    assert len(lazy) == len(table)
+    assert [lazy[v] for v in range(len(table))] == adjacency(table)
+
+
+def test_planner_on_shared_views():
+    grids = _grids()
+    rng = np.random.default_rng(4)
+    with SharedDataset(grids) as dataset:
+        occ, ii = dataset[1]
+        shared = GridPlanner(occ, ii=ii, table=dataset.table(1))
+        local = GridPlanner(grids[1])
+        free = np.argwhere(local.labels >= 0)
+        for _ in range(10):
+            s, g = (tuple(map(int, p)) for p in free[rng.choice(len(free), 2, replace=False)])
+            for mode in ("standard", "ils", "ails"):
+                a, b = shared.plan(s, g, "astar", mode), local.plan(s, g, "astar", mode)
+                assert a.path == b.path and a.expanded == b.expanded
+        # Views into the block must go before it is closed.
+        del shared, occ, ii
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from ails.maps import generate
+from ails.planner import GridPlanner
+from ails.smoothing import line_of_sight, path_length, smooth_path, visible
+
+
+def _reference(occ, path):
+    """One vertex at a time: keep the vertex before the first one the anchor cannot see."""
+    keep = [path[0]]
+    a = 0
+    for j in range(2, len(path)):
+        if not line_of_sight(occ, path[a], path[j]):
+            a = j - 1
+            keep.append(path[a])
+    return keep + [path[-1]] if len(path) > 1 else keep
+
+
+def _paths(topology, seed, n=8, size=80):
+    rng = np.random.default_rng(seed)
+    planner = GridPlanner(generate(topology, rng, (size, size), 0.25))
+    labels = planner.labels
+    free = np.argwhere(labels == np.bincount(labels[labels >= 0]).argmax())
+    for _ in range(n):
+        s, g = (tuple(map(int, p)) for p in free[rng.choice(len(free), 2, replace=False)])
+        yield planner.occ, planner.plan(s, g, "astar", "standard").path
+
+
+def test_visible_matches_line_of_sight():
+    rng = np.random.default_rng(0)
+    occ = generate("random", rng, (40, 40), 0.3)
+    a, b = rng.integers(0, 40, (2, 200, 2))
+    expected = [line_of_sight(occ, tuple(p), tuple(q)) for p, q in zip(a, b)]
+    assert visible(occ, a[:, 0], a[:, 1], b[:, 0], b[:, 1]).tolist() == expected
+
+
+@pytest.mark.parametrize("topology", ["random", "maze", "room"])
+def test_smooth_path(topology):
+    for occ, path in _paths(topology, 1):
+        smooth = smooth_path(occ, path)
+        assert smooth[0] == path[0] and smooth[-1] == path[-1]
+        assert set(smooth) <= set(path)
+        # Collision-free and never longer than the grid path.
+        pts = np.asarray(smooth)
+        assert visible(occ, pts[:-1, 0], pts[:-1, 1], pts[1:, 0], pts[1:, 1]).all()
+        assert path_length(smooth) <= path_length(path) + 1e-9
+        assert smooth == _reference(occ, path)
+
+
+@pytest.mark.parametrize("window, chunk", [(2, 1), (3, 2), (5, 4), (16, 32), (64, 8)])
+def test_smooth_path_batching(window, chunk):
+    # Open maps with long paths, so that anchors see past the window.
+    for occ, path in _paths("random", 2, n=6, size=120):
+        assert smooth_path(occ, path, window, chunk) == _reference(occ, path)
+
+
+def test_smooth_path_short():
+    occ = np.zeros((5, 5), dtype=np.uint8)
+    assert smooth_path(occ, [(0, 0)]) == [(0, 0)]
+    assert smooth_path(occ, [(0, 0), (1, 1)]) == [(0, 0), (1, 1)]
+    assert smooth_path(occ, [(0, 0), (1, 1), (2, 2), (2, 3), (2, 4)]) == [(0, 0), (2, 4)]
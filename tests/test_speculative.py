@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from ails.maps import generate
+from ails.planner import GridPlanner, ILSParams
+from ails.speculative import SpeculativeILS
+
+
+def test_speculative_matches_sequential_ils():
+    rng = np.random.default_rng(3)
+    occ = generate("maze", rng, (60, 60), 0.2)
+    sequential = GridPlanner(occ, ils=ILSParams(delta_w=2))
+    labels = sequential.labels
+    free = np.argwhere(labels == np.bincount(labels[labels >= 0]).argmax())
+    pairs = [tuple(tuple(map(int, p)) for p in free[rng.choice(len(free), 2, replace=False)]) for _ in range(8)]
+    with SpeculativeILS(occ, workers=2, k=3, ils=ILSParams(delta_w=2)) as spec:
+        assert list(spec.widths())[:3] == [3, 5, 7] and list(spec.widths())[-1] == 60
+        rounds = []
+        for s, g in pairs:
+            a = sequential.plan(s, g, "astar", "ils")
+            b = spec.plan(s, g)
+            assert b.found == a.found
+            assert b.cost == pytest.approx(a.cost)
+            assert b.path == a.path
+            assert b.rounds == a.rounds and b.corridor_size == a.corridor_size
+            # Every narrower width is searched in full and abandoned wider
+            # searches count too, so never fewer expansions.
+            assert b.expanded >= a.expanded
+            rounds.append(a.rounds)
+        # The maze forces widening, so the speculative batches matter.
+        assert max(rounds) >= 1
+    assert spec.planner is None
+
+
+def test_speculative_unreachable():
+    occ = np.zeros((30, 30), dtype=np.uint8)
+    occ[:, 15] = 1
+    with SpeculativeILS(occ, workers=1, k=2) as spec:
+        r = spec.plan((3, 3), (20, 25))
+        assert not r.found and r.expanded == 0
+        r = spec.plan((3, 3), (20, 10))
+        assert r.found and r.rounds == 0
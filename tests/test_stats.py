@@ -0,0 +1,103 @@
+import math
+
+import numpy as np
+import pytest
+
+from ails.stats import betainc, bootstrap_ci, paired_test, summarise, t_pvalue
+
+
+def test_t_pvalue_closed_forms():
+    t = np.array([0.0, 0.5, 1.0, 2.0, 6.3, -3.0])
+    # df = 1 is the Cauchy distribution, df = 2 has a closed form too.
+    cauchy = 1 - 2 / math.pi * np.arctan(np.abs(t))
+    two = 1 - np.abs(t) / np.sqrt(2 + t * t)
+    assert np.allclose(t_pvalue(t, 1), cauchy, atol=1e-10)
+    assert np.allclose(t_pvalue(t, 2), two, atol=1e-10)
+
+
+def test_t_pvalue_tables():
+    # Two-sided critical values from standard t tables.
+    assert t_pvalue(2.228, 10) == pytest.approx(0.05, abs=1e-4)
+    assert t_pvalue(2.0, 10) == pytest.approx(0.0733880, abs=1e-6)
+    assert t_pvalue(2.576, 1e6) == pytest.approx(0.01, abs=1e-4)
+    assert np.isnan(t_pvalue(1.0, 0))
+
+
+def test_betainc_symmetry():
+    x = np.linspace(0.01, 0.99, 25)
+    assert np.allclose(betainc(2.5, 4.0, x), 1 - betainc(4.0, 2.5, 1 - x), atol=1e-12)
+    assert np.allclose(betainc(1.0, 1.0, x), x, atol=1e-12)
+
+
+def _results(rng, n, shift):
+    """Two modes measured on the same ``n`` instances, ``ails`` faster by ``shift``."""
+    base = rng.normal(10.0, 2.0, n)
+    noise = rng.normal(0.0, 0.5, n)
+    cols = {
+        "dataset": np.array(["ds"] * 2 * n), "size": np.full(2 * n, 100), "density": np.full(2 * n, 0.2),
+        "topology": np.array(["random"] * 2 * n), "algorithm": np.array(["astar"] * 2 * n),
+        "mode": np.array(["standard"] * n + ["ails"] * n),
+        "key": np.tile(np.arange(n) // 10, 2), "pair": np.tile(np.arange(n) % 10, 2),
+        "found": np.ones(2 * n, dtype=bool),
+        "time_ms": np.concatenate([base, base - shift + noise]),
+    }
+    return cols, base, base - shift + noise
+
+
+def test_paired_test_matches_direct_computation():
+    rng = np.random.default_rng(0)
+    cols, a, b = _results(rng, 40, 0.3)
+    # Shuffle rows: pairing must come from the match keys, not the row order.
+    order = rng.permutation(80)
+    cols = {k: v[order] for k, v in cols.items()}
+    out = paired_test(cols)
+    diff = a - b
+    t = diff.mean() / (diff.std(ddof=1) / math.sqrt(len(diff)))
+    assert out["n"][0] == 40
+    assert out["diff"][0] == pytest.approx(diff.mean())
+    assert out["t"][0] == pytest.approx(t)
+    assert out["p"][0] == pytest.approx(float(t_pvalue(t, 39)))
+    d = diff.mean() / math.sqrt((a.var(ddof=1) + b.var(ddof=1)) / 2)
+    assert out["d"][0] == pytest.approx(d)
+
+
+def test_paired_test_separates_effects():
+    rng = np.random.default_rng(1)
+    assert paired_test(_results(rng, 60, 1.0)[0])["p"][0] < 1e-6
+    assert paired_test(_results(rng, 60, 0.0)[0])["p"][0] > 0.01
+
+
+def test_paired_test_skips_failures():
+    rng = np.random.default_rng(2)
+    cols, _, _ = _results(rng, 30, 0.5)
+    cols["found"][3] = False
+    cols["found"][30 + 7] = False
+    assert paired_test(cols)["n"][0] == 28
+    assert paired_test(cols, found_only=False)["n"][0] == 30
+
+
+def test_summarise():
+    rng = np.random.default_rng(3)
+    cols, a, b = _results(rng, 21, 0.5)
+    out = summarise(cols, by=("mode",))
+    assert list(out["mode"]) == ["ails", "standard"]
+    assert list(out["n"]) == [21, 21]
+    assert np.allclose(out["mean"], [b.mean(), a.mean()])
+    assert np.allclose(out["std"], [b.std(ddof=1), a.std(ddof=1)])
+    assert np.allclose(out["median"], [np.median(b), np.median(a)])
+
+
+def test_bootstrap_ci():
+    rng = np.random.default_rng(4)
+    values = np.concatenate([rng.normal(5.0, 1.0, 400), rng.normal(-2.0, 3.0, 100)])
+    ids = np.repeat([0, 1], [400, 100])
+    lo, hi = bootstrap_ci(values, ids, reps=1000, seed=7, workers=1, chunk=100)
+    for g in (0, 1):
+        x = values[ids == g]
+        se = x.std(ddof=1) / math.sqrt(len(x))
+        assert lo[g] < x.mean() < hi[g]
+        # Close to the normal-approximation interval.
+        assert hi[g] - lo[g] == pytest.approx(2 * 1.96 * se, rel=0.15)
+    # Replicates are seeded per chunk, so the pool gives the same interval.
+    lo2, hi2 = bootstrap_ci(values, ids, reps=1000, seed=7, workers=2, chunk=100)
+    assert np.array_equal(lo, lo2) and np.array_equal(hi, hi2)